@@ -10,6 +10,7 @@ from core.models import TextSpan, Evidence, Claim, AutonomyLevel, RiskTier
 from core.run_context import UnifiedRunContext
 from core.canonical_policy import canonicalize, text_hash, make_canonical_span, CanonicalPolicy
 from core.llm_client import UnifiedLLMClient, get_llm_client, LLMResponse
+from execution.model_router import ModelCascade
 
 EXTRACTION_PROMPT = """أنت محلل نصوص إسلامية متخصص. حلل النص التالي واستخرج الادعاءات (claims) الرئيسية.
 لكل ادعاء حدد:
@@ -31,8 +32,8 @@ def _build_card() -> AgentCard:
         agent_id="AGT-01",
         name="Text Analysis Agent (LLM)",
         name_ar="وكيل التحليل النصي الذكي",
-        version="2.1.0",
-        description="LLM-powered claim extraction with rule-based fallback",
+        version="2.2.0",
+        description="LLM-powered claim extraction with confidence-driven model cascade and rule-based fallback",
         category="extract",
         autonomy_level=AutonomyLevel.L1_SUGGEST,
         risk_tier=RiskTier.MEDIUM,
@@ -42,11 +43,12 @@ def _build_card() -> AgentCard:
     )
 
 class SmartTextAnalysisAgent(BaseAgent):
-    def __init__(self, use_llm: bool = True, model: str = "gemini-2.0-flash"):
+    def __init__(self, use_llm: bool = True, model: str = "gemini-2.0-flash", cascade: Optional[ModelCascade] = None):
         super().__init__(_build_card())
         self.policy = CanonicalPolicy()
         self.use_llm = use_llm
         self.model = model
+        self.cascade = cascade or ModelCascade.starting_at(model)
         self.llm = get_llm_client(model) if use_llm else None
 
     async def perceive(self, params: dict[str, Any]) -> dict[str, Any]:
@@ -69,17 +71,32 @@ class SmartTextAnalysisAgent(BaseAgent):
 
     async def _act_llm(self, plan: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
         prompt = EXTRACTION_PROMPT.replace("{text}", plan["raw_text"])
-        resp = await self.llm.complete(prompt=prompt, system="Extract claims as JSON only.", budget=run_ctx.budget, model=self.model)
-        if not resp.success:
-            return await self._act_rules(plan, run_ctx)
-        try:
-            text = resp.text.strip()
-            if text.startswith("```"):
-                text = text.split("\n", 1)[1].rsplit("```", 1)[0]
-            data = json.loads(text)
-            raw_claims = data.get("claims", [])
-        except (json.JSONDecodeError, KeyError):
-            return await self._act_rules(plan, run_ctx)
+        model = self.cascade.tiers[0]
+        attempts = []
+        accepted = None
+        total_cost = 0.0
+        while model:
+            resp = await self.llm.complete(prompt=prompt, system="Extract claims as JSON only.", budget=run_ctx.budget, model=model, max_tokens=self.cascade.max_output_tokens)
+            total_cost += resp.cost_usd
+            raw_claims = self._parse_claims(resp.text) if resp.success else None
+            reason = self.cascade.escalation_reason(raw_claims) if resp.success else "llm_error"
+            attempts.append({"model": model, "escalate": reason, "cost_usd": resp.cost_usd, "latency_ms": resp.latency_ms})
+            if raw_claims:
+                accepted = (raw_claims, model)
+            if reason is None:
+                break
+            nxt = self.cascade.next_model(model)
+            model = nxt if nxt and self.cascade.can_afford(nxt, prompt, run_ctx.budget) else None
+        run_ctx.record_audit("model_cascade", "AGT-01", {
+            "attempts": attempts,
+            "final_model": accepted[1] if accepted else None,
+            "escalated": len(attempts) > 1,
+        })
+        if accepted is None:
+            result = await self._act_rules(plan, run_ctx)
+            result["cost_usd"] = total_cost
+            return result
+        raw_claims, final_model = accepted
         evidences = []
         claims = []
         for i, rc in enumerate(raw_claims):
@@ -87,8 +104,22 @@ class SmartTextAnalysisAgent(BaseAgent):
             span = TextSpan(doc_id=plan["source_id"], char_start=span_data["canonical_start"], char_end=span_data["canonical_end"], text=span_data["text_canonical"], context=span_data["text_raw"])
             ev = Evidence(spans=[span], confidence=rc.get("confidence",0.7), source_ref=f'{plan["source_id"]}#llm_{i}')
             evidences.append(ev)
-            claims.append(Claim(text=rc.get("text", span_data["text_canonical"]), evidence_ids=[ev.evidence_id], confidence=rc.get("confidence",0.7), scope={"type": rc.get("type","unknown"), "method": "llm"}))
-        return {"output": {"claims_count": len(claims), "claims": [c.model_dump() for c in claims], "method": "llm", "llm_cost": resp.cost_usd}, "evidence": evidences, "cost_usd": resp.cost_usd}
+            claims.append(Claim(text=rc.get("text", span_data["text_canonical"]), evidence_ids=[ev.evidence_id], confidence=rc.get("confidence",0.7), scope={"type": rc.get("type","unknown"), "method": "llm", "model": final_model}))
+        return {"output": {"claims_count": len(claims), "claims": [c.model_dump() for c in claims], "method": "llm", "model": final_model, "escalated": len(attempts) > 1, "llm_cost": total_cost}, "evidence": evidences, "cost_usd": total_cost}
+
+    def _parse_claims(self, text: str) -> Optional[list[dict]]:
+        """None = malformed response (triggers escalation)"""
+        try:
+            text = text.strip()
+            if text.startswith("```"):
+                text = text.split("\n", 1)[1].rsplit("```", 1)[0]
+            data = json.loads(text)
+            raw_claims = data.get("claims", [])
+        except (json.JSONDecodeError, AttributeError, IndexError):
+            return None
+        if not isinstance(raw_claims, list):
+            return None
+        return [rc for rc in raw_claims if isinstance(rc, dict)]
 
     async def _act_rules(self, plan: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
         from agents.agt01_text_analysis import TextAnalysisAgent
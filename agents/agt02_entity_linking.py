@@ -12,11 +12,15 @@ AGT-02: Entity Linking Agent — وكيل ربط الكيانات
 from __future__ import annotations
 
 import re
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Iterator, Optional
 from core.base_agent import BaseAgent, AgentCard, AgentResult
 from core.models import TextSpan, Evidence, AutonomyLevel, RiskTier
 from core.run_context import UnifiedRunContext
 from core.canonical_policy import canonicalize, CanonicalPolicy
+from entities.gazetteer import Gazetteer, normalize_name
+from entities.resolution import ResolutionIndex, stable_entity_id
+from entities.overlap import resolve_overlaps, PREFER_LENGTH
 
 
 class EntityType:
@@ -29,9 +33,13 @@ class EntityType:
 
 
 class EntityMention:
+    """سجل مدمج (__slots__): لا __dict__ لكل إشارة"""
+    __slots__ = ("text", "entity_type", "confidence", "canonical_start", "canonical_end",
+                 "source_id", "suggested_id", "candidates", "approved")
+
     def __init__(self, text: str, entity_type: str, confidence: float,
                  canonical_start: int, canonical_end: int, source_id: str,
-                 suggested_id: Optional[str] = None):
+                 suggested_id: Optional[str] = None, candidates: Optional[list[dict]] = None):
         self.text = text
         self.entity_type = entity_type
         self.confidence = confidence
@@ -39,6 +47,7 @@ class EntityMention:
         self.canonical_end = canonical_end
         self.source_id = source_id
         self.suggested_id = suggested_id
+        self.candidates = candidates or ()
         self.approved = False
 
     def to_dict(self) -> dict:
@@ -50,6 +59,7 @@ class EntityMention:
             "canonical_end": self.canonical_end,
             "source_id": self.source_id,
             "suggested_id": self.suggested_id,
+            "candidates": list(self.candidates),
             "approved": self.approved,
         }
 
@@ -60,13 +70,113 @@ PERSON_PATTERNS = [
     r"(?:الإمام|الشيخ|العلامة|الحافظ)\s+\w+",
 ]
 BOOK_PATTERNS = [
-    r"(?:كتاب|المقدمة|الرسالة|المختصر|الموطأ|الصحيح)",
+    r"(?:كتاب|المقدمة|الرسالة|المختصر|الموطأ|الصحيح)\b",
 ]
 CONCEPT_PATTERNS = [
-    r"(?:العمران|الاجتماع|العصبية|الملك|الخلافة|الحضارة)",
+    r"(?:العمران|الاجتماع|العصبية|الملك|الخلافة|الحضارة)\b",
 ]
 
 
+_REGEX_META = set(".^$*+?{}[]\\|()")
+
+
+def _literal_alternatives(pattern: str) -> Optional[tuple[str, list[str]]]:
+    """`(?:a|b|c)\\b` or a bare literal → (boundary, [a, b, c]); None for a real regex."""
+    boundary = ""
+    if pattern.endswith(r"\b"):
+        boundary, pattern = r"\b", pattern[:-2]
+    body = pattern[3:-1] if pattern.startswith("(?:") and pattern.endswith(")") else pattern
+    alts = body.split("|")
+    if any(not a or _REGEX_META & set(a) for a in alts):
+        return None
+    return boundary, alts
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"  # what re's \w matches on str
+
+
+class EntityMatcher:
+    """Compiled once per pattern set.
+
+    Literal patterns (a word, or `(?:a|b|c)` with an optional trailing \\b) of every type
+    go into one Aho-Corasick automaton (entities.gazetteer), scanned once per text, so
+    thousands of names cost about as much as a few. Only real regexes get their own scan.
+
+    Matches equal a plain re.finditer per pattern, in the same order (type, pattern,
+    offset): mentions of different types or patterns may overlap or nest, and each
+    pattern still finds them.
+    """
+
+    def __init__(self, patterns: dict[str, list[str]], policy: Optional[CanonicalPolicy] = None):
+        policy = policy or CanonicalPolicy()
+        # per pattern, in declaration order: (type, compiled regex or None, \b required)
+        self.scans: list[tuple[str, Optional[re.Pattern], bool]] = []
+        # automaton entries are (word, pattern number, alternative number) in place of
+        # the gazetteer's (name, entity type, authority id)
+        literals: list[tuple[str, str, str]] = []
+        for etype, pats in patterns.items():
+            for p in pats:
+                # Matching runs on canonical text, so patterns must be canonical too
+                p = canonicalize(p, policy)
+                parsed = _literal_alternatives(p)
+                if parsed is not None and all(normalize_name(a, policy) == a for a in parsed[1]):
+                    literals.extend((a, str(len(self.scans)), str(k)) for k, a in enumerate(parsed[1]))
+                    self.scans.append((etype, None, bool(parsed[0])))
+                else:
+                    self.scans.append((etype, re.compile(p), False))
+        self.automaton = Gazetteer.build(literals, policy) if literals else None
+
+    def finditer(self, text: str) -> Iterator[tuple[str, int, int]]:
+        """(entity type, start, end) of every match."""
+        by_pattern = self._literal_matches(text)
+        for num, (etype, regex, _) in enumerate(self.scans):
+            if regex is None:
+                for start, end in by_pattern.get(num, ()):
+                    yield etype, start, end
+            else:
+                for match in regex.finditer(text):
+                    yield etype, match.start(), match.end()
+
+    def _literal_matches(self, text: str) -> dict[int, list[tuple[int, int]]]:
+        """What re.finditer would return for each literal pattern, from one automaton pass.
+
+        At each offset the regex takes the first listed alternative that matches (and is
+        followed by a word boundary if required), then resumes after it.
+        """
+        if self.automaton is None:
+            return {}
+        n = len(text)
+        best: dict[int, dict[int, tuple[int, int]]] = {}  # pattern → start → (alternative, end)
+        for hit in self.automaton.finditer(text, whole_words=False):
+            boundary = hit.end == n or _is_word(text[hit.end - 1]) != _is_word(text[hit.end])
+            for pattern, alt in hit.entries:
+                num, k = int(pattern), int(alt)
+                if self.scans[num][2] and not boundary:
+                    continue
+                at = best.setdefault(num, {})
+                if hit.start not in at or k < at[hit.start][0]:
+                    at[hit.start] = (k, hit.end)
+        matches: dict[int, list[tuple[int, int]]] = {}
+        for num, at in best.items():
+            spans, resume = matches.setdefault(num, []), 0
+            for start in sorted(at):
+                if start >= resume:
+                    resume = at[start][1]
+                    spans.append((start, resume))
+        return matches
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(key: tuple[tuple[str, tuple[str, ...]], ...]) -> EntityMatcher:
+    return EntityMatcher({etype: list(pats) for etype, pats in key})
+
+
+def get_matcher(patterns: dict[str, list[str]]) -> EntityMatcher:
+    """Matcher for a pattern set, compiled on first use and reused afterwards."""
+    return _cached_matcher(tuple((etype, tuple(pats)) for etype, pats in patterns.items()))
+
+
 def _build_card() -> AgentCard:
     return AgentCard(
         agent_id="AGT-02",
@@ -84,11 +194,21 @@ def _build_card() -> AgentCard:
 
 
 class EntityLinkingAgent(BaseAgent):
-    """AGT-02: يستخرج الكيانات ويقترح ربطها — Suggest فقط"""
+    """AGT-02: يستخرج الكيانات ويقترح ربطها — Suggest فقط
+
+    حل التداخل افتراضياً داخل النوع الواحد فقط (overlap_per_type=True): مكان داخل نسبة شخص،
+    أو اسم في المعجم بأكثر من نوع، يبقى كإشارة مستقلة. overlap_per_type=False يُسقط التداخل
+    بين الأنواع أيضاً، و overlap_policy=None يُبقي كل الإشارات.
+    """
 
-    def __init__(self):
+    def __init__(self, gazetteer: Optional[Gazetteer] = None, resolver: Optional[ResolutionIndex] = None,
+                 overlap_policy: Optional[str] = PREFER_LENGTH, overlap_per_type: bool = True):
         super().__init__(_build_card())
         self.policy = CanonicalPolicy()
+        self.gazetteer = gazetteer
+        self.resolver = resolver
+        self.overlap_policy = overlap_policy  # None = keep all overlapping mentions
+        self.overlap_per_type = overlap_per_type  # False = a longer mention of any type suppresses
 
     async def perceive(self, params: dict[str, Any]) -> dict[str, Any]:
         text = params.get("text", "")
@@ -118,22 +238,42 @@ class EntityLinkingAgent(BaseAgent):
         text = plan["canonical_text"]
         source_id = plan["source_id"]
 
-        for etype, patterns in plan["patterns"].items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, text):
-                    mention = EntityMention(
-                        text=match.group(),
+        for etype, start, end in get_matcher(plan["patterns"]).finditer(text):
+            suggested_id, candidates = self._resolve(text[start:end], etype)
+            mention = EntityMention(
+                text=text[start:end],
+                entity_type=etype,
+                confidence=0.6,
+                canonical_start=start,
+                canonical_end=end,
+                source_id=source_id,
+                suggested_id=suggested_id,
+                candidates=candidates,
+            )
+            mentions.append(mention)
+
+        if self.gazetteer is not None:
+            for hit in self.gazetteer.finditer(text):
+                for etype, authority_id in hit.entries:
+                    suggested_id, candidates = self._resolve(hit.name, etype)
+                    mentions.append(EntityMention(
+                        text=hit.name,
                         entity_type=etype,
-                        confidence=0.6,
-                        canonical_start=match.start(),
-                        canonical_end=match.end(),
+                        confidence=0.85,
+                        canonical_start=hit.start,
+                        canonical_end=hit.end,
                         source_id=source_id,
-                        suggested_id=f"ent_{etype}_{match.group()[:10]}",
-                    )
-                    mentions.append(mention)
+                        suggested_id=authority_id or suggested_id,
+                        candidates=candidates,
+                    ))
+
+        raw_count = len(mentions)
+        if self.overlap_policy:
+            mentions = resolve_overlaps(mentions, prefer=self.overlap_policy, per_type=self.overlap_per_type)
 
         run_ctx.record_audit("entities_extracted", "AGT-02", {
             "count": len(mentions),
+            "overlaps_dropped": raw_count - len(mentions),
             "types": list(set(m.entity_type for m in mentions)),
         })
 
@@ -147,3 +287,10 @@ class EntityLinkingAgent(BaseAgent):
             "evidence": [],
             "cost_usd": 0.0,
         }
+
+    def _resolve(self, text: str, etype: str) -> tuple[str, list[dict]]:
+        """Stable suggested id + ranked candidates (Suggest only, never auto-linked)"""
+        if self.resolver is None:
+            return stable_entity_id(etype, text, self.policy), []
+        suggested_id, candidates = self.resolver.suggest(text, etype)
+        return suggested_id, [c.to_dict() for c in candidates]
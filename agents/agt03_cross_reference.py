@@ -4,15 +4,34 @@ AGT-03: Cross-Reference Agent — وكيل المراجع التقاطعية
 يستقبل claims من مصادر متعددة → يبحث عن تقاطعات وتأييدات وتناقضات.
 
 Thin Slice: مقارنة بسيطة بالتطابق النصي (canonical).
-التوسع: semantic similarity عبر embeddings.
+- inverted_index (الافتراضي): فهرس مصطلح → ادعاءات، تُقيَّم الأزواج المشتركة فقط
+  (workers > 1: كتل A على مجمع عمليات مع postings في ذاكرة مشتركة، بنفس الناتج والترتيب)
+- minhash_lsh: مرشحون عبر MinHash/LSH ثم تحقق بالتداخل الفعلي (تقريبي، دون خطي)
+- tfidf: تشابه جيب التمام لمتجهات TF-IDF متفرقة، ضرب مصفوفات على دفعات (يتطلب NumPy)
+- embedding: تشابه دلالي تقريبي — متجهات EmbeddingBackend (افتراضياً n-grams حرفية مُجزّأة)
+  وفهرس IVF محلي؛ يلتقط إعادة الصياغة التي لا يشترك فيها الطرفان بمصطلحات حرفية
+- term_overlap: مقارنة كل الأزواج (N·M) — للمرجعية
+- registry: مع CrossRefRegistry يُمرَّر مصدر واحد (claims + source_id) فيُقارن بكل المصادر المسجلة سابقاً
 """
 from __future__ import annotations
 
-from typing import Any
+from collections import Counter
+from typing import Any, Optional
 from core.base_agent import BaseAgent, AgentCard, AgentResult
 from core.models import TextSpan, Evidence, Claim, AutonomyLevel, RiskTier
 from core.run_context import UnifiedRunContext
-from core.canonical_policy import canonicalize, CanonicalPolicy
+from core.canonical_policy import CanonicalPolicy
+from core.terms import TermExtractor, default_extractor
+from crossref.inverted_index import TermIndex, overlap_pairs, overlap_score
+from crossref.minhash import LSHIndex
+from crossref.tfidf import TfidfSimilarityEngine
+from crossref.embeddings import EmbeddingBackend, HashedNgramEmbedder
+from crossref.ann import IVFIndex
+from crossref.registry import CrossRefRegistry
+from crossref.parallel import parallel_overlap_pairs
+
+METHODS = ("inverted_index", "minhash_lsh", "tfidf", "embedding", "term_overlap")
+DEFAULT_THRESHOLDS = {"embedding": 0.6}  # cosine of hashed n-gram vectors sits higher than term overlap
 
 
 def _build_card() -> AgentCard:
@@ -33,67 +52,122 @@ def _build_card() -> AgentCard:
 
 class CrossRefResult:
     def __init__(self, claim_a_idx: int, claim_b_idx: int, 
-                 relation: str, overlap_score: float, shared_terms: list[str]):
+                 relation: str, overlap_score: float, shared_terms: list[str],
+                 source_b: Optional[str] = None):
         self.claim_a_idx = claim_a_idx
         self.claim_b_idx = claim_b_idx
         self.relation = relation
         self.overlap_score = overlap_score
         self.shared_terms = shared_terms
+        self.source_b = source_b
 
     def to_dict(self) -> dict:
-        return {
+        d = {
             "claim_a": self.claim_a_idx,
             "claim_b": self.claim_b_idx,
             "relation": self.relation,
             "overlap_score": self.overlap_score,
             "shared_terms": self.shared_terms,
         }
+        if self.source_b is not None:
+            d["source_b"] = self.source_b
+        return d
 
 
 class CrossReferenceAgent(BaseAgent):
     """AGT-03: يبحث عن تقاطعات بين claims من مصادر مختلفة"""
 
-    def __init__(self):
+    def __init__(self, embedder: Optional[EmbeddingBackend] = None, extractor: Optional[TermExtractor] = None):
         super().__init__(_build_card())
         self.policy = CanonicalPolicy()
+        self._embedder = embedder
+        self.extractor = extractor or default_extractor()
+
+    @property
+    def embedder(self) -> EmbeddingBackend:
+        if self._embedder is None:
+            self._embedder = HashedNgramEmbedder()
+        return self._embedder
 
     async def perceive(self, params: dict[str, Any]) -> dict[str, Any]:
+        registry = params.get("registry")
+        if registry is not None:
+            if not params.get("claims"):
+                raise ValueError("AGT-03: no claims to register")
+            return {
+                "registry": registry,
+                "claims": params["claims"],
+                "source_id": params.get("source_id", "unknown"),
+                "method": "registry",
+            }
         claims_a = params.get("claims_a", [])
         claims_b = params.get("claims_b", [])
         if not claims_a or not claims_b:
             raise ValueError("AGT-03: needs claims from at least 2 sources")
-        return {"claims_a": claims_a, "claims_b": claims_b}
+        method = params.get("method", "inverted_index")
+        return {
+            "claims_a": claims_a,
+            "claims_b": claims_b,
+            "method": method,
+            "threshold": params.get("threshold", DEFAULT_THRESHOLDS.get(method, 0.3)),
+            "top_k": params.get("top_k", 10),
+            "workers": params.get("workers", 1),
+        }
 
     async def think(self, perceived: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
+        if perceived["method"] == "registry":
+            return perceived
+        if perceived["method"] not in METHODS:
+            raise ValueError(f"AGT-03: unknown method {perceived['method']}")
         return {
             "claims_a": perceived["claims_a"],
             "claims_b": perceived["claims_b"],
-            "method": "term_overlap",
-            "threshold": 0.3,
+            "method": perceived["method"],
+            "threshold": perceived["threshold"],
+            "top_k": perceived["top_k"],
+            "workers": perceived["workers"],
         }
 
     async def act(self, plan: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
+        if plan["method"] == "registry":
+            return self._act_registry(plan, run_ctx)
+        # Tokenize each side once
+        tokens_a = [self.extractor.claim_terms(c) for c in plan["claims_a"]]
+        tokens_b = [self.extractor.claim_terms(c) for c in plan["claims_b"]]
+        terms_a = [frozenset(t) for t in tokens_a]
+        terms_b = [frozenset(t) for t in tokens_b]
+        stats: Counter = Counter()  # pairs_scored: candidate pairs the method actually scored
+        if plan["method"] == "inverted_index" and plan["workers"] > 1:
+            matches = parallel_overlap_pairs(terms_a, terms_b, plan["threshold"], workers=plan["workers"], stats=stats)
+        elif plan["method"] == "inverted_index":
+            index_b = TermIndex()
+            index_b.extend(terms_b)
+            matches = overlap_pairs(terms_a, index_b, plan["threshold"], stats)
+        elif plan["method"] == "minhash_lsh":
+            matches = self._lsh_pairs(terms_a, terms_b, plan["threshold"], stats)
+        elif plan["method"] == "tfidf":
+            engine = TfidfSimilarityEngine(threshold=plan["threshold"])
+            matches = ((i, j, score, terms_a[i] & terms_b[j])
+                       for i, j, score in engine.pairs(tokens_a, tokens_b, stats))
+        elif plan["method"] == "embedding":
+            matches = self._embedding_pairs(tokens_a, tokens_b, terms_a, terms_b, plan["threshold"], plan["top_k"],
+                                            stats)
+        else:
+            matches = self._all_pairs(terms_a, terms_b, plan["threshold"], stats)
+
         cross_refs = []
-        for i, ca in enumerate(plan["claims_a"]):
-            text_a = ca.get("text", "") if isinstance(ca, dict) else ca.text
-            terms_a = set(self._extract_terms(text_a))
-            for j, cb in enumerate(plan["claims_b"]):
-                text_b = cb.get("text", "") if isinstance(cb, dict) else cb.text
-                terms_b = set(self._extract_terms(text_b))
-                shared = terms_a & terms_b
-                if not terms_a or not terms_b:
-                    continue
-                overlap = len(shared) / max(len(terms_a), len(terms_b))
-                if overlap >= plan["threshold"]:
-                    relation = "corroboration" if overlap > 0.5 else "partial_overlap"
-                    cross_refs.append(CrossRefResult(
-                        claim_a_idx=i, claim_b_idx=j,
-                        relation=relation, overlap_score=round(overlap, 3),
-                        shared_terms=list(shared),
-                    ))
+        for i, j, overlap, shared in matches:
+            relation = "corroboration" if overlap > 0.5 else "partial_overlap"
+            cross_refs.append(CrossRefResult(
+                claim_a_idx=i, claim_b_idx=j,
+                relation=relation, overlap_score=round(overlap, 3),
+                shared_terms=sorted(shared),
+            ))
 
         run_ctx.record_audit("cross_ref_complete", "AGT-03", {
-            "pairs_checked": len(plan["claims_a"]) * len(plan["claims_b"]),
+            "method": plan["method"],
+            "workers": plan["workers"],
+            "pairs_checked": stats["pairs_scored"],
             "refs_found": len(cross_refs),
         })
 
@@ -106,8 +180,73 @@ class CrossReferenceAgent(BaseAgent):
             "cost_usd": 0.0,
         }
 
+    def _act_registry(self, plan: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
+        """Register one source; cross-refs are all matches involving it (new ones computed once)."""
+        registry: CrossRefRegistry = plan["registry"]
+        source_id = plan["source_id"]
+        new = registry.add_source(source_id, [self.extractor.claim_terms(c) for c in plan["claims"]])
+        cross_refs = [CrossRefResult(
+            claim_a_idx=m.claim_a, claim_b_idx=m.claim_b,
+            relation="corroboration" if m.score > 0.5 else "partial_overlap",
+            overlap_score=round(m.score, 3), shared_terms=list(m.shared), source_b=other,
+        ) for other, m in registry.refs_for(source_id)]
+
+        run_ctx.record_audit("cross_ref_complete", "AGT-03", {
+            "method": "registry",
+            "source_id": source_id,
+            "already_registered": new is None,
+            "sources_indexed": len(registry),
+            "new_refs": sum(len(v) for v in new.values()) if new else 0,
+            "refs_found": len(cross_refs),
+        })
+
+        return {
+            "output": {
+                "cross_ref_count": len(cross_refs),
+                "cross_refs": [r.to_dict() for r in cross_refs],
+            },
+            "evidence": [],
+            "cost_usd": 0.0,
+        }
+
+    @staticmethod
+    def _all_pairs(terms_a: list[frozenset], terms_b: list[frozenset], threshold: float, stats: Counter):
+        for i, ta in enumerate(terms_a):
+            for j, tb in enumerate(terms_b):
+                if not ta or not tb:
+                    continue
+                stats["pairs_scored"] += 1
+                shared = ta & tb
+                overlap = len(shared) / max(len(ta), len(tb))
+                if overlap >= threshold:
+                    yield i, j, overlap, shared
+
+    @staticmethod
+    def _lsh_pairs(terms_a: list[frozenset], terms_b: list[frozenset], threshold: float, stats: Counter):
+        """LSH candidates, verified with the exact overlap score (may miss low-similarity pairs)."""
+        lsh = LSHIndex()
+        lsh.add_many("b", [(str(j), tb) for j, tb in enumerate(terms_b)])
+        sigs_a = lsh.hasher.signatures(terms_a)
+        for i, (ta, sig) in enumerate(zip(terms_a, sigs_a)):
+            candidates = sorted(int(key) for key, _ in lsh.candidates(sig))
+            stats["pairs_scored"] += len(candidates)
+            for j in candidates:
+                overlap = overlap_score(ta, terms_b[j])
+                if overlap >= threshold:
+                    yield i, j, overlap, ta & terms_b[j]
+
+    def _embedding_pairs(self, tokens_a: list[tuple[str, ...]], tokens_b: list[tuple[str, ...]],
+                         terms_a: list[frozenset], terms_b: list[frozenset], threshold: float, top_k: int,
+                         stats: Counter):
+        """Up to top_k nearest claims of B per claim of A with cosine ≥ threshold (approximate)."""
+        embedder = self.embedder
+        index = IVFIndex(embedder.dim, fingerprint=embedder.fingerprint)
+        index.add("b", [str(j) for j in range(len(tokens_b))], embedder.embed([" ".join(t) for t in tokens_b]))
+        hits = index.search(embedder.embed([" ".join(t) for t in tokens_a]), k=top_k, min_score=threshold,
+                            stats=stats)
+        for i, row in enumerate(hits):
+            for j, score in sorted((int(key), score) for key, score in row):
+                yield i, j, min(score, 1.0), terms_a[i] & terms_b[j]
+
     def _extract_terms(self, text: str) -> list[str]:
-        canonical = canonicalize(text, self.policy)
-        stop_words = {"في", "من", "الى", "على", "عن", "ان", "لا", "ما", "هو", "هي", "كل", "بل", "او", "اذا", "لم", "قد", "بد", "له", "بها"}
-        terms = [w for w in canonical.split() if len(w) > 2 and w not in stop_words]
-        return terms
+        return list(self.extractor.terms(text))
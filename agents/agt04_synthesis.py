@@ -4,6 +4,9 @@ AGT-04: Synthesis Agent — وكيل التوليف
 يستقبل claims + entities + cross_refs → يولّف ملخصاً بحثياً مهيكلاً.
 
 Thin Slice: توليف rule-based بسيط (تجميع + ترتيب).
+mode="streaming": claims أي مكرِّر (مدونة كاملة) — تمريرة واحدة وأعلى top_k لكل قسم،
+مع كتابة التقرير أسطر JSONL إن أُعطي jsonl_path.
+mode="merge": reports (تقارير AGT-04 لكل مصدر) تُدمج شجرياً في تقرير مدونة واحد دون العودة للادعاءات.
 التوسع: توليف عبر LLM مع citations دقيقة.
 
 ملاحظة: AGT-04 الأصلي قُسّم إلى متخصصين (قرار الجلسة 9).
@@ -15,6 +18,8 @@ from typing import Any
 from core.base_agent import BaseAgent, AgentCard, AgentResult
 from core.models import Evidence, AutonomyLevel, RiskTier
 from core.run_context import UnifiedRunContext
+from synthesis.streaming import SECTIONS, StreamingSynthesizer, claim_confidence, claim_item, section_of
+from synthesis.report import SynthesisReport, reduce_reports
 
 
 def _build_card() -> AgentCard:
@@ -40,6 +45,26 @@ class SynthesisAgent(BaseAgent):
         super().__init__(_build_card())
 
     async def perceive(self, params: dict[str, Any]) -> dict[str, Any]:
+        if params.get("mode") == "streaming":
+            return {
+                "mode": "streaming",
+                "claims": params.get("claims", ()),
+                "entities": params.get("entities", ()),
+                "cross_refs": params.get("cross_refs", ()),
+                "source_id": params.get("source_id", "corpus"),
+                "top_k": params.get("top_k", 50),
+                "jsonl_path": params.get("jsonl_path"),
+            }
+        if params.get("mode") == "merge":
+            if not params.get("reports"):
+                raise ValueError("AGT-04: no reports to merge")
+            return {
+                "mode": "merge",
+                "reports": params["reports"],
+                "source_id": params.get("source_id", "corpus"),
+                "top_k": params.get("top_k", 50),
+                "workers": params.get("workers", 1),
+            }
         claims = params.get("claims", [])
         entities = params.get("entities", [])
         cross_refs = params.get("cross_refs", [])
@@ -54,17 +79,15 @@ class SynthesisAgent(BaseAgent):
         }
 
     async def think(self, perceived: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
+        if perceived.get("mode") in ("streaming", "merge"):
+            return perceived
         claims = perceived["claims"]
-        sections = []
-        main_claims = [c for c in claims if self._get_conf(c) >= 0.7]
-        supporting = [c for c in claims if 0.4 <= self._get_conf(c) < 0.7]
-        weak = [c for c in claims if self._get_conf(c) < 0.4]
-        if main_claims:
-            sections.append({"title": "core_findings", "claims": main_claims})
-        if supporting:
-            sections.append({"title": "supporting_evidence", "claims": supporting})
-        if weak:
-            sections.append({"title": "needs_verification", "claims": weak})
+        # one pass, confidence read once per claim
+        buckets: dict[str, list] = {title: [] for title, _ in SECTIONS}
+        for c in claims:
+            conf = self._get_conf(c)
+            buckets[section_of(conf)].append((c, conf))
+        sections = [{"title": title, "claims": buckets[title]} for title, _ in SECTIONS if buckets[title]]
         return {
             "sections": sections,
             "entities": perceived["entities"],
@@ -74,19 +97,13 @@ class SynthesisAgent(BaseAgent):
         }
 
     async def act(self, plan: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
+        if plan.get("mode") == "streaming":
+            return self._act_streaming(plan, run_ctx)
+        if plan.get("mode") == "merge":
+            return self._act_merge(plan, run_ctx)
         report_sections = []
         for section in plan["sections"]:
-            items = []
-            for c in section["claims"]:
-                text = c.get("text", "") if isinstance(c, dict) else c.text
-                conf = self._get_conf(c)
-                ev_ids = c.get("evidence_ids", []) if isinstance(c, dict) else c.evidence_ids
-                items.append({
-                    "claim_text": text,
-                    "confidence": conf,
-                    "evidence_count": len(ev_ids),
-                    "citations": ev_ids,
-                })
+            items = [claim_item(c, conf) for c, conf in section["claims"]]
             report_sections.append({
                 "section": section["title"],
                 "items": items,
@@ -120,7 +137,51 @@ class SynthesisAgent(BaseAgent):
             "cost_usd": 0.0,
         }
 
+    def _act_streaming(self, plan: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
+        synth = StreamingSynthesizer(plan["source_id"], top_k=plan["top_k"])
+        synth.add_claims(plan["claims"])
+        if not synth.total_claims:
+            raise ValueError("AGT-04: no claims to synthesize")
+        synth.add_entities(plan["entities"])
+        synth.add_cross_refs(sum(1 for _ in plan["cross_refs"]))
+        jsonl_lines = 0
+        if plan["jsonl_path"]:
+            with open(plan["jsonl_path"], "w", encoding="utf-8") as fp:
+                jsonl_lines = synth.write_jsonl(fp)
+        report = synth.report()
+
+        run_ctx.record_audit("synthesis_complete", "AGT-04", {
+            "mode": "streaming",
+            "sections": len(report["sections"]),
+            "total_claims": synth.total_claims,
+            "top_k": synth.top_k,
+            "jsonl_lines": jsonl_lines,
+        })
+
+        return {
+            "output": report,
+            "evidence": [],
+            "cost_usd": 0.0,
+        }
+
+    def _act_merge(self, plan: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
+        reports = [r if isinstance(r, SynthesisReport) else SynthesisReport.from_output(r, top_k=plan["top_k"])
+                   for r in plan["reports"]]
+        merged = reduce_reports(reports, workers=plan["workers"])
+        report = merged.to_output(plan["source_id"])
+
+        run_ctx.record_audit("synthesis_complete", "AGT-04", {
+            "mode": "merge",
+            "reports_merged": len(reports),
+            "sections": len(report["sections"]),
+            "total_claims": merged.total_claims,
+        })
+
+        return {
+            "output": report,
+            "evidence": [],
+            "cost_usd": 0.0,
+        }
+
     def _get_conf(self, claim) -> float:
-        if isinstance(claim, dict):
-            return claim.get("confidence", 0.5)
-        return getattr(claim, "confidence", 0.5)
+        return claim_confidence(claim)
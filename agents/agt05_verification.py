@@ -7,6 +7,8 @@ Thin Slice: يستقبل claims + evidence → يتحقق من:
 3. تطابق النص المقتبس مع المصدر
 
 لا يستخدم LLM في هذه المرحلة — تحقق قاعدي rule-based.
+run() يتحقق دائماً بنفسه؛ نتائج تمريرة G1 + AGT-05 المدمجة (verification.fused) لا تُقبل من المدخلات،
+بل تسجلها عقدة المسار عبر record_fused بعد أن تحسبها عقدة G1.
 """
 from __future__ import annotations
 from typing import Any
@@ -69,8 +71,35 @@ class VerificationAgent(BaseAgent):
         }
 
     async def act(self, plan: dict, run_ctx: UnifiedRunContext) -> dict[str, Any]:
+        return self._report(self._verify_scalar(plan), run_ctx, fused=False)
+
+    async def record_fused(self, run_ctx: UnifiedRunContext, results: list[dict]) -> AgentResult:
+        """Record the AGT-05 results a pipeline's G1 node computed with validate_fused, with the
+        same AgentResult and audit event as run(). run() itself never accepts results."""
+        async def report() -> dict[str, Any]:
+            return self._report(results, run_ctx, fused=True)
+        return await self._execute(run_ctx, report)
+
+    def _report(self, results: list[dict], run_ctx: UnifiedRunContext, fused: bool) -> dict[str, Any]:
+        all_passed = all(r["passed"] for r in results)
+
+        verified_count = sum(1 for r in results if r["passed"])
+        audit = {"total": len(results), "verified": verified_count, "all_passed": all_passed, "fused": fused}
+        run_ctx.record_audit("verification_complete", "AGT-05", audit)
+
+        return {
+            "output": {
+                "all_passed": all_passed,
+                "total_claims": len(results),
+                "verified_count": verified_count,
+                "results": results,
+            },
+            "evidence": [],
+            "cost_usd": 0.0,
+        }
+
+    def _verify_scalar(self, plan: dict) -> list[dict]:
         results = []
-        all_passed = True
         for i, claim_data in enumerate(plan["claims"]):
             if isinstance(claim_data, dict):
                 ev_ids = claim_data.get("evidence_ids", [])
@@ -108,22 +137,5 @@ class VerificationAgent(BaseAgent):
                             check["issues"].append(f"text mismatch at [{cs}:{ce}]")
                             check["passed"] = False
 
-            if not check["passed"]:
-                all_passed = False
             results.append(check)
-
-        verified_count = sum(1 for r in results if r["passed"])
-        run_ctx.record_audit("verification_complete", "AGT-05", {
-            "total": len(results), "verified": verified_count, "all_passed": all_passed
-        })
-
-        return {
-            "output": {
-                "all_passed": all_passed,
-                "total_claims": len(results),
-                "verified_count": verified_count,
-                "results": results,
-            },
-            "evidence": [],
-            "cost_usd": 0.0,
-        }
+        return results
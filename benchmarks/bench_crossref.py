@@ -0,0 +1,82 @@
+"""
+Benchmark: AGT-03 cross-referencing methods on synthetic claim sets.
+
+    python benchmarks/bench_crossref.py [--sizes 1000,10000,100000] [--methods ...] [--max-loop 1000]
+
+The all-pairs term_overlap loop is quadratic; above --max-loop its time is
+extrapolated from the largest measured size instead of being run.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.agt03_cross_reference import CrossReferenceAgent
+from core.run_context import UnifiedRunContext
+
+LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+
+def make_claims(n: int, seed: int, vocab_size: int = 30_000, common: int = 200,
+                common_ratio: float = 0.2, dup_every: int = 10) -> tuple[list[dict], list[dict]]:
+    """Two sources of short claims; every `dup_every`-th claim is shared verbatim."""
+    rnd = random.Random(seed)
+    vocab = ["".join(rnd.choice(LETTERS) for _ in range(rnd.randint(3, 7))) for _ in range(vocab_size)]
+
+    def word() -> str:
+        return vocab[rnd.randrange(common)] if rnd.random() < common_ratio else vocab[rnd.randrange(vocab_size)]
+
+    def claim() -> dict:
+        return {"text": " ".join(word() for _ in range(rnd.randint(6, 15)))}
+
+    a = [claim() for _ in range(n)]
+    b = [claim() for _ in range(n)]
+    for k in range(0, n, dup_every):
+        b[k] = a[k]
+    return a, b
+
+
+def run_method(method: str, claims_a: list[dict], claims_b: list[dict]) -> tuple[float, int]:
+    agent = CrossReferenceAgent()
+    t = time.perf_counter()
+    r = asyncio.run(agent.run(UnifiedRunContext(), {"claims_a": claims_a, "claims_b": claims_b, "method": method}))
+    elapsed = time.perf_counter() - t
+    if not r.success:
+        raise RuntimeError(f"{method}: {r.errors}")
+    return elapsed, r.output["cross_ref_count"]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--methods", default="term_overlap,inverted_index,tfidf,embedding")
+    ap.add_argument("--max-loop", type=int, default=1000)
+    args = ap.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    methods = args.methods.split(",")
+
+    loop_ref = None
+    print(f"{'claims/side':>12} {'method':>16} {'seconds':>10} {'refs':>10}")
+    for n in sizes:
+        claims_a, claims_b = make_claims(n, seed=n)
+        for method in methods:
+            if method == "term_overlap" and n > args.max_loop:
+                if loop_ref:
+                    m, secs = loop_ref
+                    print(f"{n:>12} {method:>16} {secs * (n / m) ** 2:>9.0f}* {'-':>10}")
+                continue
+            secs, refs = run_method(method, claims_a, claims_b)
+            if method == "term_overlap":
+                loop_ref = (n, secs)
+            print(f"{n:>12} {method:>16} {secs:>10.2f} {refs:>10}", flush=True)
+    print("* extrapolated (quadratic) from the largest measured all-pairs run")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark: sharded parallel inverted-index cross-referencing, 1 → N worker processes.
+
+    python benchmarks/bench_crossref_parallel.py [--claims 20000] [--workers 1,2,4,8]
+
+Every parallel run is checked against the sequential overlap_pairs output.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_crossref import make_claims
+from agents.agt03_cross_reference import CrossReferenceAgent
+from crossref.inverted_index import TermIndex, overlap_pairs
+from crossref.parallel import parallel_overlap_pairs
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--claims", type=int, default=20_000)
+    ap.add_argument("--workers", default=",".join(str(w) for w in (1, 2, 4, 8) if w <= (os.cpu_count() or 1)) or "1")
+    args = ap.parse_args()
+
+    agent = CrossReferenceAgent()
+    claims_a, claims_b = make_claims(args.claims, seed=args.claims)
+    terms_a = [frozenset(agent._extract_terms(c["text"])) for c in claims_a]
+    terms_b = [frozenset(agent._extract_terms(c["text"])) for c in claims_b]
+
+    t = time.perf_counter()
+    index_b = TermIndex()
+    index_b.extend(terms_b)
+    expected = list(overlap_pairs(terms_a, index_b, 0.3))
+    base = time.perf_counter() - t
+    print(f"cpus={os.cpu_count()} claims/side={args.claims}")
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    print(f"{'seq':>8} {base:>9.2f} {1.0:>8.2f}")
+    for w in (int(x) for x in args.workers.split(",")):
+        t = time.perf_counter()
+        got = list(parallel_overlap_pairs(terms_a, terms_b, 0.3, workers=w))
+        secs = time.perf_counter() - t
+        if got != expected:
+            raise RuntimeError(f"workers={w}: output differs from sequential")
+        print(f"{w:>8} {secs:>9.2f} {base / secs:>8.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
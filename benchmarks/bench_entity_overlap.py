@@ -0,0 +1,72 @@
+"""
+Benchmark: overlap resolution + EntityMention memory on a 100k-mention document.
+
+    python benchmarks/bench_entity_overlap.py [n_mentions]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.agt02_entity_linking import EntityMention
+from entities.overlap import resolve_overlaps
+
+
+class DictMention:
+    """Pre-__slots__ layout, for comparison"""
+
+    def __init__(self, text, entity_type, confidence, canonical_start, canonical_end, source_id, suggested_id=None):
+        self.text = text
+        self.entity_type = entity_type
+        self.confidence = confidence
+        self.canonical_start = canonical_start
+        self.canonical_end = canonical_end
+        self.source_id = source_id
+        self.suggested_id = suggested_id
+        self.approved = False
+
+
+def make_spans(n: int, seed: int = 7) -> list[tuple[int, int, float]]:
+    rnd = random.Random(seed)
+    spans = []
+    pos = 0
+    while len(spans) < n:
+        length = rnd.randint(3, 20)
+        pos += length + rnd.randint(1, 40)
+        spans.append((pos, pos + length, rnd.choice((0.6, 0.85))))
+        # ~30% get overlapping / duplicate matches from other patterns
+        if rnd.random() < 0.3:
+            spans.append((pos + rnd.randint(0, 2), pos + length, 0.6))
+    return spans[:n]
+
+
+def measure_memory(cls, spans) -> int:
+    tracemalloc.start()
+    objs = [cls("ابن خلدون", "person", c, s, e, "doc") for s, e, c in spans]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return size
+
+
+def main(n: int = 100_000) -> None:
+    spans = make_spans(n)
+    dict_mem = measure_memory(DictMention, spans)
+    slot_mem = measure_memory(EntityMention, spans)
+    print(f"mentions: {n}")
+    print(f"memory  dict-based: {dict_mem / 1e6:.1f} MB  __slots__: {slot_mem / 1e6:.1f} MB")
+
+    mentions = [EntityMention("ابن خلدون", "person", c, s, e, "doc") for s, e, c in spans]
+    t = time.perf_counter()
+    kept = resolve_overlaps(mentions)
+    elapsed = time.perf_counter() - t
+    print(f"resolve_overlaps: {elapsed * 1000:.0f} ms  kept {len(kept)} / {n}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
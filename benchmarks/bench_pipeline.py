@@ -0,0 +1,121 @@
+"""
+Benchmark: per-invocation pipeline overhead, compile-every-call vs cached graph.
+
+    python benchmarks/bench_pipeline.py [--passages 100] [--variant extended] [--session-events 0]
+    python benchmarks/bench_pipeline.py --passages 1000 --concurrency 1 8 32
+    python benchmarks/bench_pipeline.py --passages 100000 --processes 1 4 8
+
+Each passage is a short synthetic Arabic paragraph (see make_passages).
+--session-events seeds one run context shared by all passages, as a long-lived session
+would have, and compares the run_ctx_dict state round-trip with the live context.
+--concurrency runs the corpus through pipelines.batch.run_many at each level;
+--processes through pipelines.parallel.run_corpus_processes with that many workers.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from importlib import import_module
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.run_context import UnifiedRunContext
+from pipelines.batch import run_many
+from pipelines.context import live_config
+from pipelines.parallel import run_corpus_processes
+from pipelines.runner import VARIANTS, PipelineRunner, compiled_pipeline, initial_state
+
+SUBJECTS = ["ابن خلدون", "الغزالي", "ابن رشد", "الفارابي", "ابن سينا", "الماوردي"]
+PREDICATES = ["أن العصبية أساس الملك", "أن الدولة تمر بأطوار", "أن العمران البشري ضروري",
+              "أن العلم صناعة", "أن الظلم مؤذن بخراب العمران", "أن البداوة أصل الحضارة"]
+
+
+def make_passages(n: int, seed: int = 0, sentences: tuple[int, int] = (2, 6)) -> list[str]:
+    rnd = random.Random(seed)
+    return [" ".join(f"قال {rnd.choice(SUBJECTS)} {rnd.choice(PREDICATES)}."
+                     for _ in range(rnd.randint(*sentences))) for _ in range(n)]
+
+
+async def per_call_compile(variant: str, passages: list[str]) -> float:
+    module, builder = VARIANTS[variant]
+    build = getattr(import_module(module), builder)
+    t = time.perf_counter()
+    for k, text in enumerate(passages):
+        await build().compile().ainvoke(initial_state(text, f"p{k}"))
+    return time.perf_counter() - t
+
+
+async def cached(variant: str, passages: list[str]) -> float:
+    runner = PipelineRunner(variant)
+    t = time.perf_counter()
+    for k, text in enumerate(passages):
+        await runner.run(text, f"p{k}")
+    return time.perf_counter() - t
+
+
+def session_context(events: int) -> UnifiedRunContext:
+    ctx = UnifiedRunContext()
+    for k in range(events):
+        ctx.record_audit("seed", "bench", {"k": k})
+    return ctx
+
+
+async def round_trip(variant: str, passages: list[str], events: int) -> float:
+    """Nodes rebuild the context from run_ctx_dict and serialize it back (no live context)."""
+    app = compiled_pipeline(variant)
+    ctx_dict = session_context(events).model_dump(mode="json")
+    t = time.perf_counter()
+    for k, text in enumerate(passages):
+        state = dict(initial_state(text, f"p{k}"), run_ctx_dict=ctx_dict)
+        ctx_dict = (await app.ainvoke(state))["run_ctx_dict"]
+    return time.perf_counter() - t
+
+
+async def live(variant: str, passages: list[str], events: int) -> float:
+    runner, ctx = PipelineRunner(variant), session_context(events)
+    t = time.perf_counter()
+    for k, text in enumerate(passages):
+        await runner.app.ainvoke(initial_state(text, f"p{k}"), live_config(ctx))
+    return time.perf_counter() - t
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--passages", type=int, default=100)
+    ap.add_argument("--variant", default="extended", choices=sorted(VARIANTS))
+    ap.add_argument("--session-events", type=int, default=0)
+    ap.add_argument("--concurrency", type=int, nargs="*")
+    ap.add_argument("--processes", type=int, nargs="*")
+    args = ap.parse_args()
+    passages = make_passages(args.passages)
+    if args.processes:
+        for w in args.processes:
+            _, summary = run_corpus_processes(passages, w, args.variant, fields=("pipeline_success",))
+            print(f"processes {w}: {summary.as_dict()}")
+        return
+    if args.concurrency:
+        for c in args.concurrency:
+            _, summary = asyncio.run(run_many(passages, c, PipelineRunner(args.variant)))
+            print(f"concurrency {c}: {summary.as_dict()}")
+        return
+    if args.session_events:
+        copied = asyncio.run(round_trip(args.variant, passages, args.session_events))
+        shared = asyncio.run(live(args.variant, passages, args.session_events))
+        n = len(passages)
+        print(f"{args.variant}: {n} passages, session context seeded with {args.session_events} audit events")
+        print(f"state round-trip {copied * 1000 / n:.2f} ms/passage   live context {shared * 1000 / n:.2f} ms/passage")
+        return
+    before = asyncio.run(per_call_compile(args.variant, passages))
+    after = asyncio.run(cached(args.variant, passages))
+    n = len(passages)
+    print(f"{args.variant}: {n} passages")
+    print(f"compile per call {before * 1000 / n:.2f} ms/passage   cached {after * 1000 / n:.2f} ms/passage"
+          f"   saved {(before - after) * 1000 / n:.2f} ms/passage")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,5 +2,6 @@
 from .models import TextSpan, Evidence, Claim, AutonomyLevel, RiskTier, OperationInput, OperationOutput
 from .run_context import UnifiedRunContext, BudgetEnvelope
 from .canonical_policy import canonicalize, CanonicalPolicy, make_canonical_span, text_hash, POLICY_VERSION
+from .terms import TermExtractor, light_stem, default_extractor, STOP_WORDS
 from .base_agent import BaseAgent, AgentCard, AgentResult
 from .exceptions import *
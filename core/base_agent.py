@@ -5,7 +5,7 @@ IQRA-12 BaseAgent v2 — Brain-Perception-Action Pattern
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 from uuid import uuid4
 from pydantic import BaseModel, Field
 from .models import (
@@ -54,14 +54,21 @@ class BaseAgent(ABC):
 
     async def run(self, run_ctx: UnifiedRunContext, params: dict[str, Any] = {}) -> AgentResult:
         """التنفيذ الرئيسي: إدراك → دماغ → فعل"""
-        start = datetime.utcnow()
-        try:
+        async def steps() -> dict[str, Any]:
             # 1. إدراك (Perception)
             perceived = await self.perceive(params)
             # 2. دماغ (Brain) — تخطيط + تفكير + قرار
             plan = await self.think(perceived, run_ctx)
             # 3. فعل (Action)
-            result = await self.act(plan, run_ctx)
+            return await self.act(plan, run_ctx)
+        return await self._execute(run_ctx, steps)
+
+    async def _execute(self, run_ctx: UnifiedRunContext,
+                       steps: Callable[[], Awaitable[dict[str, Any]]]) -> AgentResult:
+        """توقيت + AgentResult موحدة (نجاح أو أخطاء) لأي مسار تنفيذ في الوكيل"""
+        start = datetime.utcnow()
+        try:
+            result = await steps()
             elapsed = int((datetime.utcnow() - start).total_seconds() * 1000)
             return AgentResult(
                 agent_id=self.card.agent_id,
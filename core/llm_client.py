@@ -42,6 +42,11 @@ def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
     return (input_tokens * costs["input"] + output_tokens * costs["output"]) / 1000
 
 
+def estimate_tokens(text: str) -> int:
+    # Rough pre-call estimate: Arabic tokenizes at ~3 chars/token
+    return max(1, len(text) // 3)
+
+
 class UnifiedLLMClient:
     """Client موحد يدعم Vertex AI و Claude مع تتبع التكلفة"""
 
@@ -0,0 +1,100 @@
+"""IQRAA V2 — Term Extraction.
+
+Canonical text → content terms for cross-referencing and search:
+stopword removal + rule-based Arabic light stemming (article and clitic
+stripping, after Larkey's light10), so that "الحضارة" and "حضارة" meet.
+
+Results are memoized per text (LRU) and per claim id; one shared
+extractor serves AGT-03 and any search feature built on the same terms.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+
+from .canonical_policy import CanonicalPolicy, canonicalize
+
+
+STOP_WORDS = frozenset({
+    "في", "من", "الى", "على", "عن", "ان", "لا", "ما", "هو", "هي",
+    "كل", "بل", "او", "اذا", "لم", "قد", "بد", "له", "بها",
+})
+
+# longest first; a prefix is stripped only if ≥ 2 letters remain
+_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+# tried in order, each at most once, while ≥ 3 letters remain
+_SUFFIXES = ("ها", "ان", "ات", "ون", "ين", "يه", "ية", "ه", "ة", "ي")
+
+
+def light_stem(word: str) -> str:
+    """Strip conjunction و, the article with its proclitics, and common suffixes."""
+    if len(word) >= 4 and word[0] == "و":
+        word = word[1:]
+    for p in _PREFIXES:
+        if word.startswith(p) and len(word) - len(p) >= 2:
+            word = word[len(p):]
+            break
+    for s in _SUFFIXES:
+        if word.endswith(s) and len(word) - len(s) >= 3:
+            word = word[:-len(s)]
+    return word
+
+
+_cached_stem = lru_cache(maxsize=262_144)(light_stem)  # vocabularies are far smaller than corpora
+
+
+class TermExtractor:
+    """text → tuple of terms; LRU memo on text, bounded cache on claim id."""
+
+    def __init__(self, policy: Optional[CanonicalPolicy] = None, stem: bool = True,
+                 min_length: int = 3, memo_size: int = 65_536, claim_cache_size: int = 262_144):
+        self.policy = policy or CanonicalPolicy()
+        self.stem = stem
+        self.min_length = min_length
+        self.claim_cache_size = claim_cache_size
+        self._claims: OrderedDict[str, tuple[str, tuple[str, ...]]] = OrderedDict()
+        self.terms = lru_cache(maxsize=memo_size)(self._extract)
+
+    def _extract(self, text: str) -> tuple[str, ...]:
+        # canonicalize is idempotent, so already-canonical text is safe here; memo hits skip it
+        out = []
+        for w in canonicalize(text, self.policy).split():
+            if len(w) < self.min_length or w in STOP_WORDS:
+                continue
+            if self.stem:
+                w = _cached_stem(w)
+                if w in STOP_WORDS:
+                    continue
+            out.append(w)
+        return tuple(out)
+
+    def claim_terms(self, claim: Any) -> tuple[str, ...]:
+        """Terms of a claim (dict or Claim), cached by claim_id while its text is unchanged."""
+        if isinstance(claim, dict):
+            claim_id, text = claim.get("claim_id"), claim.get("text", "")
+        else:
+            claim_id, text = getattr(claim, "claim_id", None), claim.text
+        if claim_id is None:
+            return self.terms(text)
+        hit = self._claims.get(claim_id)
+        if hit is not None and hit[0] == text:
+            self._claims.move_to_end(claim_id)
+            return hit[1]
+        terms = self.terms(text)
+        self._claims[claim_id] = (text, terms)
+        if len(self._claims) > self.claim_cache_size:
+            self._claims.popitem(last=False)
+        return terms
+
+    def cache_info(self) -> dict:
+        info = self.terms.cache_info()
+        return {"text_hits": info.hits, "text_misses": info.misses, "text_size": info.currsize,
+                "claims_cached": len(self._claims)}
+
+
+@lru_cache(maxsize=None)
+def default_extractor() -> TermExtractor:
+    """Process-wide extractor for the default policy (shared caches)."""
+    return TermExtractor()
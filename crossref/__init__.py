@@ -0,0 +1,8 @@
+"""IQRAA V2 Cross-Reference Package — فهارس ومحركات المراجع التقاطعية (AGT-03)"""
+from .inverted_index import TermIndex, overlap_pairs, overlap_score
+from .minhash import MinHasher, LSHIndex, estimate_jaccard, token_hash
+from .tfidf import TfidfSimilarityEngine
+from .embeddings import EmbeddingBackend, HashedNgramEmbedder
+from .ann import IVFIndex
+from .registry import CrossRefRegistry, PairMatch
+from .parallel import parallel_overlap_pairs, SharedPostings
@@ -0,0 +1,265 @@
+"""
+IQRAA V2 — Local Approximate Nearest-Neighbour Index (IVF)
+============================================================
+فهرس IVF (inverted file) لمتجهات مطبّعة: k-means كروي يقسم المتجهات إلى قوائم،
+والاستعلام يفحص n_probe قائمة فقط — زمن الاستعلام محدود بـ n_probe · N / n_lists
+بدل المسح الكامل.
+
+- NumPy فقط؛ بلا خدمات خارجية
+- يُحفظ في SQLite ويُحدَّث تدريجياً: المتجهات الجديدة تُسند لأقرب مركز دون إعادة تدريب
+"""
+from __future__ import annotations
+
+import math
+import sqlite3
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # required at use time, not import time
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("ANN index requires numpy")
+
+
+_ASSIGN_CHUNK = 8192
+
+
+class IVFIndex:
+    """Inner-product IVF index over L2-normalized float32 vectors.
+
+    n_lists defaults to ≈ √N at training time; with n_probe ≥ n_lists search is exact.
+    Keys are caller-chosen strings (e.g. "source_id#claim_idx").
+    """
+
+    def __init__(self, dim: int, n_lists: Optional[int] = None, n_probe: int = 8,
+                 train_iters: int = 10, seed: int = 0, fingerprint: str = ""):
+        _require_numpy()
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_iters = train_iters
+        self.seed = seed
+        self.fingerprint = fingerprint
+        self.keys: list[str] = []
+        self.sources: list[str] = []
+        self._key_num: dict[str, int] = {}
+        self._data = np.zeros((0, dim), dtype=np.float32)
+        self._n = 0
+        self.centroids: Optional["np.ndarray"] = None
+        self._lists: list[array] = []
+        self._list_of: array = array("i")
+        self._saved = 0
+        self._centroids_saved = False
+        self._path: Optional[Path] = None  # database the two flags above are relative to
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_num
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def vectors(self) -> "np.ndarray":
+        return self._data[:self._n]
+
+    # --- build ---
+    def add(self, source_id: str, keys: Sequence[str], vectors: "np.ndarray") -> int:
+        """Add vectors of one source; already-indexed keys are skipped."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        rows = [r for r, k in enumerate(keys) if k not in self._key_num]
+        if not rows:
+            return 0
+        vectors = vectors[rows]
+        self._reserve(self._n + len(rows))
+        start = self._n
+        self._data[start:start + len(rows)] = vectors
+        for r in rows:
+            self._key_num[keys[r]] = len(self.keys)
+            self.keys.append(keys[r])
+            self.sources.append(source_id)
+        self._n += len(rows)
+        if self.trained:
+            self._assign_range(start, self._n)
+        return len(rows)
+
+    def _reserve(self, n: int) -> None:
+        if n > len(self._data):
+            grown = np.zeros((max(n, 2 * len(self._data), 1024), self.dim), dtype=np.float32)
+            grown[:self._n] = self._data[:self._n]
+            self._data = grown
+
+    def train(self, sample_size: int = 50_000) -> None:
+        """Spherical k-means on (a sample of) the stored vectors, then assign every vector."""
+        if self._n == 0:
+            raise ValueError("IVF: cannot train an empty index")
+        rng = np.random.default_rng(self.seed)
+        n_lists = min(self.n_lists or max(1, int(math.sqrt(self._n))), self._n)
+        sample = self.vectors
+        if self._n > sample_size:
+            sample = sample[np.sort(rng.choice(self._n, sample_size, replace=False))]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(self.train_iters):
+            labels = self._nearest(sample, centroids)
+            sums = np.zeros(centroids.shape, dtype=np.float32)
+            for s in range(0, len(sample), _ASSIGN_CHUNK):  # one-hot matmul: far faster than add.at
+                chunk = labels[s:s + _ASSIGN_CHUNK]
+                onehot = np.zeros((n_lists, len(chunk)), dtype=np.float32)
+                onehot[chunk, np.arange(len(chunk))] = 1.0
+                sums += onehot @ sample[s:s + _ASSIGN_CHUNK]
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            if empty.any():  # re-seed empty lists from random points
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+                norms = np.linalg.norm(sums, axis=1)
+            centroids = (sums / np.where(norms > 0, norms, 1.0)[:, None]).astype(np.float32)
+        self.n_lists = n_lists
+        self.centroids = centroids
+        self._centroids_saved = False
+        self._lists = [array("i") for _ in range(n_lists)]
+        self._list_of = array("i")
+        self._saved = 0  # every assignment changed
+        self._assign_range(0, self._n)
+
+    @staticmethod
+    def _nearest(vectors: "np.ndarray", centroids: "np.ndarray") -> "np.ndarray":
+        labels = np.empty(len(vectors), dtype=np.int64)
+        for s in range(0, len(vectors), _ASSIGN_CHUNK):
+            labels[s:s + _ASSIGN_CHUNK] = np.argmax(vectors[s:s + _ASSIGN_CHUNK] @ centroids.T, axis=1)
+        return labels
+
+    def _assign_range(self, start: int, stop: int) -> None:
+        labels = self._nearest(self._data[start:stop], self.centroids)
+        for num, label in enumerate(labels.tolist(), start):
+            self._lists[label].append(num)
+            self._list_of.append(label)
+
+    # --- query ---
+    def search(self, queries: "np.ndarray", k: int = 10, min_score: float = -1.0,
+               exclude_source: Optional[str] = None,
+               n_probe: Optional[int] = None, stats: Optional[Counter] = None) -> list[list[tuple[str, float]]]:
+        """Top-k (key, inner product) per query row, best first.
+
+        stats["pairs_scored"] counts the (query, vector) products computed in the probed lists.
+        """
+        if self._n == 0:
+            return [[] for _ in range(len(queries))]
+        if not self.trained:
+            self.train()
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        probe = min(n_probe or self.n_probe, self.n_lists)
+        coarse = queries @ self.centroids.T
+        if probe < self.n_lists:
+            probed = np.argpartition(-coarse, probe - 1, axis=1)[:, :probe]
+        else:
+            probed = np.broadcast_to(np.arange(self.n_lists), (len(queries), self.n_lists))
+        # list-major: every probed list is scanned once for all queries that probe it
+        q_parts, n_parts, s_parts = [], [], []
+        flat_q = np.repeat(np.arange(len(queries)), probed.shape[1])
+        flat_l = probed.reshape(-1)
+        order = np.argsort(flat_l, kind="stable")
+        flat_q, flat_l = flat_q[order], flat_l[order]
+        bounds = np.flatnonzero(np.r_[True, flat_l[1:] != flat_l[:-1], True])
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            nums = np.frombuffer(self._lists[int(flat_l[lo])], dtype=np.int32)
+            if exclude_source is not None:
+                nums = nums[np.fromiter((self.sources[n] != exclude_source for n in nums.tolist()),
+                                        dtype=bool, count=len(nums))]
+            if len(nums) == 0:
+                continue
+            qs = flat_q[lo:hi]
+            scores = queries[qs] @ self._data[nums].T  # (queries, list members)
+            if stats is not None:
+                stats["pairs_scored"] += scores.size
+            cols = np.arange(len(nums))[None, :]
+            if len(nums) > k:  # keep at most k per query from each list
+                cols = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, cols, axis=1)
+            keep = scores >= min_score
+            q_parts.append(np.broadcast_to(qs[:, None], scores.shape)[keep])
+            n_parts.append(np.broadcast_to(nums[cols], scores.shape)[keep])
+            s_parts.append(scores[keep])
+        results: list[list[tuple[str, float]]] = [[] for _ in range(len(queries))]
+        if not q_parts:
+            return results
+        qs, nums, scores = np.concatenate(q_parts), np.concatenate(n_parts), np.concatenate(s_parts)
+        for q, num, score in zip(*(x[np.lexsort((nums, -scores, qs))].tolist() for x in (qs, nums, scores))):
+            if len(results[q]) < k:
+                results[q].append((self.keys[num], score))
+        return results
+
+    # --- persistence ---
+    def save(self, path: str | Path) -> None:
+        """Append vectors added since the last save or load of the same path
+        (everything after a re-train, or for a different path)."""
+        path = Path(path).resolve()
+        if path != self._path:
+            self._saved, self._centroids_saved = 0, False
+        con = sqlite3.connect(str(path))
+        try:
+            with con:
+                con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                con.execute("CREATE TABLE IF NOT EXISTS centroids (list_id INTEGER PRIMARY KEY, vec BLOB)")
+                con.execute("CREATE TABLE IF NOT EXISTS vectors (num INTEGER PRIMARY KEY, key TEXT UNIQUE, "
+                            "source_id TEXT, list_id INTEGER, vec BLOB)")
+                con.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                    ("dim", str(self.dim)), ("n_lists", str(self.n_lists or 0)), ("n_probe", str(self.n_probe)),
+                    ("seed", str(self.seed)), ("fingerprint", self.fingerprint)])
+                if self.trained and not self._centroids_saved:
+                    con.execute("DELETE FROM centroids")
+                    con.executemany("INSERT INTO centroids VALUES (?, ?)",
+                                    ((l, self.centroids[l].tobytes()) for l in range(self.n_lists)))
+                if self._saved < self._n:
+                    con.execute("DELETE FROM vectors WHERE num >= ?", (self._saved,))
+                con.executemany("INSERT INTO vectors VALUES (?, ?, ?, ?, ?)", (
+                    (num, self.keys[num], self.sources[num],
+                     self._list_of[num] if self.trained else -1, self._data[num].tobytes())
+                    for num in range(self._saved, self._n)))
+        finally:
+            con.close()
+        self._saved = self._n
+        self._centroids_saved = self.trained
+        self._path = path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "IVFIndex":
+        _require_numpy()
+        con = sqlite3.connect(str(path))
+        try:
+            meta = dict(con.execute("SELECT key, value FROM meta"))
+            idx = cls(int(meta["dim"]), n_lists=int(meta["n_lists"]) or None, n_probe=int(meta["n_probe"]),
+                      seed=int(meta["seed"]), fingerprint=meta.get("fingerprint", ""))
+            cents = [blob for _, blob in con.execute("SELECT list_id, vec FROM centroids ORDER BY list_id")]
+            rows = con.execute("SELECT key, source_id, list_id, vec FROM vectors ORDER BY num").fetchall()
+        finally:
+            con.close()
+        idx._reserve(len(rows))
+        for num, (key, source_id, list_id, blob) in enumerate(rows):
+            idx._data[num] = np.frombuffer(blob, dtype=np.float32)
+            idx._key_num[key] = num
+            idx.keys.append(key)
+            idx.sources.append(source_id)
+        idx._n = len(rows)
+        if cents:
+            idx.centroids = np.stack([np.frombuffer(b, dtype=np.float32) for b in cents])
+            idx.n_lists = len(cents)
+            idx._lists = [array("i") for _ in cents]
+            for num, (_, _, list_id, _) in enumerate(rows):
+                if list_id < 0:  # added before training; assign now
+                    list_id = int(np.argmax(idx.centroids @ idx._data[num]))
+                idx._lists[list_id].append(num)
+                idx._list_of.append(list_id)
+            idx._centroids_saved = True
+        idx._saved = idx._n
+        idx._path = Path(path).resolve()
+        return idx
@@ -0,0 +1,98 @@
+"""
+IQRAA V2 — Embedding Backends
+===============================
+واجهة موحدة لتحويل نصوص الادعاءات إلى متجهات كثيفة مطبّعة L2.
+
+- HashedNgramEmbedder (الافتراضي): n-grams حرفية داخل الكلمات، مُجزّأة (hashing trick)
+  إلى بعد ثابت — محلي بالكامل، بلا شبكة ولا GPU، ونتائجه ثابتة بين العمليات
+- أي نموذج آخر (محلي أو عبر API) يُضاف بتنفيذ EmbeddingBackend.embed
+"""
+from __future__ import annotations
+
+import zlib
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # required at use time, not import time
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("embedding backends require numpy")
+
+
+class EmbeddingBackend(ABC):
+    """texts → float32 array of shape (len(texts), dim), rows L2-normalized (zero rows allowed)."""
+
+    name: str = "base"
+    dim: int = 0
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        ...
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the vector space; indexes built with a different fingerprint are incompatible."""
+        return f"{self.name}:{self.dim}"
+
+
+class HashedNgramEmbedder(EmbeddingBackend):
+    """Signed feature hashing of character n-grams of each word padded with spaces.
+
+    n-grams inside word boundaries tolerate clitics and inflection (ابن خلدون / لابن خلدون),
+    which is the kind of paraphrase exact term overlap misses.
+    """
+
+    name = "hashed_ngram"
+
+    def __init__(self, dim: int = 512, ngram_range: tuple[int, int] = (2, 4), sublinear_tf: bool = True):
+        _require_numpy()
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.sublinear_tf = sublinear_tf
+        self._gram_cache: dict[str, tuple[int, ...]] = {}
+
+    @property
+    def fingerprint(self) -> str:
+        lo, hi = self.ngram_range
+        return f"{self.name}:{self.dim}:{lo}-{hi}:{int(self.sublinear_tf)}"
+
+    def _word_features(self, word: str) -> tuple[int, ...]:
+        """Signed bucket ids (bucket + 1, negated for sign -1) of one word's n-grams."""
+        cached = self._gram_cache.get(word)
+        if cached is None:
+            padded = f" {word} "
+            lo, hi = self.ngram_range
+            feats = []
+            for n in range(lo, hi + 1):
+                for k in range(len(padded) - n + 1):
+                    h = zlib.crc32(padded[k:k + n].encode("utf-8"))
+                    bucket = (h >> 1) % self.dim + 1
+                    feats.append(bucket if h & 1 else -bucket)
+            cached = tuple(feats)
+            if len(self._gram_cache) < 200_000:
+                self._gram_cache[word] = cached
+        return cached
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        rows: list[int] = []
+        feats: list[int] = []
+        for r, text in enumerate(texts):
+            before = len(feats)
+            for word in text.split():
+                feats.extend(self._word_features(word))
+            rows.extend([r] * (len(feats) - before))
+        f = np.array(feats, dtype=np.int64)
+        flat = np.array(rows, dtype=np.int64) * self.dim + np.abs(f) - 1
+        out = np.bincount(flat, weights=np.sign(f).astype(np.float64),
+                          minlength=len(texts) * self.dim).reshape(len(texts), self.dim)
+        if self.sublinear_tf:
+            out = np.sign(out) * np.log1p(np.abs(out))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        out /= np.where(norms > 0, norms, 1.0)
+        return out.astype(np.float32)
+
@@ -0,0 +1,72 @@
+"""
+IQRAA V2 — Term Inverted Index for Cross-Referencing
+======================================================
+بدل مقارنة كل ادعاء بكل ادعاء (N·M): كل طرف يُقطَّع مرة واحدة،
+ويُبنى فهرس مصطلح → ادعاءات، ولا تُقيَّم إلا الأزواج المشتركة في مصطلح واحد على الأقل.
+
+النتيجة مطابقة لوضع term_overlap: الأزواج بلا مصطلح مشترك درجتها 0 أصلاً.
+"""
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from typing import Iterable, Iterator, Optional, Sequence
+
+
+def overlap_score(terms_a: frozenset, terms_b: frozenset) -> float:
+    """The AGT-03 term-overlap score: |a ∩ b| / max(|a|, |b|)."""
+    if not terms_a or not terms_b:
+        return 0.0
+    return len(terms_a & terms_b) / max(len(terms_a), len(terms_b))
+
+
+class TermIndex:
+    """term → sorted claim numbers; claims are numbered in insertion order."""
+
+    def __init__(self):
+        self.term_sets: list[frozenset] = []
+        self.postings: dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.term_sets)
+
+    def add(self, terms: Iterable[str]) -> int:
+        num = len(self.term_sets)
+        term_set = frozenset(terms)
+        self.term_sets.append(term_set)
+        for t in term_set:
+            self.postings.setdefault(t, array("i")).append(num)
+        return num
+
+    def extend(self, term_sets: Iterable[Iterable[str]]) -> None:
+        for terms in term_sets:
+            self.add(terms)
+
+    def shared_counts(self, terms: frozenset) -> dict[int, int]:
+        """claim number → number of shared terms, for claims sharing at least one."""
+        counts: dict[int, int] = {}
+        postings = self.postings
+        for t in terms:
+            for num in postings.get(t, ()):
+                counts[num] = counts.get(num, 0) + 1
+        return counts
+
+
+def overlap_pairs(terms_a: Sequence[frozenset], index_b: TermIndex, threshold: float,
+                  stats: Optional[Counter] = None) -> Iterator[tuple[int, int, float, frozenset]]:
+    """(i, j, overlap, shared) for every pair with overlap ≥ threshold, in (i, j) order.
+
+    stats["pairs_scored"] counts the candidate pairs (sharing a term) that were scored.
+    """
+    term_sets_b = index_b.term_sets
+    for i, ta in enumerate(terms_a):
+        if not ta:
+            continue
+        la = len(ta)
+        counts = index_b.shared_counts(ta)
+        if stats is not None:
+            stats["pairs_scored"] += len(counts)
+        for j in sorted(counts):
+            overlap = counts[j] / max(la, len(term_sets_b[j]))
+            if overlap >= threshold:
+                yield i, j, overlap, ta & term_sets_b[j]
@@ -0,0 +1,206 @@
+"""
+IQRAA V2 — MinHash / LSH Near-Duplicate Index
+===============================================
+بصمة MinHash لكل ادعاء (تُحسب مرة واحدة) + فهرس LSH بالأشرطة (bands)
+لاسترجاع مرشحي التأييد لادعاء ما في زمن دون خطي أمام المدونة كلها.
+
+- الحساب متجه عبر NumPy إن توفرت، وإلا مسار Python صرف بنفس النتائج تماماً
+- الفهرس يُحفظ في SQLite ويُحدَّث تدريجياً مع إضافة المصادر
+"""
+from __future__ import annotations
+
+import random
+import sqlite3
+import zlib
+from array import array
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional acceleration
+    np = None
+
+_PRIME = (1 << 31) - 1  # a * x stays below 2**62 → exact in uint64
+_EMPTY = _PRIME  # signature value for an empty shingle set
+_CHUNK_TOKENS = 65_536
+
+
+def token_hash(term: str) -> int:
+    """Process-stable 31-bit hash (str.__hash__ is salted per process)."""
+    return zlib.crc32(term.encode("utf-8")) % _PRIME
+
+
+class MinHasher:
+    """num_perm universal hash functions h(x) = (a·x + b) mod p, fixed by seed."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rnd = random.Random(seed)
+        self.num_perm = num_perm
+        self.seed = seed
+        self.a = [rnd.randrange(1, _PRIME) for _ in range(num_perm)]
+        self.b = [rnd.randrange(0, _PRIME) for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.b, dtype=np.uint64)[:, None]
+
+    def signature(self, terms: Iterable[str]) -> array:
+        return self.signatures([terms])[0]
+
+    def signatures(self, term_sets: Sequence[Iterable[str]]) -> list[array]:
+        """One uint32 signature per term set; vectorized in chunks when NumPy is available."""
+        hashed = [sorted({token_hash(t) for t in terms}) for terms in term_sets]
+        if np is None:
+            return [self._signature_py(xs) for xs in hashed]
+        out: list[array] = []
+        start = 0
+        while start < len(hashed):
+            stop, tokens = start, 0
+            while stop < len(hashed) and (tokens == 0 or tokens + len(hashed[stop]) <= _CHUNK_TOKENS):
+                tokens += len(hashed[stop])
+                stop += 1
+            out.extend(self._signatures_np(hashed[start:stop]))
+            start = stop
+        return out
+
+    def _signature_py(self, xs: list[int]) -> array:
+        if not xs:
+            return array("I", [_EMPTY] * self.num_perm)
+        return array("I", (min((a * x + b) % _PRIME for x in xs) for a, b in zip(self.a, self.b)))
+
+    def _signatures_np(self, hashed: list[list[int]]) -> list[array]:
+        lengths = [len(xs) for xs in hashed]
+        flat = np.fromiter((x for xs in hashed for x in xs), dtype=np.uint64, count=sum(lengths))
+        result = [array("I", [_EMPTY] * self.num_perm) for _ in hashed]
+        if flat.size == 0:
+            return result
+        values = (self._a * flat[None, :] + self._b) % _PRIME  # (num_perm, tokens)
+        offsets = np.cumsum([0] + lengths[:-1])
+        nonempty = [i for i, n in enumerate(lengths) if n]
+        mins = np.minimum.reduceat(values, offsets[nonempty], axis=1).astype(np.uint32)
+        for col, i in enumerate(nonempty):
+            result[i] = array("I", mins[:, col].tobytes())
+        return result
+
+
+def estimate_jaccard(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    if not sig_a:
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures: bands × rows = num_perm.
+
+    Keys are caller-chosen strings (e.g. "source_id#claim_idx").
+    """
+
+    def __init__(self, hasher: Optional[MinHasher] = None, bands: int = 32):
+        self.hasher = hasher or MinHasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError("LSH: num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = self.hasher.num_perm // bands
+        self.keys: list[str] = []
+        self.sources: list[str] = []
+        self.signatures: list[array] = []
+        self._key_num: dict[str, int] = {}
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+        self._saved = 0
+        self._path: Optional[Path] = None  # database _saved is relative to
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_num
+
+    @property
+    def threshold(self) -> float:
+        """Approximate Jaccard at which a pair becomes a candidate with p = 0.5"""
+        return (1 / self.bands) ** (1 / self.rows)
+
+    def _band_keys(self, sig: array) -> Iterable[tuple[int, bytes]]:
+        raw = sig.tobytes()
+        width = self.rows * sig.itemsize
+        for band in range(self.bands):
+            yield band, raw[band * width:(band + 1) * width]
+
+    def _insert(self, key: str, source_id: str, sig: array) -> None:
+        num = len(self.keys)
+        self.keys.append(key)
+        self.sources.append(source_id)
+        self.signatures.append(sig)
+        self._key_num[key] = num
+        if sig[0] == _EMPTY:
+            return
+        for band, bkey in self._band_keys(sig):
+            self._buckets[band].setdefault(bkey, []).append(num)
+
+    def add_many(self, source_id: str, items: Sequence[tuple[str, Iterable[str]]]) -> int:
+        """Add (key, terms) pairs of one source; already-indexed keys are skipped."""
+        items = [(k, t) for k, t in items if k not in self._key_num]
+        sigs = self.hasher.signatures([t for _, t in items])
+        for (key, _), sig in zip(items, sigs):
+            self._insert(key, source_id, sig)
+        return len(items)
+
+    def candidates(self, sig: array, min_jaccard: float = 0.0,
+                   exclude_source: Optional[str] = None) -> list[tuple[str, float]]:
+        """Keys sharing at least one band, with estimated Jaccard ≥ min_jaccard."""
+        if sig[0] == _EMPTY:
+            return []
+        found: set[int] = set()
+        for band, bkey in self._band_keys(sig):
+            found.update(self._buckets[band].get(bkey, ()))
+        out = []
+        for num in found:
+            if exclude_source is not None and self.sources[num] == exclude_source:
+                continue
+            est = estimate_jaccard(sig, self.signatures[num])
+            if est >= min_jaccard:
+                out.append((self.keys[num], est))
+        out.sort(key=lambda kv: (-kv[1], kv[0]))
+        return out
+
+    def query(self, terms: Iterable[str], min_jaccard: float = 0.0,
+              exclude_source: Optional[str] = None) -> list[tuple[str, float]]:
+        return self.candidates(self.hasher.signature(terms), min_jaccard, exclude_source)
+
+    # --- persistence ---
+    def save(self, path: str | Path) -> None:
+        """Append signatures added since the last save or load of the same path;
+        a different path gets everything."""
+        path = Path(path).resolve()
+        if path != self._path:
+            self._saved = 0
+        con = sqlite3.connect(str(path))
+        try:
+            with con:
+                con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                con.execute("CREATE TABLE IF NOT EXISTS signatures (num INTEGER PRIMARY KEY, key TEXT UNIQUE, source_id TEXT, sig BLOB)")
+                con.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                    ("num_perm", str(self.hasher.num_perm)), ("seed", str(self.hasher.seed)), ("bands", str(self.bands))])
+                con.executemany("INSERT OR REPLACE INTO signatures VALUES (?, ?, ?, ?)", (
+                    (num, self.keys[num], self.sources[num], self.signatures[num].tobytes())
+                    for num in range(self._saved, len(self.keys))))
+        finally:
+            con.close()
+        self._saved = len(self.keys)
+        self._path = path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "LSHIndex":
+        con = sqlite3.connect(str(path))
+        try:
+            meta = dict(con.execute("SELECT key, value FROM meta"))
+            idx = cls(MinHasher(int(meta["num_perm"]), int(meta["seed"])), bands=int(meta["bands"]))
+            for key, source_id, blob in con.execute("SELECT key, source_id, sig FROM signatures ORDER BY num"):
+                sig = array("I")
+                sig.frombytes(blob)
+                idx._insert(key, source_id, sig)
+        finally:
+            con.close()
+        idx._saved = len(idx.keys)
+        idx._path = Path(path).resolve()
+        return idx
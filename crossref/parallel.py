@@ -0,0 +1,130 @@
+"""
+IQRAA V2 — Sharded Parallel Cross-Referencing
+===============================================
+مقارنة التداخل (inverted_index) موزعة على مجمع عمليات:
+- postings الطرف B وأطوال ادعاءاته تُبنى مرة واحدة كمصفوفات أعداد صحيحة
+  في ذاكرة مشتركة (shared_memory) للقراءة فقط — لا تُنسخ لكل عامل ولا تُرسل مع كل مهمة
+- ادعاءات الطرف A تُقسَّم كتلاً متصلة (shards) بمعرّفات مصطلحات رقمية
+- النتائج تُدمج بترتيب الكتل، فالناتج مطابق حرفياً للمسار التسلسلي (i, j)
+"""
+from __future__ import annotations
+
+import os
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Iterator, Optional, Sequence
+
+# worker-side views onto the shared block (set by _init_worker)
+_postings_ptr = _postings = _claim_ptr = _claim_terms = None
+_shm: Optional[shared_memory.SharedMemory] = None
+
+
+class SharedPostings:
+    """B side as four int32 arrays in one shared memory block.
+
+    postings_ptr/postings: term id → sorted claim numbers
+    claim_ptr/claim_terms: claim number → sorted term ids (for |b| and shared terms)
+    """
+
+    def __init__(self, vocab: dict[str, int], arrays: Sequence[array]):
+        self.vocab = vocab
+        self.lengths = [len(a) for a in arrays]
+        size = max(1, sum(self.lengths) * 4)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        offset = 0
+        for a in arrays:
+            raw = a.tobytes()
+            self.shm.buf[offset:offset + len(raw)] = raw
+            offset += len(raw)
+
+    @classmethod
+    def build(cls, term_sets_b: Sequence[frozenset]) -> "SharedPostings":
+        vocab: dict[str, int] = {}
+        claim_ptr, claim_terms = array("i", [0]), array("i")
+        for terms in term_sets_b:
+            ids = sorted(vocab.setdefault(t, len(vocab)) for t in terms)
+            claim_terms.extend(ids)
+            claim_ptr.append(len(claim_terms))
+        counts = [0] * len(vocab)
+        for t in claim_terms:
+            counts[t] += 1
+        postings_ptr = array("i", [0])
+        for c in counts:
+            postings_ptr.append(postings_ptr[-1] + c)
+        fill = array("i", postings_ptr[:-1])
+        postings = array("i", bytes(4 * len(claim_terms)))
+        for num in range(len(term_sets_b)):  # claim-number order → postings stay sorted
+            for t in claim_terms[claim_ptr[num]:claim_ptr[num + 1]]:
+                postings[fill[t]] = num
+                fill[t] += 1
+        return cls(vocab, (postings_ptr, postings, claim_ptr, claim_terms))
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _init_worker(shm_name: str, lengths: Sequence[int]) -> None:
+    global _postings_ptr, _postings, _claim_ptr, _claim_terms, _shm
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    views, offset = [], 0
+    for n in lengths:
+        views.append(_shm.buf[offset:offset + 4 * n].cast("i"))
+        offset += 4 * n
+    _postings_ptr, _postings, _claim_ptr, _claim_terms = views
+
+
+def _match_shard(start: int, shard: list[tuple[int, ...]],
+                 threshold: float) -> tuple[int, list[tuple[int, int, float, tuple[int, ...]]]]:
+    """Same scoring as overlap_pairs, on term ids against the shared postings → (pairs scored, matches)."""
+    out, scored = [], 0
+    pp, po, cp, ct = _postings_ptr, _postings, _claim_ptr, _claim_terms
+    for i, ids in enumerate(shard, start):
+        if not ids:
+            continue
+        counts: dict[int, int] = {}
+        for t in ids:
+            if t < 0:
+                continue
+            for num in po[pp[t]:pp[t + 1]]:
+                counts[num] = counts.get(num, 0) + 1
+        scored += len(counts)
+        la = len(ids)
+        id_set = set(ids)
+        for j in sorted(counts):
+            lb = cp[j + 1] - cp[j]
+            overlap = counts[j] / max(la, lb)
+            if overlap >= threshold:
+                out.append((i, j, overlap, tuple(t for t in ct[cp[j]:cp[j + 1]] if t in id_set)))
+    return scored, out
+
+
+def parallel_overlap_pairs(terms_a: Sequence[frozenset], terms_b: Sequence[frozenset], threshold: float,
+                           workers: Optional[int] = None,
+                           shard_size: int = 2000,
+                           stats: Optional[Counter] = None) -> Iterator[tuple[int, int, float, frozenset]]:
+    """overlap_pairs over a process pool; yields exactly what the sequential path yields, in order."""
+    workers = workers or os.cpu_count() or 1
+    shared = SharedPostings.build(terms_b)
+    try:
+        inverse = {v: k for k, v in shared.vocab.items()}
+        # A terms absent from B can never be shared, but still count towards |a|
+        ids_a = [tuple(shared.vocab.get(t, -1) for t in ta) for ta in terms_a]
+        shards = [(s, ids_a[s:s + shard_size]) for s in range(0, len(ids_a), shard_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared.name, shared.lengths)) as pool:
+            futures = [pool.submit(_match_shard, s, shard, threshold) for s, shard in shards]
+            for fut in futures:  # shard order → deterministic (i, j) order
+                scored, matches = fut.result()
+                if stats is not None:
+                    stats["pairs_scored"] += scored
+                for i, j, overlap, shared_ids in matches:
+                    yield i, j, overlap, frozenset(inverse[t] for t in shared_ids)
+    finally:
+        shared.close()
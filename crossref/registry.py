@@ -0,0 +1,155 @@
+"""
+IQRAA V2 — Incremental N-Source Cross-Reference Registry
+==========================================================
+سجل تراكمي للمراجع التقاطعية عبر المدونة: كل مصدر جديد يُقارن مرة واحدة
+بفهرس المصطلحات لكل المصادر السابقة، ثم يُضاف إليه — لا يُعاد حساب أي زوج قديم.
+
+- النتائج مخزنة لكل زوج مصادر (الأحدث، الأقدم) بترقيم الادعاءات المحلي
+- كلفة إضافة مصدر تتناسب مع ادعاءاته وما يطابقه فقط، لا مع عدد الأزواج السابقة
+- تخزين دائم في SQLite، ولا يُكتب إلا الجديد
+"""
+from __future__ import annotations
+
+import sqlite3
+from array import array
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+from .inverted_index import TermIndex, overlap_pairs
+
+_SEP = "\x1f"
+
+
+class PairMatch(NamedTuple):
+    claim_a: int
+    claim_b: int
+    score: float
+    shared: tuple[str, ...]
+
+
+class CrossRefRegistry:
+    """Claims of every registered source in one TermIndex; matches kept per source pair."""
+
+    def __init__(self, threshold: float = 0.3):
+        self.threshold = threshold
+        self.sources: list[str] = []
+        self.index = TermIndex()
+        self._source_seq: dict[str, int] = {}
+        self._claim_source = array("i")  # claim number → source seq
+        self._claim_local = array("i")  # claim number → index within its source
+        self._pairs: dict[tuple[str, str], list[PairMatch]] = {}
+        self._saved_claims = 0
+        self._unsaved_pairs: list[tuple[str, str]] = []
+        self._unsaved_sources: list[str] = []
+        self._path: Optional[Path] = None  # database the unsaved markers are relative to
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def __contains__(self, source_id: str) -> bool:
+        return source_id in self._source_seq
+
+    def add_source(self, source_id: str, term_sets: Sequence[Iterable[str]]) -> Optional[dict[str, list[PairMatch]]]:
+        """Match a new source against all registered ones, then index it.
+
+        Returns older source → matches (claim_a in the new source), or None if already registered.
+        """
+        if source_id in self._source_seq:
+            return None
+        terms = [frozenset(t) for t in term_sets]
+        found: dict[str, list[PairMatch]] = {}
+        if len(self.index):
+            for i, num, score, shared in overlap_pairs(terms, self.index, self.threshold):
+                other = self.sources[self._claim_source[num]]
+                found.setdefault(other, []).append(PairMatch(i, self._claim_local[num], score, tuple(sorted(shared))))
+        seq = len(self.sources)
+        self.sources.append(source_id)
+        self._source_seq[source_id] = seq
+        self._unsaved_sources.append(source_id)
+        for local, t in enumerate(terms):
+            self.index.add(t)
+            self._claim_source.append(seq)
+            self._claim_local.append(local)
+        for other in sorted(found, key=self._source_seq.__getitem__):
+            self._pairs[(source_id, other)] = found[other]  # already in (claim_a, claim_b) order
+            self._unsaved_pairs.append((source_id, other))
+        return found
+
+    def pair(self, source_a: str, source_b: str) -> list[PairMatch]:
+        """Matches between two sources, claim_a always in source_a."""
+        if (source_a, source_b) in self._pairs:
+            return list(self._pairs[(source_a, source_b)])
+        swapped = self._pairs.get((source_b, source_a), [])
+        return sorted((PairMatch(m.claim_b, m.claim_a, m.score, m.shared) for m in swapped),
+                      key=lambda m: (m.claim_a, m.claim_b))
+
+    def partners(self, source_id: str) -> list[str]:
+        """Sources sharing at least one cross-reference with source_id, in registration order."""
+        found = {b for a, b in self._pairs if a == source_id} | {a for a, b in self._pairs if b == source_id}
+        return sorted(found, key=self._source_seq.__getitem__)
+
+    def refs_for(self, source_id: str) -> list[tuple[str, PairMatch]]:
+        """(other source, match) for every cross-reference involving source_id."""
+        return [(other, m) for other in self.partners(source_id) for m in self.pair(source_id, other)]
+
+    # --- persistence ---
+    def save(self, path: str | Path) -> None:
+        """Write sources, claim terms and pair matches added since the last save or load of
+        the same path; a different path is rewritten with everything."""
+        path = Path(path).resolve()
+        full = path != self._path
+        if full:
+            self._saved_claims = 0
+            self._unsaved_sources = list(self.sources)
+            self._unsaved_pairs = list(self._pairs)
+        con = sqlite3.connect(str(path))
+        try:
+            with con:
+                con.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                con.execute("CREATE TABLE IF NOT EXISTS sources (seq INTEGER PRIMARY KEY, source_id TEXT UNIQUE)")
+                con.execute("CREATE TABLE IF NOT EXISTS claims (num INTEGER PRIMARY KEY, seq INTEGER, terms TEXT)")
+                con.execute("CREATE TABLE IF NOT EXISTS pairs (source_a TEXT, source_b TEXT, claim_a INTEGER, "
+                            "claim_b INTEGER, score REAL, shared TEXT)")
+                con.execute("CREATE INDEX IF NOT EXISTS pairs_ab ON pairs (source_a, source_b)")
+                con.execute("INSERT OR REPLACE INTO meta VALUES ('threshold', ?)", (repr(self.threshold),))
+                if full:
+                    for table in ("sources", "claims", "pairs"):
+                        con.execute(f"DELETE FROM {table}")
+                con.executemany("INSERT INTO sources VALUES (?, ?)",
+                                ((self._source_seq[s], s) for s in self._unsaved_sources))
+                con.executemany("INSERT INTO claims VALUES (?, ?, ?)", (
+                    (num, self._claim_source[num], _SEP.join(sorted(self.index.term_sets[num])))
+                    for num in range(self._saved_claims, len(self.index))))
+                con.executemany("INSERT INTO pairs VALUES (?, ?, ?, ?, ?, ?)", (
+                    (a, b, m.claim_a, m.claim_b, m.score, _SEP.join(m.shared))
+                    for a, b in self._unsaved_pairs for m in self._pairs[(a, b)]))
+        finally:
+            con.close()
+        self._saved_claims = len(self.index)
+        self._unsaved_sources.clear()
+        self._unsaved_pairs.clear()
+        self._path = path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CrossRefRegistry":
+        con = sqlite3.connect(str(path))
+        try:
+            meta = dict(con.execute("SELECT key, value FROM meta"))
+            reg = cls(threshold=float(meta["threshold"]))
+            for seq, source_id in con.execute("SELECT seq, source_id FROM sources ORDER BY seq"):
+                reg._source_seq[source_id] = seq
+                reg.sources.append(source_id)
+            local: dict[int, int] = {}
+            for seq, terms in con.execute("SELECT seq, terms FROM claims ORDER BY num"):
+                reg.index.add(terms.split(_SEP) if terms else ())
+                reg._claim_source.append(seq)
+                reg._claim_local.append(local.get(seq, 0))
+                local[seq] = local.get(seq, 0) + 1
+            for a, b, ca, cb, score, shared in con.execute(
+                    "SELECT source_a, source_b, claim_a, claim_b, score, shared FROM pairs ORDER BY rowid"):
+                reg._pairs.setdefault((a, b), []).append(PairMatch(ca, cb, score, tuple(shared.split(_SEP)) if shared else ()))
+        finally:
+            con.close()
+        reg._saved_claims = len(reg.index)
+        reg._path = Path(path).resolve()
+        return reg
@@ -0,0 +1,159 @@
+"""
+IQRAA V2 — Sparse TF-IDF Similarity Engine
+============================================
+تمثيل ادعاءات كل مصدر كمصفوفة TF-IDF متفرقة (CSR) مطبّعة L2،
+ثم ضرب مصفوفات متفرق على دفعات (blocks) لإيجاد كل الأزواج فوق العتبة.
+
+- يتطلب NumPy؛ يستخدم SciPy للضرب إن توفرت، وإلا ضرباً متفرقاً بـ NumPy
+- الناتج أزواج (i, j, cosine) مرتبة — AGT-03 يحوّلها إلى CrossRefResult
+"""
+from __future__ import annotations
+
+import math
+from collections import Counter
+from typing import Iterator, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # required at use time, not import time
+    np = None
+
+try:
+    import scipy.sparse as sp
+except ImportError:  # optional acceleration
+    sp = None
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("TF-IDF engine requires numpy")
+
+
+class CSR(NamedTuple):
+    indptr: "np.ndarray"
+    indices: "np.ndarray"
+    data: "np.ndarray"
+    n_rows: int
+    n_cols: int
+
+
+class TfidfSimilarityEngine:
+    """Cosine similarity of L2-normalized TF-IDF rows, computed blockwise.
+
+    backend: "auto" (SciPy if installed), "scipy" or "numpy".
+    max_products bounds the temporary arrays of one NumPy block.
+    """
+
+    def __init__(self, threshold: float = 0.3, block_rows: int = 2048,
+                 max_products: int = 4_000_000, sublinear_tf: bool = True, backend: str = "auto"):
+        _require_numpy()
+        if backend == "auto":
+            backend = "scipy" if sp is not None else "numpy"
+        if backend == "scipy" and sp is None:
+            raise RuntimeError("TF-IDF engine: scipy backend requested but scipy is not installed")
+        self.threshold = threshold
+        self.block_rows = block_rows
+        self.max_products = max_products
+        self.sublinear_tf = sublinear_tf
+        self.backend = backend
+        self.vocab: dict[str, int] = {}
+        self.idf: Optional["np.ndarray"] = None
+
+    # --- vectorize ---
+    def fit(self, *corpora: Sequence[Sequence[str]]) -> "TfidfSimilarityEngine":
+        """Vocabulary + smoothed idf over all given term lists."""
+        df: Counter = Counter()
+        n_docs = 0
+        for docs in corpora:
+            for terms in docs:
+                df.update(set(terms))
+                n_docs += 1
+        self.vocab = {t: i for i, t in enumerate(sorted(df))}
+        self.idf = np.array([math.log((1 + n_docs) / (1 + df[t])) + 1.0 for t in sorted(df)], dtype=np.float64)
+        return self
+
+    def transform(self, docs: Sequence[Sequence[str]]) -> CSR:
+        indptr = [0]
+        indices: list[int] = []
+        tfs: list[float] = []
+        vocab = self.vocab
+        for terms in docs:
+            counts = Counter(t for t in terms if t in vocab)
+            for t, c in sorted(counts.items(), key=lambda kv: vocab[kv[0]]):
+                indices.append(vocab[t])
+                tfs.append(1.0 + math.log(c) if self.sublinear_tf else float(c))
+            indptr.append(len(indices))
+        indptr_a = np.array(indptr, dtype=np.int64)
+        indices_a = np.array(indices, dtype=np.int64)
+        data = np.array(tfs, dtype=np.float64) * self.idf[indices_a]
+        rows = np.repeat(np.arange(len(docs)), np.diff(indptr_a))
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(docs)))
+        data = data / np.where(norms > 0, norms, 1.0)[rows]
+        return CSR(indptr_a, indices_a, data, len(docs), len(vocab))
+
+    # --- similarity ---
+    def pairs(self, docs_a: Sequence[Sequence[str]], docs_b: Sequence[Sequence[str]],
+              stats: Optional[Counter] = None) -> Iterator[tuple[int, int, float]]:
+        """(i, j, cosine) with cosine ≥ threshold, in (i, j) order.
+
+        stats["pairs_scored"] counts the pairs with a non-zero product (sharing a term).
+        """
+        self.fit(docs_a, docs_b)
+        a, b = self.transform(docs_a), self.transform(docs_b)
+        stats = stats if stats is not None else Counter()
+        if self.backend == "scipy":
+            yield from self._pairs_scipy(a, b, stats)
+        else:
+            yield from self._pairs_numpy(a, b, stats)
+
+    def _pairs_scipy(self, a: CSR, b: CSR, stats: Counter) -> Iterator[tuple[int, int, float]]:
+        ma = sp.csr_matrix((a.data, a.indices, a.indptr), shape=(a.n_rows, a.n_cols))
+        mbt = sp.csr_matrix((b.data, b.indices, b.indptr), shape=(b.n_rows, b.n_cols)).T.tocsr()
+        thr = self.threshold - 1e-9
+        for r0 in range(0, a.n_rows, self.block_rows):
+            block = (ma[r0:r0 + self.block_rows] @ mbt).tocsr()
+            block.sort_indices()
+            stats["pairs_scored"] += block.nnz
+            for r in range(block.shape[0]):
+                lo, hi = block.indptr[r], block.indptr[r + 1]
+                cols, vals = block.indices[lo:hi], block.data[lo:hi]
+                for j, v in zip(cols[vals >= thr].tolist(), vals[vals >= thr].tolist()):
+                    yield r0 + r, j, v
+
+    def _pairs_numpy(self, a: CSR, b: CSR, stats: Counter) -> Iterator[tuple[int, int, float]]:
+        # B transposed: term → (claim_b, weight) postings
+        b_rows = np.repeat(np.arange(b.n_rows), np.diff(b.indptr))
+        order = np.argsort(b.indices, kind="stable")
+        bt_cols, bt_w = b_rows[order], b.data[order]
+        bt_ptr = np.zeros(b.n_cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(b.indices, minlength=b.n_cols), out=bt_ptr[1:])
+        for r0 in range(0, a.n_rows, self.block_rows):
+            yield from self._block_numpy(a, r0, min(r0 + self.block_rows, a.n_rows), bt_ptr, bt_cols, bt_w, b.n_rows,
+                                         stats)
+
+    def _block_numpy(self, a: CSR, r0: int, r1: int, bt_ptr, bt_cols, bt_w, n_b: int,
+                     stats: Counter) -> Iterator[tuple[int, int, float]]:
+        lo, hi = a.indptr[r0], a.indptr[r1]
+        e_term, e_w = a.indices[lo:hi], a.data[lo:hi]
+        cnt = bt_ptr[e_term + 1] - bt_ptr[e_term]
+        total = int(cnt.sum())
+        if total == 0:
+            return
+        if total > self.max_products and r1 - r0 > 1:
+            mid = (r0 + r1) // 2
+            yield from self._block_numpy(a, r0, mid, bt_ptr, bt_cols, bt_w, n_b, stats)
+            yield from self._block_numpy(a, mid, r1, bt_ptr, bt_cols, bt_w, n_b, stats)
+            return
+        e_row = np.repeat(np.arange(r0, r1), np.diff(a.indptr[r0:r1 + 1]))
+        offsets = np.cumsum(cnt) - cnt
+        idx = np.repeat(bt_ptr[e_term] - offsets, cnt) + np.arange(total)
+        keys = np.repeat(e_row, cnt) * n_b + bt_cols[idx]
+        prods = np.repeat(e_w, cnt) * bt_w[idx]
+        order = np.argsort(keys, kind="stable")
+        keys, prods = keys[order], prods[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        sums = np.add.reduceat(prods, starts)
+        stats["pairs_scored"] += len(starts)
+        keep = sums >= self.threshold - 1e-9
+        for key, v in zip(keys[starts][keep].tolist(), sums[keep].tolist()):
+            yield key // n_b, key % n_b, v
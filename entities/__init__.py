@@ -0,0 +1,5 @@
+"""IQRAA V2 Entities Package — فهارس وأدوات ربط الكيانات (AGT-02)"""
+from .gazetteer import Gazetteer, GazetteerHit, normalize_name, read_name_list
+from .resolution import ResolutionIndex, Candidate, NameParts, parse_name, name_variants, stable_entity_id
+from .overlap import IntervalIndex, resolve_overlaps, PREFER_LENGTH, PREFER_CONFIDENCE
+from .cooccurrence import CooccurrenceIndex
@@ -0,0 +1,219 @@
+"""
+IQRAA V2 — Cross-Document Co-occurrence Index
+===============================================
+فهرس تزامن الكيانات عبر المدونة — يُبنى تدريجياً من مخرجات AGT-02
+ويجيب عن أسئلة مثل "من العلماء الذين يرِدون مع العصبية في هذه الكتب؟"
+دون إعادة تشغيل AGT-02.
+
+- postings لكل كيان: (source, canonical_start, canonical_end) في مصفوفات مدمجة
+- عدّادات التزامن على مستوى الجملة (أو نافذة ثابتة) في مصفوفات مرتبة
+- تخزين دائم في SQLite، ولا يُكتب إلا ما تغيّر
+"""
+from __future__ import annotations
+
+import heapq
+import re
+import sqlite3
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+_SENTENCE_END = re.compile(r"[.۔؟!\n]")
+
+
+def _sentence_starts(text: str) -> list[int]:
+    return [0] + [m.end() for m in _SENTENCE_END.finditer(text)]
+
+
+class _Neighbors:
+    """Sorted neighbor ids + counts, with a pending delta merged lazily."""
+    __slots__ = ("ids", "counts", "pending")
+
+    def __init__(self):
+        self.ids = array("i")
+        self.counts = array("i")
+        self.pending: Counter = Counter()
+
+    def merge(self) -> None:
+        if not self.pending:
+            return
+        merged = dict(zip(self.ids, self.counts))
+        for k, v in self.pending.items():
+            merged[k] = merged.get(k, 0) + v
+        keys = sorted(merged)
+        self.ids = array("i", keys)
+        self.counts = array("i", (merged[k] for k in keys))
+        self.pending.clear()
+
+    def get(self, other: int) -> int:
+        self.merge()
+        i = bisect_right(self.ids, other) - 1
+        return self.counts[i] if i >= 0 and self.ids[i] == other else 0
+
+
+class CooccurrenceIndex:
+    """Entity postings + co-occurrence counts across documents."""
+
+    def __init__(self, window_chars: int = 300):
+        self.window_chars = window_chars  # unit size when no canonical text is given
+        self.entity_ids: list[str] = []
+        self.entity_info: list[tuple[str, str]] = []  # (type, label)
+        self._entity_num: dict[str, int] = {}
+        self.sources: list[str] = []
+        self._source_num: dict[str, int] = {}
+        self._postings: list[tuple[array, array, array]] = []  # (source, start, end)
+        self._neighbors: list[_Neighbors] = []
+        self._dirty_entities: set[int] = set()
+        self._dirty_sources: list[int] = []
+        self._path: Optional[Path] = None  # database the dirty sets are relative to
+
+    def __len__(self) -> int:
+        return len(self.entity_ids)
+
+    def _intern(self, entity_id: str, etype: str, label: str) -> int:
+        num = self._entity_num.get(entity_id)
+        if num is None:
+            num = len(self.entity_ids)
+            self._entity_num[entity_id] = num
+            self.entity_ids.append(entity_id)
+            self.entity_info.append((etype, label))
+            self._postings.append((array("i"), array("i"), array("i")))
+            self._neighbors.append(_Neighbors())
+        return num
+
+    # --- ingest ---
+    def add_document(self, source_id: str, entities: Iterable[dict[str, Any]],
+                     canonical_text: Optional[str] = None) -> bool:
+        """Index one AGT-02 output. Returns False if the source is already indexed."""
+        if source_id in self._source_num:
+            return False
+        src = len(self.sources)
+        self._source_num[source_id] = src
+        self.sources.append(source_id)
+        self._dirty_sources.append(src)
+
+        starts = _sentence_starts(canonical_text) if canonical_text else None
+        units: dict[int, set[int]] = {}
+        for e in sorted(entities, key=lambda e: e.get("canonical_start", 0)):
+            eid = e.get("suggested_id")
+            if not eid:
+                continue
+            cs, ce = e.get("canonical_start", 0), e.get("canonical_end", 0)
+            num = self._intern(eid, e.get("entity_type", "unknown"), e.get("text", ""))
+            srcs, ss, es = self._postings[num]
+            srcs.append(src)
+            ss.append(cs)
+            es.append(ce)
+            self._dirty_entities.add(num)
+            unit = bisect_right(starts, cs) - 1 if starts else cs // self.window_chars
+            units.setdefault(unit, set()).add(num)
+
+        for members in units.values():
+            for a, b in combinations(sorted(members), 2):
+                self._neighbors[a].pending[b] += 1
+                self._neighbors[b].pending[a] += 1
+        return True
+
+    def add_result(self, output: dict[str, Any], source_id: str,
+                   canonical_text: Optional[str] = None) -> bool:
+        """Convenience: index AgentResult.output of AGT-02 directly."""
+        return self.add_document(source_id, output.get("entities", []), canonical_text)
+
+    # --- query ---
+    def top_k(self, entity_id: str, k: int = 10, entity_type: Optional[str] = None) -> list[tuple[str, int]]:
+        """Entities co-occurring most often with `entity_id` (optionally of one type)."""
+        num = self._entity_num.get(entity_id)
+        if num is None:
+            return []
+        nb = self._neighbors[num]
+        nb.merge()
+        info, ids = self.entity_info, self.entity_ids
+        pairs = ((c, -o) for o, c in zip(nb.ids, nb.counts)
+                 if entity_type is None or info[o][0] == entity_type)
+        return [(ids[-neg], c) for c, neg in heapq.nlargest(k, pairs)]
+
+    def count(self, entity_a: str, entity_b: str) -> int:
+        a, b = self._entity_num.get(entity_a), self._entity_num.get(entity_b)
+        if a is None or b is None:
+            return 0
+        return self._neighbors[a].get(b)
+
+    def postings(self, entity_id: str) -> list[tuple[str, int, int]]:
+        num = self._entity_num.get(entity_id)
+        if num is None:
+            return []
+        srcs, ss, es = self._postings[num]
+        return [(self.sources[s], a, b) for s, a, b in zip(srcs, ss, es)]
+
+    def document_frequency(self, entity_id: str) -> int:
+        num = self._entity_num.get(entity_id)
+        return len(set(self._postings[num][0])) if num is not None else 0
+
+    # --- persistence ---
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS sources (num INTEGER PRIMARY KEY, source_id TEXT UNIQUE)",
+        "CREATE TABLE IF NOT EXISTS entities (num INTEGER PRIMARY KEY, entity_id TEXT UNIQUE, entity_type TEXT, label TEXT,"
+        " post_src BLOB, post_start BLOB, post_end BLOB, nb_ids BLOB, nb_counts BLOB)",
+    )
+
+    def save(self, path: str | Path) -> None:
+        """Write only sources/entities changed since the last save or load of the same path;
+        a different path gets everything."""
+        path = Path(path).resolve()
+        if path != self._path:
+            self._dirty_sources = list(range(len(self.sources)))
+            self._dirty_entities = set(range(len(self.entity_ids)))
+        con = sqlite3.connect(str(path))
+        try:
+            with con:
+                for stmt in self._SCHEMA:
+                    con.execute(stmt)
+                con.execute("INSERT OR REPLACE INTO meta VALUES ('window_chars', ?)", (str(self.window_chars),))
+                con.executemany("INSERT OR REPLACE INTO sources VALUES (?, ?)",
+                                ((s, self.sources[s]) for s in self._dirty_sources))
+                rows = []
+                for num in sorted(self._dirty_entities | {n for n, nb in enumerate(self._neighbors) if nb.pending}):
+                    nb = self._neighbors[num]
+                    nb.merge()
+                    srcs, ss, es = self._postings[num]
+                    etype, label = self.entity_info[num]
+                    rows.append((num, self.entity_ids[num], etype, label, srcs.tobytes(), ss.tobytes(),
+                                 es.tobytes(), nb.ids.tobytes(), nb.counts.tobytes()))
+                con.executemany("INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        finally:
+            con.close()
+        self._dirty_entities.clear()
+        self._dirty_sources.clear()
+        self._path = path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CooccurrenceIndex":
+        con = sqlite3.connect(str(path))
+        try:
+            meta = dict(con.execute("SELECT key, value FROM meta"))
+            idx = cls(window_chars=int(meta.get("window_chars", 300)))
+            for num, source_id in con.execute("SELECT num, source_id FROM sources ORDER BY num"):
+                idx._source_num[source_id] = num
+                idx.sources.append(source_id)
+            for row in con.execute("SELECT * FROM entities ORDER BY num"):
+                num, eid, etype, label = row[:4]
+                idx._entity_num[eid] = num
+                idx.entity_ids.append(eid)
+                idx.entity_info.append((etype, label))
+                arrays = []
+                for blob in row[4:]:
+                    arr = array("i")
+                    arr.frombytes(blob)
+                    arrays.append(arr)
+                idx._postings.append(tuple(arrays[:3]))
+                nb = _Neighbors()
+                nb.ids, nb.counts = arrays[3], arrays[4]
+                idx._neighbors.append(nb)
+        finally:
+            con.close()
+        idx._path = Path(path).resolve()
+        return idx
@@ -0,0 +1,255 @@
+"""
+IQRAA V2 — Gazetteer (Aho-Corasick)
+=====================================
+قوائم الاستناد (أعلام، أماكن، كتب) → آلة Aho-Corasick واحدة
+تطابق كل الأسماء في مرور واحد خطي على النص القانوني.
+
+- الأسماء تُطبَّع بنفس CanonicalPolicy قبل البناء
+- الآلة تُحفظ كملف ثنائي مسبق البناء (لا إعادة بناء عند الإقلاع)
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import struct
+import sys
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from core.canonical_policy import canonicalize, CanonicalPolicy, POLICY_VERSION
+
+_MAGIC = b"IQGZ"
+_FORMAT_VERSION = 1
+_CHAR_BITS = 21  # max unicode code point fits in 21 bits
+_PROCLITICS = frozenset("وفبلك")
+
+
+class GazetteerHit(NamedTuple):
+    start: int
+    end: int
+    name: str
+    entries: tuple[tuple[str, Optional[str]], ...]  # (entity_type, authority_id)
+
+
+def normalize_name(name: str, policy: Optional[CanonicalPolicy] = None) -> str:
+    return " ".join(canonicalize(name, policy).split())
+
+
+def read_name_list(path: str | Path, entity_type: str) -> list[tuple[str, str, Optional[str]]]:
+    """One name per line, optionally `name<TAB>authority_id`; `#` starts a comment."""
+    entries = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            name, _, authority_id = line.partition("\t")
+            entries.append((name, entity_type, authority_id.strip() or None))
+    return entries
+
+
+def _fingerprint(sources: dict[str, str | Path], policy: Optional[CanonicalPolicy] = None) -> str:
+    # the policy decides how names were normalized, so a different one needs a rebuild
+    h = hashlib.sha256(POLICY_VERSION.encode())
+    h.update(json.dumps(dataclasses.asdict(policy or CanonicalPolicy()), sort_keys=True).encode())
+    for etype in sorted(sources):
+        h.update(etype.encode())
+        h.update(Path(sources[etype]).read_bytes())
+    return h.hexdigest()[:16]
+
+
+class Gazetteer:
+    """Array-backed Aho-Corasick automaton over canonical names.
+
+    Transitions live in one flat dict keyed by (state << 21 | code point);
+    fail / terminal / dictionary-suffix links are int arrays indexed by state.
+    """
+
+    def __init__(self):
+        self._goto: dict[int, int] = {}
+        self._fail = array("i", [0])
+        self._term = array("i", [-1])
+        self._dict_link = array("i", [-1])
+        self.names: list[str] = []
+        self.entries: list[tuple[tuple[str, Optional[str]], ...]] = []
+        self.fingerprint: str = ""
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def state_count(self) -> int:
+        return len(self._fail)
+
+    # --- build ---
+    @classmethod
+    def build(cls, entries: Iterable[tuple[str, str, Optional[str]]],
+              policy: Optional[CanonicalPolicy] = None) -> "Gazetteer":
+        """entries: (name, entity_type, authority_id)"""
+        policy = policy or CanonicalPolicy()
+        by_name: dict[str, list[tuple[str, Optional[str]]]] = {}
+        for name, etype, authority_id in entries:
+            canonical = normalize_name(name, policy)
+            if canonical and (etype, authority_id) not in by_name.setdefault(canonical, []):
+                by_name[canonical].append((etype, authority_id))
+
+        gz = cls()
+        goto, fail, term, dict_link = gz._goto, gz._fail, gz._term, gz._dict_link
+        children: list[list[int]] = [[]]
+        for idx, (name, payload) in enumerate(by_name.items()):
+            gz.names.append(name)
+            gz.entries.append(tuple(payload))
+            state = 0
+            for ch in name:
+                key = state << _CHAR_BITS | ord(ch)
+                nxt = goto.get(key)
+                if nxt is None:
+                    nxt = len(fail)
+                    goto[key] = nxt
+                    fail.append(0)
+                    term.append(-1)
+                    dict_link.append(-1)
+                    children.append([])
+                    children[state].append(key)
+                state = nxt
+            term[state] = idx
+
+        queue = deque(goto[k] for k in children[0])
+        while queue:
+            r = queue.popleft()
+            for key in children[r]:
+                s = goto[key]
+                queue.append(s)
+                code = key & ((1 << _CHAR_BITS) - 1)
+                f = fail[r]
+                while f and (f << _CHAR_BITS | code) not in goto:
+                    f = fail[f]
+                f = goto.get(f << _CHAR_BITS | code, 0)
+                fail[s] = f
+                dict_link[s] = f if term[f] >= 0 else dict_link[f]
+        return gz
+
+    @classmethod
+    def from_files(cls, sources: dict[str, str | Path],
+                   policy: Optional[CanonicalPolicy] = None) -> "Gazetteer":
+        """sources: {entity_type: path to name list}"""
+        entries = []
+        for etype, path in sources.items():
+            entries.extend(read_name_list(path, etype))
+        gz = cls.build(entries, policy)
+        gz.fingerprint = _fingerprint(sources, policy)
+        return gz
+
+    @classmethod
+    def load_or_build(cls, sources: dict[str, str | Path], cache_path: str | Path,
+                      policy: Optional[CanonicalPolicy] = None) -> "Gazetteer":
+        """Load the prebuilt automaton; rebuild if the name lists or the policy changed,
+        or if the file is stale (older format / policy version) or damaged."""
+        cache_path = Path(cache_path)
+        fingerprint = _fingerprint(sources, policy)
+        if cache_path.exists():
+            try:
+                gz = cls.load(cache_path)
+            except (ValueError, KeyError, IndexError, struct.error):
+                gz = None
+            if gz is not None and gz.fingerprint == fingerprint:
+                return gz
+        gz = cls.from_files(sources, policy)
+        gz.save(cache_path)
+        return gz
+
+    # --- match ---
+    def finditer(self, text: str, whole_words: bool = True) -> Iterator[GazetteerHit]:
+        """All (possibly overlapping) name occurrences in one pass over `text`."""
+        goto, fail, term, dict_link = self._goto, self._fail, self._term, self._dict_link
+        names, entries = self.names, self.entries
+        n = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            code = ord(ch)
+            while True:
+                nxt = goto.get(state << _CHAR_BITS | code)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            s = state if term[state] >= 0 else dict_link[state]
+            while s > 0:
+                idx = term[s]
+                end = i + 1
+                start = end - len(names[idx])
+                if not whole_words or self._at_boundary(text, start, end, n):
+                    yield GazetteerHit(start, end, names[idx], entries[idx])
+                s = dict_link[s]
+
+    @staticmethod
+    def _at_boundary(text: str, start: int, end: int, n: int) -> bool:
+        if end < n and text[end].isalnum():
+            return False
+        if start == 0 or not text[start - 1].isalnum():
+            return True
+        # Single-letter proclitic (و/ف/ب/ل/ك) glued to the name: "وابن خلدون"
+        return text[start - 1] in _PROCLITICS and (start == 1 or not text[start - 2].isalnum())
+
+    # --- persistence ---
+    def save(self, path: str | Path) -> None:
+        keys = array("q", self._goto.keys())
+        vals = array("i", self._goto.values())
+        header = json.dumps({
+            "format": _FORMAT_VERSION,
+            "policy_version": POLICY_VERSION,
+            "fingerprint": self.fingerprint,
+            "byteorder": sys.byteorder,
+        }).encode()
+        sections = [
+            header, keys.tobytes(), vals.tobytes(),
+            self._fail.tobytes(), self._term.tobytes(), self._dict_link.tobytes(),
+            "\x00".join(self.names).encode("utf-8"),
+            json.dumps(self.entries, ensure_ascii=False).encode("utf-8"),
+        ]
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(_MAGIC)
+            for blob in sections:
+                fh.write(struct.pack("<Q", len(blob)))
+                fh.write(blob)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Gazetteer":
+        data = Path(path).read_bytes()
+        if data[:4] != _MAGIC:
+            raise ValueError(f"not a gazetteer file: {path}")
+        sections = []
+        pos = 4
+        while pos < len(data):
+            (size,) = struct.unpack_from("<Q", data, pos)
+            pos += 8
+            sections.append(data[pos:pos + size])
+            pos += size
+        header = json.loads(sections[0])
+        if header["format"] != _FORMAT_VERSION or header["policy_version"] != POLICY_VERSION:
+            raise ValueError(f"stale gazetteer file: {path}")
+
+        def ints(typecode: str, blob: bytes) -> array:
+            arr = array(typecode)
+            arr.frombytes(blob)
+            if header["byteorder"] != sys.byteorder:
+                arr.byteswap()
+            return arr
+
+        gz = cls()
+        gz._goto = dict(zip(ints("q", sections[1]), ints("i", sections[2])))
+        gz._fail = ints("i", sections[3])
+        gz._term = ints("i", sections[4])
+        gz._dict_link = ints("i", sections[5])
+        gz.names = sections[6].decode("utf-8").split("\x00") if sections[6] else []
+        gz.entries = [tuple(tuple(e) for e in payload) for payload in json.loads(sections[7])]
+        gz.fingerprint = header["fingerprint"]
+        return gz
@@ -0,0 +1,247 @@
+"""
+IQRAA V2 — Entity Resolution Index
+====================================
+فهرس توحيد الكيانات: صيغ الاسم المطبّعة (كنية، نسب، لقب، نسبة) → معرّف ثابت.
+
+- استرجاع المرشحين: تطابق صيغة مباشر ثم ثلاثيات الحروف (trigrams)
+- المعرّف المقترح ثابت (hash للصيغة الأساسية) بدل أول 10 أحرف
+- تخزين محلي دائم عبر SQLite
+- Suggest فقط: الفهرس لا يُعدَّل أثناء التشغيل
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import sqlite3
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from core.canonical_policy import CanonicalPolicy
+from entities.gazetteer import normalize_name
+
+# Canonical forms (hamza already normalized)
+HONORIFICS = frozenset({"الامام", "الشيخ", "العلامة", "الحافظ", "القاضي", "المؤرخ", "الفقيه", "المحدث", "شيخ", "الاسلام"})
+KUNYA_MARKERS = frozenset({"ابو", "ابي", "ابا", "ام"})
+NASAB_MARKERS = frozenset({"ابن", "بن", "بنت", "ابنة"})
+
+EXACT_SCORE = 1.0
+VARIANT_SCORE = 0.9
+
+
+@dataclass
+class NameParts:
+    primary: str
+    kunya: Optional[str] = None
+    ism: Optional[str] = None
+    nasab: list[str] = field(default_factory=list)
+    laqab: Optional[str] = None
+    nisba: Optional[str] = None
+
+
+@dataclass
+class Candidate:
+    entity_id: str
+    entity_type: str
+    score: float
+    matched_form: str
+
+    def to_dict(self) -> dict:
+        return {"entity_id": self.entity_id, "entity_type": self.entity_type,
+                "score": round(self.score, 3), "matched_form": self.matched_form}
+
+
+def parse_name(name: str, policy: Optional[CanonicalPolicy] = None) -> NameParts:
+    tokens = normalize_name(name, policy).split()
+    while len(tokens) > 1 and tokens[0] in HONORIFICS:
+        tokens = tokens[1:]
+    parts = NameParts(primary=" ".join(tokens))
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        if tok in KUNYA_MARKERS and nxt and parts.kunya is None:
+            parts.kunya = ("ام " if tok == "ام" else "ابو ") + nxt
+            i += 2
+        elif tok in NASAB_MARKERS and nxt:
+            if nxt == "عبد" and i + 2 < len(tokens):
+                parts.nasab.append(f"عبد {tokens[i + 2]}")
+                i += 3
+            else:
+                parts.nasab.append(nxt)
+                i += 2
+        elif nxt == "الدين":
+            parts.laqab = f"{tok} الدين"
+            i += 2
+        elif tok.startswith("ال") and tok.endswith("ي") and len(tok) > 4:
+            parts.nisba = tok
+            i += 1
+        elif tok == "عبد" and nxt:
+            parts.ism = parts.ism or f"عبد {nxt}"
+            i += 2
+        else:
+            if parts.ism is None and not parts.nasab:
+                parts.ism = tok
+            i += 1
+    return parts
+
+
+def name_variants(name: str, policy: Optional[CanonicalPolicy] = None) -> list[str]:
+    """Primary form first, then kunya / nasab / laqab / nisba variants."""
+    p = parse_name(name, policy)
+    forms = [p.primary]
+    if p.kunya:
+        forms.append(p.kunya)
+    if p.nasab:
+        forms.append(f"ابن {p.nasab[-1]}")
+        if p.ism:
+            forms.append(f"{p.ism} بن {p.nasab[0]}")
+    if p.laqab:
+        forms.append(p.laqab)
+    if p.nisba and p.nisba != p.primary:
+        forms.append(p.nisba)
+    return list(dict.fromkeys(f for f in forms if f))
+
+
+def stable_entity_id(entity_type: str, name: str, policy: Optional[CanonicalPolicy] = None) -> str:
+    """Deterministic id from the primary normalized form — no prefix collisions."""
+    primary = parse_name(name, policy).primary
+    return f"ent_{entity_type}_{hashlib.sha1(primary.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _trigrams(form: str) -> set[str]:
+    padded = f" {form} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ResolutionIndex:
+    """Normalized name forms → entity ids, with trigram candidate retrieval."""
+
+    def __init__(self, policy: Optional[CanonicalPolicy] = None, max_df_ratio: float = 0.01):
+        self.policy = policy or CanonicalPolicy()
+        self.max_df_ratio = max_df_ratio
+        self.entities: dict[str, tuple[str, str]] = {}  # id → (type, label)
+        self._forms: list[str] = []
+        self._form_ids: dict[str, int] = {}
+        self._form_entities: list[list[str]] = []
+        self._gram_counts = array("i")
+        self._grams: dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def add(self, entity_id: str, entity_type: str, names: Iterable[str], label: str = "") -> None:
+        names = list(names)
+        self.entities[entity_id] = (entity_type, label or (names[0] if names else entity_id))
+        for name in names:
+            for form in name_variants(name, self.policy):
+                self._add_form(form, entity_id)
+
+    def _add_form(self, form: str, entity_id: str) -> None:
+        fid = self._form_ids.get(form)
+        if fid is None:
+            fid = len(self._forms)
+            self._form_ids[form] = fid
+            self._forms.append(form)
+            self._form_entities.append([])
+            form_grams = _trigrams(form)
+            self._gram_counts.append(len(form_grams))
+            for g in form_grams:
+                self._grams.setdefault(g, array("i")).append(fid)
+        if entity_id not in self._form_entities[fid]:
+            self._form_entities[fid].append(entity_id)
+
+    def candidates(self, mention: str, entity_type: Optional[str] = None,
+                   k: int = 5, min_similarity: float = 0.5) -> list[Candidate]:
+        """Ranked candidates: exact primary > exact variant > trigram similarity."""
+        best: dict[str, Candidate] = {}
+
+        def offer(fid: int, score: float):
+            for eid in self._form_entities[fid]:
+                etype = self.entities[eid][0]
+                if entity_type and etype != entity_type:
+                    continue
+                cur = best.get(eid)
+                if cur is None or score > cur.score:
+                    best[eid] = Candidate(eid, etype, score, self._forms[fid])
+
+        variants = name_variants(mention, self.policy)
+        if not variants:
+            return []
+        for i, form in enumerate(variants):
+            fid = self._form_ids.get(form)
+            if fid is not None:
+                offer(fid, EXACT_SCORE if i == 0 else VARIANT_SCORE)
+
+        # Fuzzy retrieval only when the mention itself is not a known form
+        if variants[0] not in self._form_ids:
+            for fid, dice in self._similar_forms(variants[0], min_similarity):
+                offer(fid, dice * VARIANT_SCORE)
+
+        ranked = sorted(best.values(), key=lambda c: (-c.score, c.entity_id))
+        return ranked[:k]
+
+    def _similar_forms(self, form: str, min_similarity: float) -> list[tuple[int, float]]:
+        """Trigram Dice ≥ min_similarity, counted over the query's postings.
+
+        Stop-grams (df above max_df, e.g. "ابن") are skipped, which can only
+        lower a score — never admit a false candidate.
+        """
+        grams = self._grams
+        max_df = max(64, int(self.max_df_ratio * len(self._forms)))
+        q = _trigrams(form)
+        counts: dict[int, int] = {}
+        for g in q:
+            postings = grams.get(g)
+            if postings is None or len(postings) > max_df:
+                continue
+            for fid in postings:
+                counts[fid] = counts.get(fid, 0) + 1
+        min_overlap = math.ceil(min_similarity * len(q) / (2 - min_similarity))
+        gram_counts = self._gram_counts
+        out = []
+        for fid, shared in counts.items():
+            if shared < min_overlap:
+                continue
+            dice = 2 * shared / (len(q) + gram_counts[fid])
+            if dice >= min_similarity:
+                out.append((fid, dice))
+        return out
+
+    def suggest(self, mention: str, entity_type: str, accept: float = VARIANT_SCORE,
+                k: int = 5) -> tuple[str, list[Candidate]]:
+        """(suggested_id, ranked candidates) — falls back to a stable new id."""
+        cands = self.candidates(mention, entity_type, k=k)
+        if cands and cands[0].score >= accept:
+            return cands[0].entity_id, cands
+        return stable_entity_id(entity_type, mention, self.policy), cands
+
+    # --- persistence ---
+    def save(self, path: str | Path) -> None:
+        con = sqlite3.connect(str(path))
+        try:
+            with con:
+                con.execute("CREATE TABLE IF NOT EXISTS entities (entity_id TEXT PRIMARY KEY, entity_type TEXT, label TEXT)")
+                con.execute("CREATE TABLE IF NOT EXISTS forms (form TEXT, entity_id TEXT, PRIMARY KEY (form, entity_id))")
+                con.execute("DELETE FROM entities")
+                con.execute("DELETE FROM forms")
+                con.executemany("INSERT INTO entities VALUES (?, ?, ?)",
+                                ((eid, t, label) for eid, (t, label) in self.entities.items()))
+                con.executemany("INSERT INTO forms VALUES (?, ?)",
+                                ((self._forms[fid], eid) for fid, eids in enumerate(self._form_entities) for eid in eids))
+        finally:
+            con.close()
+
+    @classmethod
+    def load(cls, path: str | Path, policy: Optional[CanonicalPolicy] = None) -> "ResolutionIndex":
+        idx = cls(policy)
+        con = sqlite3.connect(str(path))
+        try:
+            for eid, etype, label in con.execute("SELECT entity_id, entity_type, label FROM entities"):
+                idx.entities[eid] = (etype, label)
+            for form, eid in con.execute("SELECT form, entity_id FROM forms ORDER BY rowid"):
+                idx._add_form(form, eid)
+        finally:
+            con.close()
+        return idx
@@ -1,7 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence
+
+from core.llm_client import estimate_cost, estimate_tokens
+from core.run_context import BudgetEnvelope
+
+# Cheapest first — each tier is only tried when the previous one was not good enough
+DEFAULT_CASCADE = ("gemini-2.0-flash", "gemini-2.5-pro")
+
+MODE_CASCADES = {
+    "lean": ("gemini-2.0-flash",),
+    "standard": DEFAULT_CASCADE,
+    "rigorous": ("gemini-2.5-pro", "claude-sonnet-4-20250514"),
+    "jury": ("gemini-2.5-pro", "claude-sonnet-4-20250514"),
+}
+
+# Same default AGT-01 gives a claim whose reply has no confidence field
+DEFAULT_CONFIDENCE = 0.7
 
 
 @dataclass
@@ -17,4 +33,70 @@ class ModelRouter:
             model = "large+verifier"
         else:
             model = "standard"
-        return {"model": model}
+        return {"model": model, "cascade": list(MODE_CASCADES.get(mode, DEFAULT_CASCADE))}
+
+
+def _confidence(claim: Any) -> float:
+    """Claim confidence as AGT-01 reads it: missing = 0.7, unparseable = 0.0 (low)."""
+    if not isinstance(claim, dict):
+        return 0.0
+    try:
+        return float(claim.get("confidence", DEFAULT_CONFIDENCE))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass
+class ModelCascade:
+    """Cheap model first, escalate only when the answer is not good enough.
+
+    Escalation triggers: malformed JSON, too few claims, or low mean confidence.
+    A stronger tier is only tried if its estimated cost fits the BudgetEnvelope.
+    """
+    tiers: tuple[str, ...] = DEFAULT_CASCADE
+    min_confidence: float = 0.6
+    min_claims: int = 1
+    max_output_tokens: int = 2000
+    budget_reserve_usd: float = 0.0
+
+    @classmethod
+    def for_mode(cls, mode: str, **kwargs: Any) -> "ModelCascade":
+        return cls(tiers=MODE_CASCADES.get(mode, DEFAULT_CASCADE), **kwargs)
+
+    @classmethod
+    def starting_at(cls, model: str, tiers: Sequence[str] = DEFAULT_CASCADE, **kwargs: Any) -> "ModelCascade":
+        """Cascade that starts at `model` and only escalates to stronger tiers."""
+        tiers = tuple(tiers)
+        if model in tiers:
+            return cls(tiers=tiers[tiers.index(model):], **kwargs)
+        return cls(tiers=(model,), **kwargs)
+
+    def escalation_reason(self, claims: Optional[list[dict]]) -> Optional[str]:
+        """None = accept; otherwise the reason to try the next tier."""
+        if claims is None:
+            return "malformed_json"
+        if len(claims) < self.min_claims:
+            return "too_few_claims"
+        confs = [_confidence(c) for c in claims]
+        if confs and sum(confs) / len(confs) < self.min_confidence:
+            return "low_confidence"
+        return None
+
+    def next_model(self, current: str) -> Optional[str]:
+        if current not in self.tiers:
+            return None
+        i = self.tiers.index(current) + 1
+        return self.tiers[i] if i < len(self.tiers) else None
+
+    def estimate_call_usd(self, model: str, prompt: str) -> float:
+        return estimate_cost(model, estimate_tokens(prompt), self.max_output_tokens)
+
+    def can_afford(self, model: str, prompt: str, budget: Optional[BudgetEnvelope]) -> bool:
+        if budget is None:
+            return True
+        if budget.is_exhausted:
+            return False
+        est_tokens = estimate_tokens(prompt) + self.max_output_tokens
+        if budget.used_tokens + est_tokens > budget.max_tokens:
+            return False
+        return self.estimate_call_usd(model, prompt) <= budget.usd_remaining - self.budget_reserve_usd
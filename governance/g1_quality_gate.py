@@ -6,61 +6,187 @@ G1: Organization Quality Gate — بوابة جودة التنظيم
 - كل evidence له span واحد على الأقل مع offsets صحيحة
 - canonical_start >= 0
 - confidence > 0
+
+أنماط التشغيل (mode):
+- full: كل الفحوص (الافتراضي)
+- fail_fast: التوقف عند أول مخالفة — أي مخالفة تُسقط البوابة
+- sampled: عينة عشوائية من الادعاءات والأدلة، مع حد أدنى (Wilson) لنسبة العناصر السليمة بمستوى ثقة محدد
+قائمة المشاكل محدودة بـ max_issues؛ issue_count يعدّ الكل.
+ملفات configs/*.yaml تختار النمط عبر قسم g1 (انظر load_g1_config و g1_profile)، والمسارات تمررها لعقدة G1.
 """
 from __future__ import annotations
-from typing import Any
+import math
+import random
+from functools import lru_cache
+from pathlib import Path
+from statistics import NormalDist
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Sequence
 from core.models import Evidence, Claim
 
+try:
+    import yaml
+except ImportError:  # required by load_g1_config only
+    yaml = None
+
+MODES = ("full", "fail_fast", "sampled")
+MAX_ISSUES = 1000
+CONFIG_DIR = Path(__file__).resolve().parents[1] / "configs"
+
 
 class G1QualityResult:
-    def __init__(self, passed: bool, score: float, issues: list[str]):
+    def __init__(self, passed: bool, score: float, issues: list[str], mode: str = "full",
+                 issue_count: Optional[int] = None, checked: Optional[int] = None,
+                 score_bound: Optional[float] = None):
         self.passed = passed
         self.score = score
         self.issues = issues
+        self.mode = mode
+        self.issue_count = len(issues) if issue_count is None else issue_count
+        self.checked = checked  # items (claims + evidences) examined; None means all
+        self.score_bound = score_bound  # sampled mode: lower confidence bound on the pass rate
+
+    @property
+    def truncated(self) -> bool:
+        return self.issue_count > len(self.issues)
+
+
+CLAIM_CHECKS = 2
 
 
-def run_g1_gate(claims_data: list[dict], evidences: list[Evidence], threshold: float = 0.5) -> G1QualityResult:
+def claim_issues(i: int, c: dict) -> list[str]:
+    """G1 checks of one claim (CLAIM_CHECKS of them, at most one issue each)."""
     issues = []
-    total_checks = 0
-    passed_checks = 0
+    if not c.get("evidence_ids"):
+        issues.append(f"claim_{i}: no evidence_ids")
+    if not c.get("text", "").strip():
+        issues.append(f"claim_{i}: empty text")
+    return issues
 
-    for i, c in enumerate(claims_data):
-        total_checks += 1
-        if not c.get("evidence_ids"):
-            issues.append(f"claim_{i}: no evidence_ids")
-        else:
-            passed_checks += 1
 
-        total_checks += 1
-        if not c.get("text", "").strip():
-            issues.append(f"claim_{i}: empty text")
-        else:
-            passed_checks += 1
+def evidence_issues(j: int, ev: Evidence, canonical_text: Optional[str] = None) -> tuple[int, list[str], list[str]]:
+    """(number of G1 checks, G1 issues, AGT-05 span issues) for one evidence, reading each span once.
 
-    for j, ev in enumerate(evidences):
-        total_checks += 1
-        if not ev.spans:
-            issues.append(f"evidence_{j}: no spans")
-        else:
-            passed_checks += 1
-            for k, sp in enumerate(ev.spans):
-                total_checks += 1
-                if sp.char_start < 0 or sp.char_end <= sp.char_start:
-                    issues.append(f"evidence_{j}_span_{k}: invalid offsets ({sp.char_start},{sp.char_end})")
-                else:
-                    passed_checks += 1
-
-                total_checks += 1
-                if not sp.text.strip():
-                    issues.append(f"evidence_{j}_span_{k}: empty canonical text")
-                else:
-                    passed_checks += 1
-
-        total_checks += 1
-        if ev.confidence <= 0:
-            issues.append(f"evidence_{j}: zero confidence")
+    Each G1 check yields at most one issue. The AGT-05 span issues (offsets, text match against
+    canonical_text) are only collected when canonical_text is given; "" checks offsets only.
+    """
+    issues: list[str] = []
+    span_issues: list[str] = []
+    verify = canonical_text is not None
+    if not ev.spans:
+        issues.append(f"evidence_{j}: no spans")
+    for k, sp in enumerate(ev.spans):
+        cs, ce, txt = sp.char_start, sp.char_end, sp.text
+        if cs < 0 or ce <= cs:
+            issues.append(f"evidence_{j}_span_{k}: invalid offsets ({cs},{ce})")
+            if verify:
+                span_issues.append(f"invalid offsets [{cs}:{ce}]")
+        elif verify and canonical_text and canonical_text[cs:ce] != txt:
+            span_issues.append(f"text mismatch at [{cs}:{ce}]")
+        if not txt.strip():
+            issues.append(f"evidence_{j}_span_{k}: empty canonical text")
+    if ev.confidence <= 0:
+        issues.append(f"evidence_{j}: zero confidence")
+    return 2 + 2 * len(ev.spans), issues, span_issues
+
+
+def wilson_lower_bound(passed: int, total: int, confidence: float = 0.95) -> float:
+    if total == 0:
+        return 0.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = passed / total
+    centre = p + z * z / (2 * total)
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total))
+    return max(0.0, (centre - margin) / (1 + z * z / total))
+
+
+def scan_g1(claims_data: Sequence[dict], evidences: Sequence[Evidence], threshold: float = 0.5,
+            mode: str = "full", max_issues: Optional[int] = MAX_ISSUES, sample_size: int = 1000,
+            confidence: float = 0.95, seed: int = 0,
+            canonical_text: Optional[str] = None) -> tuple[G1QualityResult, Optional[dict[str, list[str]]]]:
+    """The G1 gate, plus — when canonical_text is given — the AGT-05 span issues per evidence id.
+
+    AGT-05 needs every evidence, so with canonical_text all evidences are read even in sampled mode;
+    only the sampled items count towards the gate. The span issues are None when fail_fast stopped.
+    """
+    if mode not in MODES:
+        raise ValueError(f"G1: unknown mode {mode!r}")
+    n_claims = len(claims_data)
+    n_items = n_claims + len(evidences)
+    sample = None
+    if mode == "sampled" and n_items > sample_size:
+        sample = sorted(random.Random(seed).sample(range(n_items), sample_size))
+    verify = canonical_text is not None
+    in_gate = set(sample) if sample is not None and verify else None
+    ev_issues: Optional[dict[str, list[str]]] = {} if verify else None
+
+    issues: list[str] = []
+    issue_count = 0
+    total_checks = 0
+    checked = 0
+    failed_items = 0
+    for n in (range(n_items) if sample is None or verify else sample):
+        if n < n_claims:
+            if in_gate is not None and n not in in_gate:
+                continue
+            checks, found = CLAIM_CHECKS, claim_issues(n, claims_data[n])
         else:
-            passed_checks += 1
+            ev = evidences[n - n_claims]
+            checks, found, span_issues = evidence_issues(n - n_claims, ev, canonical_text)
+            if verify:
+                ev_issues[ev.evidence_id] = span_issues  # a repeated id keeps the last evidence, as in AGT-05
+            if in_gate is not None and n not in in_gate:
+                continue
+        total_checks += checks
+        checked += 1
+        if found:
+            failed_items += 1
+            issue_count += len(found)
+            if max_issues is None or len(issues) < max_issues:
+                issues.extend(found[:None if max_issues is None else max_issues - len(issues)])
+            if mode == "fail_fast":
+                ev_issues = None
+                break
 
+    passed_checks = total_checks - issue_count
     score = passed_checks / total_checks if total_checks > 0 else 0.0
-    return G1QualityResult(passed=(score >= threshold and len(issues) == 0), score=score, issues=issues)
+    all_checked = checked == n_items
+    if sample is not None:
+        # items, not checks, are the independent trials: the checks of one evidence are correlated
+        bound = wilson_lower_bound(checked - failed_items, checked, confidence)
+        passed = issue_count == 0 and bound >= threshold
+        return G1QualityResult(passed, score, issues, mode, issue_count, checked, bound), ev_issues
+    result = G1QualityResult(passed=(score >= threshold and issue_count == 0), score=score, issues=issues,
+                             mode=mode, issue_count=issue_count, checked=None if all_checked else checked)
+    return result, ev_issues
+
+
+def run_g1_gate(claims_data: list[dict], evidences: list[Evidence], threshold: float = 0.5,
+                mode: str = "full", max_issues: Optional[int] = MAX_ISSUES,
+                sample_size: int = 1000, confidence: float = 0.95, seed: int = 0) -> G1QualityResult:
+    return scan_g1(claims_data, evidences, threshold, mode, max_issues, sample_size, confidence, seed)[0]
+
+
+def load_g1_config(path: str | Path) -> dict[str, Any]:
+    """run_g1_gate keyword arguments from the g1 section of a configs/*.yaml profile (full mode if absent)."""
+    if yaml is None:
+        raise RuntimeError("G1: loading configs requires PyYAML")
+    with open(path, encoding="utf-8") as fp:
+        profile = yaml.safe_load(fp) or {}
+    settings = dict(profile.get("g1") or {})
+    unknown = set(settings) - {"mode", "threshold", "max_issues", "sample_size", "confidence", "seed"}
+    if unknown:
+        raise ValueError(f"G1: unknown config keys {sorted(unknown)} in {path}")
+    if settings.get("mode", "full") not in MODES:
+        raise ValueError(f"G1: unknown mode {settings['mode']!r} in {path}")
+    return settings
+
+
+@lru_cache(maxsize=None)
+def g1_profile(profile: str) -> Mapping[str, Any]:
+    """G1 settings of a profile: a name from configs/ (e.g. "creative-lite") or a path to a YAML file.
+
+    Loaded once per profile and read-only, since the cached object is shared by every caller.
+    """
+    path = Path(profile) if profile.endswith((".yaml", ".yml")) else CONFIG_DIR / f"{profile}.yaml"
+    return MappingProxyType(load_g1_config(path))
@@ -0,0 +1,149 @@
+"""
+IQRAA V2 — Corpus Batch Runner
+================================
+تشغيل مسار على مدونة كاملة بتزامن محدود (asyncio):
+- stream_many: يستقبل مستندات من مكرِّر (متزامن أو غير متزامن) ويُخرج نتيجة كل مستند عند اكتماله
+- ضغط عكسي: لا يُسحب مستند جديد من المدخل ما دامت كل الخانات (concurrency) مشغولة
+- الخروج المبكر من stream_many (break ثم aclose) يلغي المستندات الجارية وينتظر انتهاءها
+- run_many: نفس الشيء لقائمة، بالنتائج مرتبة كالمدخل
+- CorpusSummary: الإنتاجية، أعداد النجاح والفشل والأخطاء، والكلفة
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, NamedTuple, Optional, Union
+
+from pipelines.runner import PipelineRunner
+
+Document = Union[str, tuple[str, str]]  # text, or (source_id, text)
+
+
+class DocResult(NamedTuple):
+    index: int
+    source_id: str
+    result: Optional[dict]  # final pipeline state; None if the run raised
+    error: Optional[str]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.result is not None and bool(self.result.get("pipeline_success"))
+
+
+@dataclass
+class CorpusSummary:
+    documents: int = 0
+    succeeded: int = 0
+    failed: int = 0  # pipeline ran but did not succeed (e.g. G1 rejected the document)
+    errors: Counter = field(default_factory=Counter)  # exception type → count
+    cost_usd: float = 0.0
+    elapsed_sec: float = 0.0
+    busy_sec: float = 0.0  # sum of per-document times
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.documents / self.elapsed_sec if self.elapsed_sec else 0.0
+
+    def add(self, doc: DocResult, cost_usd: Optional[float] = None) -> None:
+        """cost_usd overrides the cost read from the result (for results projected without run_ctx_dict)."""
+        self.documents += 1
+        self.busy_sec += doc.seconds
+        if doc.result is None:
+            self.errors[doc.error.split(":", 1)[0]] += 1
+            return
+        self.cost_usd += run_cost(doc.result) if cost_usd is None else cost_usd
+        if doc.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "documents": self.documents, "succeeded": self.succeeded, "failed": self.failed,
+            "errors": dict(self.errors), "error_count": sum(self.errors.values()),
+            "cost_usd": self.cost_usd, "elapsed_sec": round(self.elapsed_sec, 4),
+            "docs_per_sec": round(self.docs_per_sec, 2),
+        }
+
+
+def run_cost(result: dict) -> float:
+    return result.get("run_ctx_dict", {}).get("budget", {}).get("used_usd", 0.0)
+
+
+def _split(doc: Document, index: int) -> tuple[str, str]:
+    return doc if isinstance(doc, tuple) else (f"doc{index}", doc)
+
+
+async def _aiter(docs: Union[Iterable[Document], AsyncIterable[Document]]) -> AsyncIterator[Document]:
+    if hasattr(docs, "__aiter__"):
+        async for doc in docs:
+            yield doc
+    else:
+        for doc in docs:
+            yield doc
+
+
+async def _run_one(runner: PipelineRunner, index: int, source_id: str, text: str) -> DocResult:
+    t = time.perf_counter()
+    try:
+        result = await runner.run(text, source_id)
+        return DocResult(index, source_id, result, None, time.perf_counter() - t)
+    except Exception as e:
+        return DocResult(index, source_id, None, f"{type(e).__name__}: {e}", time.perf_counter() - t)
+
+
+async def stream_many(docs: Union[Iterable[Document], AsyncIterable[Document]], concurrency: int = 4,
+                      runner: Optional[PipelineRunner] = None,
+                      summary: Optional[CorpusSummary] = None) -> AsyncIterator[DocResult]:
+    """Yield each document's result as it completes, with at most `concurrency` documents in flight."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+    runner = runner or PipelineRunner("extended")
+    summary = summary if summary is not None else CorpusSummary()
+    start = time.perf_counter()
+    pending: set[asyncio.Task] = set()
+
+    async def completed(block_until_one: bool) -> list[DocResult]:
+        nonlocal pending
+        if not pending:
+            return []
+        done, pending = await asyncio.wait(pending, timeout=None if block_until_one else 0,
+                                           return_when=asyncio.FIRST_COMPLETED)
+        out = sorted((task.result() for task in done), key=lambda d: d.index)
+        for doc in out:
+            summary.add(doc)
+        summary.elapsed_sec = time.perf_counter() - start
+        return out
+
+    index = 0
+    try:
+        async for doc in _aiter(docs):
+            while len(pending) >= concurrency:  # backpressure: the input is not read until a slot frees
+                for result in await completed(block_until_one=True):
+                    yield result
+            source_id, text = _split(doc, index)
+            pending.add(asyncio.ensure_future(_run_one(runner, index, source_id, text)))
+            index += 1
+            for result in await completed(block_until_one=False):
+                yield result
+        while pending:
+            for result in await completed(block_until_one=True):
+                yield result
+    finally:
+        # consumer stopped early (break / aclose) or failed: no document keeps running unowned
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        summary.elapsed_sec = time.perf_counter() - start
+
+
+async def run_many(texts: Iterable[Document], concurrency: int = 4,
+                   runner: Optional[PipelineRunner] = None) -> tuple[list[DocResult], CorpusSummary]:
+    """All results in input order, plus the corpus summary."""
+    summary = CorpusSummary()
+    results = [r async for r in stream_many(texts, concurrency, runner, summary)]
+    results.sort(key=lambda d: d.index)
+    return results, summary
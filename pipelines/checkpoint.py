@@ -0,0 +1,219 @@
+"""
+IQRAA V2 — Checkpointed, Resumable Corpus Runs
+================================================
+سجل (ledger) في SQLite لكل تشغيل مستند، مفتاحه run_key: بصمة (نسخة المسار، الإعداد، الحقول المحفوظة،
+source_id، source_hash للنص القانوني) — فلا تُعاد نتيجة نسخة أو إعداد آخر، ولا نتيجة مستند آخر بنفس النص:
+- بعد كل خطوة مكتملة في الرسم تُحفظ تحديثات عقدها وسياق التشغيل
+- المستند المكتمل تُحفظ نتيجته وتُحذف خطواته
+- الاستئناف: المكتمل يُتخطى (تُعاد نتيجته المحفوظة)، والمنقطع يُستأنف من آخر خطوة مكتملة —
+  تُعاد تحديثاتها إلى رسم بـ checkpointer (bulk_update_state) ثم يكمل التشغيل منها
+
+الكتابة مجمّعة: flush_every صفاً في معاملة واحدة. عند الانهيار يُفقد فقط ما لم يُكتب بعد،
+فيُعاد المستند من خطوة أسبق — الخطوات حتمية فالنتيجة واحدة.
+تشغيلان متزامنان بنفس run_key يُسلسَلان (قفل لكل مفتاح): الثاني ينتظر ثم يتخطى.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import time
+import weakref
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import StateUpdate
+
+from core.canonical_policy import canonicalize, text_hash
+from core.run_context import UnifiedRunContext
+from pipelines.context import RUN_CTX_KEY, live_config
+from pipelines.runner import VARIANTS, PipelineRunner, initial_state
+
+Step = list[tuple[str, dict]]  # (node, state update) for every node of one superstep
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _config_repr(obj: Any) -> Any:
+    """Config objects in a fingerprint: class name + public scalar settings (not accumulated state)."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    settings = {k: v for k, v in vars(obj).items()
+                if not k.startswith("_") and isinstance(v, (str, int, float, bool, type(None)))}
+    return {"class": f"{type(obj).__module__}.{type(obj).__qualname__}", **settings}
+
+
+def config_fingerprint(variant: str, config: Sequence[Any], fields: Optional[Sequence[str]]) -> str:
+    """Stable across processes, unlike the object ids compiled_pipeline keys by."""
+    return text_hash(json.dumps([variant, list(config), fields], ensure_ascii=False, sort_keys=True,
+                                default=_config_repr))
+
+
+class RunLedger:
+    """Per-document completion ledger with batched writes."""
+
+    def __init__(self, path: str | Path, flush_every: int = 500):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.con = sqlite3.connect(str(self.path))
+        with self.con:
+            self.con.execute("CREATE TABLE IF NOT EXISTS docs (run_key TEXT PRIMARY KEY, source_hash TEXT, "
+                             "source_id TEXT, result TEXT, finished REAL)")
+            self.con.execute("CREATE TABLE IF NOT EXISTS steps (run_key TEXT, step INTEGER, updates TEXT, "
+                             "run_ctx TEXT, PRIMARY KEY (run_key, step))")
+        self._done = {k for (k,) in self.con.execute("SELECT run_key FROM docs")}
+        self._pending_steps: list[tuple] = []
+        self._pending_done: dict[str, tuple] = {}
+        self.writes = 0  # rows written
+        self.flushes = 0
+
+    def __enter__(self) -> "RunLedger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def is_done(self, run_key: str) -> bool:
+        return run_key in self._done
+
+    def result(self, run_key: str) -> Optional[dict]:
+        if run_key in self._pending_done:
+            return json.loads(self._pending_done[run_key][3])
+        row = self.con.execute("SELECT result FROM docs WHERE run_key = ?", (run_key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def steps(self, run_key: str) -> list[tuple[Step, dict]]:
+        """Completed supersteps of an unfinished run: (node updates, run context after the step)."""
+        if run_key in self._done:
+            return []
+        rows = self.con.execute("SELECT step, updates, run_ctx FROM steps WHERE run_key = ? ORDER BY step",
+                                (run_key,)).fetchall()
+        rows += [(s, u, c) for k, s, u, c in self._pending_steps if k == run_key]
+        return [([tuple(nu) for nu in json.loads(u)], json.loads(c)) for _, u, c in sorted(rows)]
+
+    def record_step(self, run_key: str, step: int, updates: Step, run_ctx: dict) -> None:
+        self._pending_steps.append((run_key, step, _dumps(updates), _dumps(run_ctx)))
+        self._maybe_flush()
+
+    def record_done(self, run_key: str, source_hash: str, source_id: str, result: dict) -> None:
+        self._done.add(run_key)
+        self._pending_done[run_key] = (run_key, source_hash, source_id, _dumps(result), time.time())
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending_steps) + len(self._pending_done) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write everything pending in one transaction; returns the number of rows written."""
+        if not self._pending_steps and not self._pending_done:
+            return 0
+        done = list(self._pending_done.values())
+        # steps of documents finished within this batch are never written
+        steps = [row for row in self._pending_steps if row[0] not in self._pending_done]
+        with self.con:
+            self.con.executemany("INSERT OR REPLACE INTO steps VALUES (?, ?, ?, ?)", steps)
+            self.con.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?)", done)
+            self.con.executemany("DELETE FROM steps WHERE run_key = ?", ((row[0],) for row in done))
+        written = len(steps) + len(done)
+        self._pending_steps.clear()
+        self._pending_done.clear()
+        self.writes += written
+        self.flushes += 1
+        return written
+
+    def close(self) -> None:
+        self.flush()
+        self.con.close()
+
+
+class CheckpointedRunner(PipelineRunner):
+    """PipelineRunner that records every completed superstep in a RunLedger and resumes from it.
+
+    Works with pipelines.batch.stream_many / run_many as the runner. Runs are keyed by run_key(),
+    so one ledger can hold several variants/configs, and a document repeated in the corpus is run
+    once per source_id.
+    """
+
+    def __init__(self, ledger: RunLedger, variant: str = "extended", *config: Any,
+                 resume: bool = True, fields: Optional[Sequence[str]] = None):
+        super().__init__(variant, *config)
+        self.ledger = ledger
+        self.resume = resume
+        self.fields = tuple(fields) if fields is not None else None
+        self._saver: Optional[InMemorySaver] = None
+        self._resumable = None
+        self._fingerprint = config_fingerprint(variant, config, self.fields)
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self.skipped = self.resumed = 0
+
+    def _resumable_app(self):
+        if self._resumable is None:
+            module, builder = VARIANTS[self.variant]
+            self._saver = InMemorySaver()
+            self._resumable = getattr(import_module(module), builder)(*self.config).compile(checkpointer=self._saver)
+        return self._resumable
+
+    def run_key(self, source_hash: str, source_id: str) -> str:
+        """Ledger key of one run: this runner's variant, config and fields + the document."""
+        return text_hash(_dumps([self._fingerprint, source_id, source_hash]))
+
+    async def run(self, text: str, source_id: str = "source", run_ctx: Optional[UnifiedRunContext] = None) -> dict:
+        self.runs += 1
+        source_hash = text_hash(canonicalize(text))
+        key = self.run_key(source_hash, source_id)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        async with lock:  # a concurrent run of the same key would share its steps and thread_id
+            return await self._run(text, source_id, run_ctx, source_hash, key)
+
+    async def _run(self, text: str, source_id: str, run_ctx: Optional[UnifiedRunContext],
+                   source_hash: str, key: str) -> dict:
+        if self.resume and self.ledger.is_done(key):
+            self.skipped += 1
+            return self.ledger.result(key)
+        done_steps = self.ledger.steps(key) if self.resume else []
+        if done_steps:
+            self.resumed += 1
+            ctx = UnifiedRunContext(**done_steps[-1][1])
+            app = self._resumable_app()
+            config = {"configurable": {"thread_id": key, RUN_CTX_KEY: ctx}}
+            await app.abulk_update_state(config, [[StateUpdate(initial_state(text, source_id), "__input__")]] +
+                                         [[StateUpdate(update, node) for node, update in step] for step, _ in done_steps])
+            try:
+                result = await self._stream(app, None, config, ctx, key, len(done_steps))
+            finally:
+                await self._saver.adelete_thread(key)
+        else:
+            ctx = run_ctx or UnifiedRunContext()
+            result = await self._stream(self.app, initial_state(text, source_id), live_config(ctx), ctx, key, 0)
+        if self.fields is not None:
+            result = {k: result[k] for k in self.fields if k in result}
+        self.ledger.record_done(key, source_hash, source_id, result)
+        return result
+
+    async def _stream(self, app, state: Optional[dict], config: dict, ctx: UnifiedRunContext,
+                      key: str, step: int) -> dict:
+        updates, final = [], {}
+        # A superstep streams its task results, then the state after it ("values"); the next
+        # superstep's nodes only start after that, so ctx holds exactly this step's effects there.
+        async for mode, chunk in app.astream(state, config, stream_mode=["debug", "values"]):
+            if mode == "values":
+                final = chunk
+                if updates:
+                    step += 1
+                    self.ledger.record_step(key, step, updates, ctx.model_dump(mode="json"))
+                    updates = []
+            elif chunk["type"] == "task_result":
+                updates.append((chunk["payload"]["name"], dict(chunk["payload"]["result"])))
+        result = dict(final)
+        result["run_ctx_dict"] = ctx.model_dump(mode="json")
+        return result
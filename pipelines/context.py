@@ -0,0 +1,76 @@
+"""
+IQRAA V2 — Live Run Context for Pipeline Nodes
+================================================
+سياق التشغيل (UnifiedRunContext) يُمرَّر حياً إلى كل العقد عبر config["configurable"]،
+لا عبر الحالة: كل عقدة تسجل أحداثها في نفس الكائن، ولا يُسلسَل إلا عند المخرجات أو نقاط الحفظ.
+
+إذا استُدعي الرسم دون سياق حي تعود العقد للطريقة القديمة: بناء السياق من run_ctx_dict
+في الحالة وإعادته مسلسَلاً — نفس النتيجة، بكلفة النسخ (والفروع المتوازية تُدمج بـ merge_run_ctx).
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+from core.run_context import UnifiedRunContext
+
+RUN_CTX_KEY = "run_ctx"
+_BASE_BUDGET = "_base_budget"  # only inside a branch's copy; merge_run_ctx removes it
+_SPENT = ("used_tokens", "used_tool_calls", "used_wall_ms", "used_usd")
+
+
+def live_config(run_ctx: UnifiedRunContext, **configurable: Any) -> RunnableConfig:
+    """LangGraph invoke config carrying the live context."""
+    return {"configurable": {RUN_CTX_KEY: run_ctx, **configurable}}
+
+
+def node_context(state: dict, config: Optional[RunnableConfig]) -> tuple[UnifiedRunContext, bool]:
+    """(context, is_live) for a node."""
+    ctx = ((config or {}).get("configurable") or {}).get(RUN_CTX_KEY)
+    if ctx is not None:
+        return ctx, True
+    return UnifiedRunContext(**state.get("run_ctx_dict", {})), False
+
+
+def ctx_update(ctx: UnifiedRunContext, live: bool, state: Optional[dict] = None) -> dict:
+    """State update for the context: nothing when live, the serialized copy otherwise.
+
+    The copy carries the budget it started from (from state), so merge_run_ctx can add up
+    what parallel branches spent.
+    """
+    if live:
+        return {}
+    copy = ctx.model_dump(mode="json")
+    base = (state or {}).get("run_ctx_dict", {}).get("budget")
+    if base is not None:
+        copy[_BASE_BUDGET] = base
+    return {"run_ctx_dict": copy}
+
+
+def merge_run_ctx(left: dict, right: dict) -> dict:
+    """State reducer for run_ctx_dict copies returned by parallel branches (no live context).
+
+    Each branch starts from the same context, so its new events are what follows the common prefix,
+    and its spending is its budget minus the budget it started from: used = left + (right − base).
+    A stop requested by any branch stays requested.
+    """
+    right = dict(right or {})
+    base = right.pop(_BASE_BUDGET, None)
+    if not left or not right:
+        return right or left
+    merged = dict(right)
+    for key in ("audit_events", "gate_decisions"):
+        ours, theirs = left.get(key, []), right.get(key, [])
+        common = 0
+        while common < min(len(ours), len(theirs)) and ours[common] == theirs[common]:
+            common += 1
+        merged[key] = ours + theirs[common:]
+    merged["source_hashes"] = {**left.get("source_hashes", {}), **right.get("source_hashes", {})}
+    if base is not None and "budget" in left and "budget" in right:
+        merged["budget"] = {**right["budget"], **{
+            key: left["budget"].get(key, 0) + right["budget"][key] - base.get(key, 0)
+            for key in _SPENT if key in right["budget"]}}
+    if left.get("stop_now"):
+        merged["stop_now"], merged["stop_reason"] = True, left.get("stop_reason")
+    return merged
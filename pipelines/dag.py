@@ -0,0 +1,77 @@
+"""
+IQRAA V2 — Declarative Pipeline DAG
+=====================================
+كل مرحلة تعلن اعتمادياتها (after)، والحواف تُشتق منها: المراحل التي تتوفر اعتمادياتها معاً
+تعمل بالتوازي في نفس الخطوة، والمرحلة ذات الاعتماديات المتعددة تنتظرها كلها (join).
+
+- بوابة (gate): مرحلة تمرر لتابعيها إن نجح شرطها، وإلا تذهب إلى مرحلة الفشل
+- إضافة مرحلة جديدة = سطر Stage واحد؛ جدولتها المتوازية تلقائية
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, NamedTuple, Optional
+
+from langgraph.graph import END, START, StateGraph
+
+
+class Stage(NamedTuple):
+    name: str
+    node: Callable
+    after: tuple[str, ...] = ()
+    gate: Optional[Callable[[dict], bool]] = None  # successors run only if gate(state), else the fail stage
+
+
+def stage_levels(stages: list[Stage]) -> list[list[str]]:
+    """Topological levels: each level's stages can run concurrently once the previous levels are done."""
+    deps = {s.name: set(s.after) for s in stages}
+    for s in stages:
+        unknown = set(s.after) - deps.keys()
+        if unknown:
+            raise ValueError(f"stage {s.name!r} depends on unknown stages {sorted(unknown)}")
+    levels, done = [], set()
+    while len(done) < len(deps):
+        ready = [name for name in deps if name not in done and deps[name] <= done]
+        if not ready:
+            raise ValueError(f"dependency cycle among {sorted(deps.keys() - done)}")
+        levels.append(ready)
+        done.update(ready)
+    return levels
+
+
+def build_dag(state_type: Any, stages: list[Stage], fail: Optional[tuple[str, Callable]] = None) -> StateGraph:
+    """StateGraph whose edges follow the declared dependencies; fail is the (name, node) gates route to."""
+    stage_levels(stages)  # validates names and acyclicity
+    gated = {s.name: s.gate for s in stages if s.gate is not None}
+    if gated and fail is None:
+        raise ValueError("gated stages need a fail stage")
+    successors: dict[str, list[str]] = {s.name: [] for s in stages}
+    for s in stages:
+        for dep in s.after:
+            successors[dep].append(s.name)
+
+    g = StateGraph(state_type)
+    for s in stages:
+        g.add_node(s.name, s.node)
+    if fail is not None:
+        g.add_node(fail[0], fail[1])
+        g.add_edge(fail[0], END)
+    for s in stages:
+        if not s.after:
+            g.add_edge(START, s.name)
+        elif len(s.after) == 1:
+            if s.after[0] not in gated:
+                g.add_edge(s.after[0], s.name)
+        else:
+            if gated.keys() & set(s.after):
+                raise ValueError(f"stage {s.name!r} joins on a gate; depend on the gate's successors instead")
+            g.add_edge(list(s.after), s.name)  # waits for all of them
+        if not successors[s.name]:
+            g.add_edge(s.name, END)
+    for name, gate in gated.items():
+        targets = successors[name]
+
+        def route(state: dict, gate=gate, targets=targets) -> list[str] | str:
+            return list(targets) if gate(state) else fail[0]
+
+        g.add_conditional_edges(name, route, [*targets, fail[0]])
+    return g
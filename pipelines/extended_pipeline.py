@@ -1,24 +1,35 @@
 """
 IQRAA V2 — Extended Pipeline (LangGraph)
 ==========================================
-AGT-01 (تحليل) → G1 (جودة) → AGT-02 (كيانات) → AGT-05 (تحقق) → AGT-04 (توليف)
+AGT-01 (تحليل) → G1 (جودة) → [AGT-02 (كيانات) ∥ AGT-05 (تحقق) ∥ AGT-03 (مراجع تقاطعية)] → AGT-04 (توليف)
+الحواف مشتقة من اعتماديات كل مرحلة (pipelines.dag).
+
+G1 يجري تمريرة G1 + AGT-05 المدمجة (verification.fused)، فلا يعيد AGT-05 قراءة الأدلة؛
+نمط G1 وإعداداته من ملف configs/*.yaml (g1_profile).
+AGT-03 يعمل مع CrossRefRegistry مشترك بين التشغيلات: كل مصدر يُقارن بما سُجّل قبله.
 """
 from __future__ import annotations
 import asyncio
-from typing import Any, TypedDict
+from typing import Annotated, Any, Mapping, Optional, TypedDict
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from core.run_context import UnifiedRunContext
 from core.canonical_policy import canonicalize
 from agents.agt01_text_analysis import TextAnalysisAgent
 from agents.agt02_entity_linking import EntityLinkingAgent
+from agents.agt03_cross_reference import CrossReferenceAgent
 from agents.agt05_verification import VerificationAgent
 from agents.agt04_synthesis import SynthesisAgent
-from governance.g1_quality_gate import run_g1_gate
+from verification.fused import validate_fused
+from governance.g1_quality_gate import g1_profile
+from pipelines.context import node_context, ctx_update, merge_run_ctx
+from pipelines.dag import Stage, build_dag
+from crossref.registry import CrossRefRegistry
 
 class ExtPipelineState(TypedDict, total=False):
     text: str
     source_id: str
-    run_ctx_dict: dict
+    run_ctx_dict: Annotated[dict, merge_run_ctx]  # parallel branches may each return a copy
     claims: list
     evidences: list
     canonical_text: str
@@ -29,67 +40,83 @@ class ExtPipelineState(TypedDict, total=False):
     entities: list
     verification_passed: bool
     verified_count: int
+    verification_results: list
+    cross_refs: list
     synthesis: dict
     pipeline_success: bool
     errors: list
 
-async def node_agt01(state: ExtPipelineState) -> dict:
+async def node_agt01(state: ExtPipelineState, config: RunnableConfig) -> dict:
     agent = TextAnalysisAgent()
-    ctx = UnifiedRunContext(**state.get("run_ctx_dict", {}))
+    ctx, live = node_context(state, config)
     r = await agent.run(ctx, {"text": state["text"], "source_id": state.get("source_id", "unknown")})
     if not r.success:
         return {"agt01_success": False, "errors": r.errors, "pipeline_success": False}
-    return {"claims": r.output.get("claims", []), "evidences": [e.model_dump() for e in r.evidence], "canonical_text": canonicalize(state["text"]), "agt01_success": True, "run_ctx_dict": ctx.model_dump(mode="json")}
-
-async def node_g1(state: ExtPipelineState) -> dict:
-    from core.models import Evidence
-    evs = [Evidence(**e) if isinstance(e, dict) else e for e in state.get("evidences", [])]
-    r = run_g1_gate(state.get("claims", []), evs)
-    return {"g1_passed": r.passed, "g1_score": r.score, "g1_issues": r.issues}
+    return {"claims": r.output.get("claims", []), "evidences": [e.model_dump() for e in r.evidence], "canonical_text": canonicalize(state["text"]), "agt01_success": True, **ctx_update(ctx, live, state)}
 
-def route_g1(state: ExtPipelineState) -> str:
-    return "agt02_entities" if state.get("g1_passed") else "fail_end"
+def make_node_g1(g1: Optional[Mapping[str, Any]] = None):
+    settings = dict(g1 or {})
+    async def node_g1(state: ExtPipelineState) -> dict:
+        from core.models import Evidence
+        evs = [Evidence(**e) if isinstance(e, dict) else e for e in state.get("evidences", [])]
+        fused = validate_fused(state.get("claims", []), evs, state.get("canonical_text", ""), **settings)
+        r = fused.g1
+        return {"g1_passed": r.passed, "g1_score": r.score, "g1_issues": r.issues, "verification_results": fused.results}
+    return node_g1
 
-async def node_agt02(state: ExtPipelineState) -> dict:
+async def node_agt02(state: ExtPipelineState, config: RunnableConfig) -> dict:
     agent = EntityLinkingAgent()
-    ctx = UnifiedRunContext(**state.get("run_ctx_dict", {}))
+    ctx, live = node_context(state, config)
     r = await agent.run(ctx, {"text": state.get("canonical_text", ""), "source_id": state.get("source_id", "unknown")})
-    return {"entities": r.output.get("entities", []) if r.success else [], "run_ctx_dict": ctx.model_dump(mode="json")}
+    return {"entities": r.output.get("entities", []) if r.success else [], **ctx_update(ctx, live, state)}
 
-async def node_agt05(state: ExtPipelineState) -> dict:
-    from core.models import Evidence
+async def node_agt05(state: ExtPipelineState, config: RunnableConfig) -> dict:
     agent = VerificationAgent()
-    ctx = UnifiedRunContext(**state.get("run_ctx_dict", {}))
-    evs = [Evidence(**e) if isinstance(e, dict) else e for e in state.get("evidences", [])]
-    r = await agent.run(ctx, {"claims": state.get("claims", []), "evidences": evs, "canonical_text": state.get("canonical_text", ""), "source_id": state.get("source_id", "unknown")})
-    return {"verification_passed": r.output.get("all_passed", False), "verified_count": r.output.get("verified_count", 0), "run_ctx_dict": ctx.model_dump(mode="json")}
+    ctx, live = node_context(state, config)
+    results = state.get("verification_results")  # written by the fused G1 pass, which always runs first
+    if results is not None:
+        r = await agent.record_fused(ctx, results)
+    else:
+        r = await agent.run(ctx, {"claims": state.get("claims", []), "evidences": state.get("evidences", []), "canonical_text": state.get("canonical_text", ""), "source_id": state.get("source_id", "unknown")})
+    return {"verification_passed": r.output.get("all_passed", False), "verified_count": r.output.get("verified_count", 0), **ctx_update(ctx, live, state)}
 
-async def node_agt04(state: ExtPipelineState) -> dict:
+def make_node_agt03(registry: Optional[CrossRefRegistry]):
+    async def node_agt03(state: ExtPipelineState, config: RunnableConfig) -> dict:
+        if registry is None or not state.get("claims"):
+            return {"cross_refs": []}
+        agent = CrossReferenceAgent()
+        ctx, live = node_context(state, config)
+        r = await agent.run(ctx, {"registry": registry, "claims": state["claims"], "source_id": state.get("source_id", "unknown")})
+        return {"cross_refs": r.output.get("cross_refs", []) if r.success else [], **ctx_update(ctx, live, state)}
+    return node_agt03
+
+async def node_agt04(state: ExtPipelineState, config: RunnableConfig) -> dict:
     agent = SynthesisAgent()
-    ctx = UnifiedRunContext(**state.get("run_ctx_dict", {}))
-    r = await agent.run(ctx, {"claims": state.get("claims", []), "entities": state.get("entities", []), "cross_refs": [], "source_id": state.get("source_id", "unknown")})
-    return {"synthesis": r.output if r.success else {}, "pipeline_success": True, "run_ctx_dict": ctx.model_dump(mode="json")}
+    ctx, live = node_context(state, config)
+    r = await agent.run(ctx, {"claims": state.get("claims", []), "entities": state.get("entities", []), "cross_refs": state.get("cross_refs", []), "source_id": state.get("source_id", "unknown")})
+    return {"synthesis": r.output if r.success else {}, "pipeline_success": True, **ctx_update(ctx, live, state)}
 
 async def node_fail(state: ExtPipelineState) -> dict:
     return {"pipeline_success": False, "errors": state.get("g1_issues", []) + state.get("errors", [])}
 
-def build_extended_pipeline() -> StateGraph:
-    g = StateGraph(ExtPipelineState)
-    g.add_node("agt01_analyze", node_agt01)
-    g.add_node("g1_quality", node_g1)
-    g.add_node("agt02_entities", node_agt02)
-    g.add_node("agt05_verify", node_agt05)
-    g.add_node("agt04_synthesize", node_agt04)
-    g.add_node("fail_end", node_fail)
-    g.set_entry_point("agt01_analyze")
-    g.add_edge("agt01_analyze", "g1_quality")
-    g.add_conditional_edges("g1_quality", route_g1, {"agt02_entities": "agt02_entities", "fail_end": "fail_end"})
-    g.add_edge("agt02_entities", "agt05_verify")
-    g.add_edge("agt05_verify", "agt04_synthesize")
-    g.add_edge("agt04_synthesize", END)
-    g.add_edge("fail_end", END)
-    return g
+def extended_stages(registry: Optional[CrossRefRegistry] = None, g1: Optional[Mapping[str, Any]] = None) -> list[Stage]:
+    """AGT-02, AGT-05 and AGT-03 need only AGT-01 + G1 outputs, so they run in parallel and join at AGT-04."""
+    return [
+        Stage("agt01_analyze", node_agt01),
+        Stage("g1_quality", make_node_g1(g1), after=("agt01_analyze",), gate=lambda s: bool(s.get("g1_passed"))),
+        Stage("agt02_entities", node_agt02, after=("g1_quality",)),
+        Stage("agt05_verify", node_agt05, after=("g1_quality",)),
+        Stage("agt03_crossref", make_node_agt03(registry), after=("g1_quality",)),
+        Stage("agt04_synthesize", node_agt04, after=("agt02_entities", "agt05_verify", "agt03_crossref")),
+    ]
+
+def build_extended_pipeline(registry: Optional[CrossRefRegistry] = None, g1: Optional[Mapping[str, Any]] = None) -> StateGraph:
+    """registry=None skips cross-referencing (AGT-04 gets no cross_refs); g1: G1 settings (full mode if None)."""
+    return build_dag(ExtPipelineState, extended_stages(registry, g1), fail=("fail_end", node_fail))
 
-async def run_extended(text: str, source_id: str = "source") -> dict:
-    app = build_extended_pipeline().compile()
-    return await app.ainvoke({"text": text, "source_id": source_id, "run_ctx_dict": {}, "errors": []})
+async def run_extended(text: str, source_id: str = "source", registry: Optional[CrossRefRegistry] = None,
+                       run_ctx: Optional[UnifiedRunContext] = None, profile: Optional[str] = None) -> dict:
+    """profile: configs/*.yaml name or path whose g1 section configures the gate."""
+    from pipelines.runner import compiled_pipeline, invoke_pipeline
+    config = (registry, g1_profile(profile)) if profile else (registry,)
+    return await invoke_pipeline(compiled_pipeline("extended", *config), text, source_id, run_ctx)
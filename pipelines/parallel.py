@@ -0,0 +1,139 @@
+"""
+IQRAA V2 — Process-Pool Corpus Executor
+=========================================
+المسار القاعدي (AGT-01، AGT-02، G1، AGT-05) عمل Python على المعالج، فالتزامن بـ asyncio
+لا يسرّعه تحت GIL — هنا توزيع المدونة على عمليات:
+- كل عملية عاملة تبقى دافئة: رسم مترجم (PipelineRunner) ووكلاء وحلقة أحداث، تُنشأ مرة واحدة
+- المستندات تُوزَّع كتلاً متوازنة الحجم (مجموع الأحرف)، لا بالعدد
+- النتائج تعود مستنداً مستنداً عبر طابور (multiprocessing.Queue) فور اكتمالها
+
+لا تُدعم كائنات إعداد مشتركة (مثل CrossRefRegistry): كل عملية ستحمل نسخة منفصلة.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import multiprocessing as mp
+import os
+import queue as queue_errors
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional, Sequence
+
+from pipelines.batch import CorpusSummary, Document, DocResult, _run_one, _split, run_cost
+from pipelines.runner import PipelineRunner
+
+# worker-side state (set by _init_worker)
+_runner: Optional[PipelineRunner] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_results = None
+_fields: Optional[tuple[str, ...]] = None
+
+
+def balanced_chunks(sizes: Sequence[int], n_chunks: int) -> list[list[int]]:
+    """Indices split into n_chunks with near-equal total size (largest first, into the lightest chunk)."""
+    n_chunks = max(1, min(n_chunks, len(sizes)))
+    heap = [(0, k) for k in range(n_chunks)]
+    chunks: list[list[int]] = [[] for _ in range(n_chunks)]
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i]):
+        total, k = heapq.heappop(heap)
+        chunks[k].append(i)
+        heapq.heappush(heap, (total + sizes[i], k))
+    return [sorted(c) for c in chunks if c]
+
+
+def _init_worker(variant: str, results, fields: Optional[tuple[str, ...]]) -> None:
+    global _runner, _loop, _results, _fields
+    _runner = PipelineRunner(variant)
+    _loop = asyncio.new_event_loop()
+    _results = results
+    _fields = fields
+
+
+def _project(doc: DocResult) -> tuple[DocResult, float]:
+    """The result limited to _fields (pipeline_success always kept, for DocResult.ok), and the run's cost —
+    read before projecting, since run_ctx_dict may not be among the fields."""
+    if doc.result is None:
+        return doc, 0.0
+    cost = run_cost(doc.result)
+    if _fields is None:
+        return doc, cost
+    keep = {*_fields, "pipeline_success"}
+    return doc._replace(result={k: v for k, v in doc.result.items() if k in keep}), cost
+
+
+def _run_chunk(chunk: list[tuple[int, str, str]]) -> int:
+    for index, source_id, text in chunk:
+        _results.put(_project(_loop.run_until_complete(_run_one(_runner, index, source_id, text))))
+    return len(chunk)
+
+
+def _lost(index: int, source_id: str) -> DocResult:
+    return DocResult(index, source_id, None, "ResultLost: the worker finished but its result never arrived", 0.0)
+
+
+def iter_corpus_processes(docs: Iterable[Document], workers: Optional[int] = None, variant: str = "extended",
+                          chunks_per_worker: int = 4, fields: Optional[Sequence[str]] = None,
+                          summary: Optional[CorpusSummary] = None, poll_sec: float = 0.5) -> Iterator[DocResult]:
+    """Yield each document's result as it completes in a pool of warm worker processes.
+
+    fields limits the pipeline state sent back per document (None sends it all); the summary still
+    counts success and cost from the full state. A result that cannot reach the parent (e.g. it fails
+    to pickle) is yielded as a ResultLost error once every worker has finished and the queue is drained.
+    """
+    workers = workers or os.cpu_count() or 1
+    summary = summary if summary is not None else CorpusSummary()
+    fields = tuple(fields) if fields is not None else None
+    items = [(i, *_split(doc, i)) for i, doc in enumerate(docs)]
+    start = time.perf_counter()
+    if workers <= 1:
+        previous = asyncio.get_event_loop_policy().get_event_loop()
+        _init_worker(variant, None, fields)
+        try:
+            for index, source_id, text in items:
+                doc, cost = _project(_loop.run_until_complete(_run_one(_runner, index, source_id, text)))
+                summary.add(doc, cost)
+                summary.elapsed_sec = time.perf_counter() - start
+                yield doc
+        finally:
+            _loop.close()
+            asyncio.set_event_loop(previous)  # LangGraph makes the loop it runs on the current one
+        return
+
+    chunks = balanced_chunks([len(text) for _, _, text in items], workers * chunks_per_worker)
+    ctx = mp.get_context()
+    results = ctx.Queue()
+    with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(variant, results, fields)) as pool:
+        futures = [pool.submit(_run_chunk, [items[i] for i in chunk]) for chunk in chunks]
+        waiting = {index: source_id for index, source_id, _ in items}
+        settled = False  # every chunk finished and one full poll since found the queue empty
+        while waiting:
+            try:
+                doc, cost = results.get(timeout=poll_sec)
+            except queue_errors.Empty:
+                failed = next((f for f in futures if f.done() and f.exception() is not None), None)
+                if failed is not None:  # a worker died; its documents will never arrive
+                    raise failed.exception()
+                if settled:
+                    break
+                settled = all(f.done() for f in futures)
+                continue
+            del waiting[doc.index]
+            settled = False
+            summary.add(doc, cost)
+            summary.elapsed_sec = time.perf_counter() - start
+            yield doc
+        for index, source_id in sorted(waiting.items()):
+            doc = _lost(index, source_id)
+            summary.add(doc)
+            summary.elapsed_sec = time.perf_counter() - start
+            yield doc
+
+
+def run_corpus_processes(docs: Iterable[Document], workers: Optional[int] = None, variant: str = "extended",
+                         **kwargs) -> tuple[list[DocResult], CorpusSummary]:
+    """All results in input order, plus the corpus summary."""
+    summary = CorpusSummary()
+    results = sorted(iter_corpus_processes(docs, workers, variant, summary=summary, **kwargs), key=lambda d: d.index)
+    return results, summary
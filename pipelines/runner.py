@@ -0,0 +1,87 @@
+"""
+IQRAA V2 — Compiled Pipeline Cache & Runner
+=============================================
+بناء رسم LangGraph وترجمته (compile) يتمان مرة واحدة لكل (نسخة المسار، الإعداد)
+ثم يُعاد استخدام الرسم المترجم في كل تشغيل.
+
+- المفتاح: اسم النسخة + هوية كائنات الإعداد (مثل CrossRefRegistry) — الكاش يحتفظ بها حية
+  (سجلان بنفس الإعدادات يحملان بيانات مختلفة، فلا يُشتركان في رسم)
+- الكاش محدود (LRU، MAX_COMPILED رسماً): إنشاء سجلات كثيرة لا يُبقي رسومها وسجلاتها للأبد
+- invalidate() يمسح الكاش صراحةً (كله أو لنسخة واحدة)
+- PipelineRunner لخدمة طويلة العمر: يترجم عند الإنشاء ثم يشغّل مباشرة
+- سياق التشغيل يمر حياً إلى العقد (pipelines.context) ويُسلسَل مرة واحدة في المخرجات
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from importlib import import_module
+from typing import Any, Optional
+
+from core.run_context import UnifiedRunContext
+from pipelines.context import live_config
+
+# variant → (module, graph builder); imported lazily so pipeline modules can use this cache
+VARIANTS = {
+    "thin_slice": ("pipelines.thin_slice", "build_thin_slice_graph"),
+    "extended": ("pipelines.extended_pipeline", "build_extended_pipeline"),
+}
+
+MAX_COMPILED = 16
+_COMPILED: OrderedDict[tuple, tuple[Any, tuple]] = OrderedDict()
+
+
+def compiled_pipeline(variant: str, *config: Any):
+    """The compiled graph for a variant; config objects are passed to its builder and keyed by identity.
+
+    The least recently used graph is dropped past MAX_COMPILED entries.
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"unknown pipeline variant {variant!r}")
+    key = (variant, tuple(id(c) for c in config))
+    if key in _COMPILED:
+        _COMPILED.move_to_end(key)
+        return _COMPILED[key][0]
+    module, builder = VARIANTS[variant]
+    app = getattr(import_module(module), builder)(*config).compile()
+    _COMPILED[key] = (app, config)  # holding config keeps its id from being reused while cached
+    while len(_COMPILED) > MAX_COMPILED:
+        _COMPILED.popitem(last=False)
+    return app
+
+
+def invalidate(variant: Optional[str] = None) -> int:
+    """Drop cached graphs (all, or one variant's); returns how many were dropped."""
+    keys = [k for k in _COMPILED if variant is None or k[0] == variant]
+    for k in keys:
+        del _COMPILED[k]
+    return len(keys)
+
+
+def initial_state(text: str, source_id: str) -> dict:
+    return {"text": text, "source_id": source_id, "run_ctx_dict": {}, "errors": []}
+
+
+async def invoke_pipeline(app, text: str, source_id: str, run_ctx: Optional[UnifiedRunContext] = None) -> dict:
+    """Run a compiled graph with a live context; run_ctx_dict in the result is its only serialization."""
+    ctx = run_ctx or UnifiedRunContext()
+    result = await app.ainvoke(initial_state(text, source_id), live_config(ctx))
+    result["run_ctx_dict"] = ctx.model_dump(mode="json")
+    return result
+
+
+class PipelineRunner:
+    """Holds one compiled graph; each run() only invokes it."""
+
+    def __init__(self, variant: str = "extended", *config: Any):
+        self.variant = variant
+        self.config = config
+        self.app = compiled_pipeline(variant, *config)
+        self.runs = 0
+
+    def reload(self) -> None:
+        """Pick up a rebuilt graph after invalidate()."""
+        self.app = compiled_pipeline(self.variant, *self.config)
+
+    async def run(self, text: str, source_id: str = "source", run_ctx: Optional[UnifiedRunContext] = None) -> dict:
+        self.runs += 1
+        return await invoke_pipeline(self.app, text, source_id, run_ctx)
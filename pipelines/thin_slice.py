@@ -1,16 +1,21 @@
 """
 IQRAA V2 - Thin Slice Pipeline (LangGraph)
 AGT-01 > G1 > AGT-05 > result
+G1 runs the fused G1 + AGT-05 pass; AGT-05 records its results without re-reading the evidence.
+G1 settings (mode, max_issues, sampling) come from a configs/*.yaml profile — see governance.g1_quality_gate.g1_profile.
 """
 from __future__ import annotations
 import asyncio
-from typing import Any, TypedDict
+from typing import Any, Mapping, Optional, TypedDict
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from core.run_context import UnifiedRunContext
 from core.canonical_policy import canonicalize, CanonicalPolicy
 from agents.agt01_text_analysis import TextAnalysisAgent
 from agents.agt05_verification import VerificationAgent
-from governance.g1_quality_gate import run_g1_gate
+from verification.fused import validate_fused
+from governance.g1_quality_gate import g1_profile
+from pipelines.context import node_context, ctx_update
 
 class PipelineState(TypedDict, total=False):
     text: str
@@ -29,41 +34,48 @@ class PipelineState(TypedDict, total=False):
     pipeline_success: bool
     errors: list
 
-async def node_agt01(state: PipelineState) -> dict:
+async def node_agt01(state: PipelineState, config: RunnableConfig) -> dict:
     agent = TextAnalysisAgent()
-    ctx = UnifiedRunContext(**state.get("run_ctx_dict", {}))
+    ctx, live = node_context(state, config)
     result = await agent.run(ctx, {"text": state["text"], "source_id": state.get("source_id", "unknown")})
     if not result.success:
         return {"agt01_success": False, "errors": result.errors, "pipeline_success": False}
     canonical_text = canonicalize(state["text"])
-    return {"claims": result.output.get("claims", []), "evidences": [e.model_dump() for e in result.evidence], "canonical_text": canonical_text, "agt01_success": True, "run_ctx_dict": ctx.model_dump(mode="json")}
+    return {"claims": result.output.get("claims", []), "evidences": [e.model_dump() for e in result.evidence], "canonical_text": canonical_text, "agt01_success": True, **ctx_update(ctx, live, state)}
 
-async def node_g1_gate(state: PipelineState) -> dict:
-    from core.models import Evidence
-    evidences = [Evidence(**e) if isinstance(e, dict) else e for e in state.get("evidences", [])]
-    result = run_g1_gate(state.get("claims", []), evidences)
-    return {"g1_passed": result.passed, "g1_score": result.score, "g1_issues": result.issues}
+def make_node_g1_gate(g1: Optional[Mapping[str, Any]] = None):
+    settings = dict(g1 or {})
+    async def node_g1_gate(state: PipelineState) -> dict:
+        from core.models import Evidence
+        evidences = [Evidence(**e) if isinstance(e, dict) else e for e in state.get("evidences", [])]
+        fused = validate_fused(state.get("claims", []), evidences, state.get("canonical_text", ""), **settings)
+        result = fused.g1
+        return {"g1_passed": result.passed, "g1_score": result.score, "g1_issues": result.issues, "verification_results": fused.results}
+    return node_g1_gate
 
 def route_after_g1(state: PipelineState) -> str:
     if state.get("g1_passed"):
         return "agt05_verify"
     return "fail_end"
 
-async def node_agt05(state: PipelineState) -> dict:
-    from core.models import Evidence
+async def node_agt05(state: PipelineState, config: RunnableConfig) -> dict:
     agent = VerificationAgent()
-    ctx = UnifiedRunContext(**state.get("run_ctx_dict", {}))
-    evidences = [Evidence(**e) if isinstance(e, dict) else e for e in state.get("evidences", [])]
-    result = await agent.run(ctx, {"claims": state.get("claims", []), "evidences": evidences, "canonical_text": state.get("canonical_text", ""), "source_id": state.get("source_id", "unknown")})
-    return {"verification_passed": result.output.get("all_passed", False), "verified_count": result.output.get("verified_count", 0), "verification_results": result.output.get("results", []), "pipeline_success": result.output.get("all_passed", False), "run_ctx_dict": ctx.model_dump(mode="json")}
+    ctx, live = node_context(state, config)
+    results = state.get("verification_results")  # written by the fused G1 pass, which always runs first
+    if results is not None:
+        result = await agent.record_fused(ctx, results)
+    else:
+        result = await agent.run(ctx, {"claims": state.get("claims", []), "evidences": state.get("evidences", []), "canonical_text": state.get("canonical_text", ""), "source_id": state.get("source_id", "unknown")})
+    return {"verification_passed": result.output.get("all_passed", False), "verified_count": result.output.get("verified_count", 0), "verification_results": result.output.get("results", []), "pipeline_success": result.output.get("all_passed", False), **ctx_update(ctx, live, state)}
 
 async def node_fail(state: PipelineState) -> dict:
     return {"pipeline_success": False, "errors": state.get("g1_issues", []) + state.get("errors", [])}
 
-def build_thin_slice_graph() -> StateGraph:
+def build_thin_slice_graph(g1: Optional[Mapping[str, Any]] = None) -> StateGraph:
+    """g1: run_g1_gate settings for the G1 node (full mode if None), e.g. g1_profile("creative-lite")."""
     graph = StateGraph(PipelineState)
     graph.add_node("agt01_analyze", node_agt01)
-    graph.add_node("g1_quality", node_g1_gate)
+    graph.add_node("g1_quality", make_node_g1_gate(g1))
     graph.add_node("agt05_verify", node_agt05)
     graph.add_node("fail_end", node_fail)
     graph.set_entry_point("agt01_analyze")
@@ -76,8 +88,9 @@ def build_thin_slice_graph() -> StateGraph:
 def compile_thin_slice():
     return build_thin_slice_graph().compile()
 
-async def run_thin_slice(text: str, source_id: str = "test_source") -> dict:
-    app = compile_thin_slice()
-    initial_state = {"text": text, "source_id": source_id, "run_ctx_dict": {}, "errors": []}
-    result = await app.ainvoke(initial_state)
-    return result
+async def run_thin_slice(text: str, source_id: str = "test_source", run_ctx: Optional[UnifiedRunContext] = None,
+                         profile: Optional[str] = None) -> dict:
+    """profile: configs/*.yaml name or path whose g1 section configures the gate."""
+    from pipelines.runner import compiled_pipeline, invoke_pipeline
+    config = (g1_profile(profile),) if profile else ()
+    return await invoke_pipeline(compiled_pipeline("thin_slice", *config), text, source_id, run_ctx)
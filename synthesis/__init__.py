@@ -0,0 +1,3 @@
+"""IQRAA V2 Synthesis Package — توليف التقارير على مستوى المصدر والمدونة (AGT-04)"""
+from .streaming import StreamingSynthesizer, SECTIONS, section_of, claim_confidence, claim_item
+from .report import SynthesisReport, merge, reduce_reports
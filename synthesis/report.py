@@ -0,0 +1,110 @@
+"""
+IQRAA V2 — Mergeable Synthesis Reports
+========================================
+تمثيل قابل للدمج لتقرير AGT-04: عدّادات الأقسام، أعلى k عنصراً لكل قسم،
+عدّادات الكيانات، وعدد المراجع التقاطعية.
+
+- merge(a, b) تجميعي (associative): ترتيب العناصر كلّي (الثقة، المصدر، الترتيب داخل المصدر)
+  فأعلى k من الاتحاد لا يتغير بتغيير طريقة التجميع
+- reduce_reports: دمج شجري لمئات التقارير على مجمع عمليات، بدل إعادة التوليف من الادعاءات الخام
+"""
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import reduce
+from itertools import islice
+from typing import Optional, Sequence
+
+from .streaming import SECTIONS
+
+# (-confidence, source_id, seq, item): ascending order = best first
+_Entry = tuple[float, str, int, dict]
+
+
+@dataclass
+class SynthesisReport:
+    top_k: int = 50
+    source_ids: list[str] = field(default_factory=list)
+    total_claims: int = 0
+    counts: dict[str, int] = field(default_factory=dict)
+    items: dict[str, list[_Entry]] = field(default_factory=dict)
+    entities: Counter = field(default_factory=Counter)
+    cross_ref_count: int = 0
+
+    @classmethod
+    def from_output(cls, output: dict, top_k: int = 50) -> "SynthesisReport":
+        """From an AGT-04 report dict (batch or streaming mode)."""
+        source_id = output.get("source_id", "unknown")
+        report = cls(top_k=top_k, source_ids=[source_id], total_claims=output.get("total_claims", 0),
+                     cross_ref_count=output.get("cross_ref_count", 0))
+        for section in output.get("sections", []):
+            title = section["section"]
+            report.counts[title] = report.counts.get(title, 0) + section.get("count", len(section["items"]))
+            entries = [(-item["confidence"], source_id, seq, item) for seq, item in enumerate(section["items"])]
+            report.items[title] = heapq.nsmallest(top_k, entries, key=_key)
+        for e in output.get("entity_summary", []):
+            report.entities[(e.get("text", ""), e.get("type", "unknown"))] += e.get("count", 1)
+        return report
+
+    def to_output(self, source_id: str = "corpus") -> dict:
+        """Same shape as an AGT-04 report, plus the merged source ids."""
+        sections = [{"section": title, "items": [e[3] for e in self.items.get(title, [])], "count": self.counts[title]}
+                    for title, _ in SECTIONS if self.counts.get(title)]
+        ranked = sorted(self.entities.items(), key=lambda kv: (-kv[1], kv[0]))
+        return {
+            "source_id": source_id,
+            "source_ids": list(self.source_ids),
+            "total_claims": self.total_claims,
+            "sections": sections,
+            "entity_summary": [{"text": t, "type": et, "count": n} for (t, et), n in ranked],
+            "cross_ref_count": self.cross_ref_count,
+        }
+
+
+def _key(entry: _Entry) -> tuple[float, str, int]:
+    return entry[:3]
+
+
+def merge(a: SynthesisReport, b: SynthesisReport) -> SynthesisReport:
+    """Associative merge; the result keeps min(top_k) items per section."""
+    top_k = min(a.top_k, b.top_k)
+    seen = set(a.source_ids)
+    items = {}
+    for title in a.items.keys() | b.items.keys():
+        items[title] = list(islice(heapq.merge(a.items.get(title, []), b.items.get(title, []), key=_key), top_k))
+    return SynthesisReport(
+        top_k=top_k,
+        source_ids=a.source_ids + [s for s in b.source_ids if s not in seen],
+        total_claims=a.total_claims + b.total_claims,
+        counts=dict(Counter(a.counts) + Counter(b.counts)),
+        items=items,
+        entities=a.entities + b.entities,
+        cross_ref_count=a.cross_ref_count + b.cross_ref_count,
+    )
+
+
+def _reduce_chunk(reports: Sequence[SynthesisReport]) -> SynthesisReport:
+    return reduce(merge, reports)
+
+
+def reduce_reports(reports: Sequence[SynthesisReport], workers: Optional[int] = None,
+                   fan_in: int = 8) -> SynthesisReport:
+    """Tree reduction: each level merges runs of fan_in adjacent reports in parallel.
+
+    Adjacent runs keep input order, so the result equals reduce(merge, reports).
+    A merge is cheap (top_k items per section); the pool pays off only for large top_k or
+    entity tables — workers=1 reduces in-process.
+    """
+    if not reports:
+        raise ValueError("reduce_reports: no reports")
+    level = list(reports)
+    if workers is not None and workers <= 1:
+        return _reduce_chunk(level)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while len(level) > 1:
+            chunks = [level[i:i + fan_in] for i in range(0, len(level), fan_in)]
+            level = list(pool.map(_reduce_chunk, chunks))
+    return level[0]
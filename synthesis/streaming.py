@@ -0,0 +1,145 @@
+"""
+IQRAA V2 — Streaming Synthesis
+================================
+توليف على مستوى المدونة بذاكرة ثابتة: الادعاءات تُقرأ من مكرِّر مرة واحدة،
+وكل ادعاء يُصنَّف في قسمه بحساب ثقته مرة واحدة، ولا يُحتفظ إلا بأعلى k لكل قسم (heap).
+
+- العدّادات تشمل كل الادعاءات؛ العناصر المعروضة هي الأعلى ثقة فقط
+- التقرير يُكتب تدريجياً أسطر JSONL (رأس، قسم لكل سطر، كيانات، خاتمة)
+"""
+from __future__ import annotations
+
+import heapq
+import json
+from collections import Counter
+from typing import Any, Iterable, Iterator, Optional, TextIO
+
+# (title, min confidence) — first match wins, so order is descending
+SECTIONS = (
+    ("core_findings", 0.7),
+    ("supporting_evidence", 0.4),
+    ("needs_verification", float("-inf")),
+)
+
+
+def claim_confidence(claim: Any) -> float:
+    if isinstance(claim, dict):
+        return claim.get("confidence", 0.5)
+    return getattr(claim, "confidence", 0.5)
+
+
+def section_of(confidence: float) -> str:
+    for title, floor in SECTIONS:
+        if confidence >= floor:
+            return title
+    return SECTIONS[-1][0]
+
+
+def claim_item(claim: Any, confidence: float) -> dict:
+    """The AGT-04 report item for one claim."""
+    if isinstance(claim, dict):
+        text, ev_ids = claim.get("text", ""), claim.get("evidence_ids", [])
+    else:
+        text, ev_ids = claim.text, claim.evidence_ids
+    return {
+        "claim_text": text,
+        "confidence": confidence,
+        "evidence_count": len(ev_ids),
+        "citations": list(ev_ids),
+    }
+
+
+class StreamingSynthesizer:
+    """One-pass bucketing with a bounded top-k heap per section.
+
+    Ties in confidence keep the earlier claim, so output is independent of heap internals.
+    """
+
+    def __init__(self, source_id: str = "corpus", top_k: int = 50):
+        self.source_id = source_id
+        self.top_k = top_k
+        self.total_claims = 0
+        self.counts: Counter = Counter()
+        self._heaps: dict[str, list[tuple[float, int, dict]]] = {title: [] for title, _ in SECTIONS}
+        self.entities: Counter = Counter()
+        self.cross_ref_count = 0
+
+    def add(self, claim: Any) -> None:
+        conf = claim_confidence(claim)
+        title = section_of(conf)
+        seq = self.total_claims
+        self.total_claims += 1
+        self.counts[title] += 1
+        heap = self._heaps[title]
+        entry = (conf, -seq)
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, (*entry, claim_item(claim, conf)))
+        elif entry > heap[0][:2]:  # build the item only when it survives
+            heapq.heapreplace(heap, (*entry, claim_item(claim, conf)))
+
+    def add_claims(self, claims: Iterable[Any]) -> "StreamingSynthesizer":
+        for claim in claims:
+            self.add(claim)
+        return self
+
+    def add_entities(self, entities: Iterable[Any]) -> None:
+        for e in entities:
+            if isinstance(e, dict):
+                self.entities[(e.get("text", ""), e.get("entity_type", "unknown"))] += 1
+
+    def add_cross_refs(self, count: int) -> None:
+        self.cross_ref_count += count
+
+    # --- output ---
+    def sections(self) -> list[dict]:
+        out = []
+        for title, _ in SECTIONS:
+            if not self.counts[title]:
+                continue
+            items = [item for _, _, item in sorted(self._heaps[title], reverse=True)]
+            out.append({"section": title, "items": items, "count": self.counts[title]})
+        return out
+
+    def entity_summary(self, limit: Optional[int] = None) -> list[dict]:
+        ranked = sorted(self.entities.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return [{"text": t, "type": et, "count": n} for (t, et), n in ranked]
+
+    def report(self) -> dict:
+        return {
+            "source_id": self.source_id,
+            "total_claims": self.total_claims,
+            "sections": self.sections(),
+            "entity_summary": self.entity_summary(),
+            "cross_ref_count": self.cross_ref_count,
+        }
+
+    def to_report(self):
+        """Mergeable form (see synthesis.report)."""
+        from .report import SynthesisReport
+        return SynthesisReport(
+            top_k=self.top_k,
+            source_ids=[self.source_id],
+            total_claims=self.total_claims,
+            counts={t: n for t, n in self.counts.items() if n},
+            items={title: [(-conf, self.source_id, -neg_seq, item)
+                           for conf, neg_seq, item in sorted(self._heaps[title], reverse=True)]
+                   for title, _ in SECTIONS if self._heaps[title]},
+            entities=Counter(self.entities),
+            cross_ref_count=self.cross_ref_count,
+        )
+
+    def iter_jsonl(self) -> Iterator[str]:
+        """Header, one line per section, entities, footer."""
+        yield json.dumps({"type": "header", "source_id": self.source_id, "top_k": self.top_k}, ensure_ascii=False)
+        for section in self.sections():
+            yield json.dumps({"type": "section", **section}, ensure_ascii=False)
+        yield json.dumps({"type": "entities", "entity_summary": self.entity_summary()}, ensure_ascii=False)
+        yield json.dumps({"type": "footer", "total_claims": self.total_claims,
+                          "cross_ref_count": self.cross_ref_count}, ensure_ascii=False)
+
+    def write_jsonl(self, fp: TextIO) -> int:
+        lines = 0
+        for line in self.iter_jsonl():
+            fp.write(line + "\n")
+            lines += 1
+        return lines
@@ -1,7 +1,7 @@
 """IQRAA V2 — Extra tests for AGT-02 and AGT-03"""
 import asyncio
 import pytest
-from agents.agt02_entity_linking import EntityLinkingAgent
+from agents.agt02_entity_linking import EntityLinkingAgent, EntityMatcher, get_matcher, PERSON_PATTERNS, BOOK_PATTERNS, CONCEPT_PATTERNS
 from agents.agt03_cross_reference import CrossReferenceAgent
 from core.run_context import UnifiedRunContext
 
@@ -39,6 +39,59 @@ def test_agt02_audit_recorded():
         a.run(ctx, {"text": "ابن خلدون", "source_id": "s1"}))
     assert len(ctx.audit_events) >= 1
 
+def test_agt02_matcher_single_pass_all_types():
+    m = get_matcher({"person": PERSON_PATTERNS, "book": BOOK_PATTERNS, "concept": CONCEPT_PATTERNS})
+    text = "قال ابن خلدون في المقدمة ان العصبية"
+    found = [(etype, text[s:e]) for etype, s, e in m.finditer(text)]
+    assert found == [("person", "ابن خلدون"), ("book", "المقدمة"), ("concept", "العصبية")]
+
+def test_agt02_matcher_keeps_cross_type_overlaps():
+    m = get_matcher({"person": PERSON_PATTERNS, "book": BOOK_PATTERNS, "concept": CONCEPT_PATTERNS})
+    text = "قال الشيخ العصبية"
+    found = [(etype, text[s:e]) for etype, s, e in m.finditer(text)]
+    assert found == [("person", "الشيخ العصبية"), ("concept", "العصبية")]
+
+def test_agt02_matcher_equals_per_pattern_scans():
+    import re
+    from core.canonical_policy import canonicalize
+    pats = {"person": PERSON_PATTERNS, "book": BOOK_PATTERNS, "concept": CONCEPT_PATTERNS,
+            "term": ["(?:ابن|ابن خلدون|خلدون)", r"(?:الملك|الملكية)\b"]}
+    text = canonicalize("قال الشيخ ابن خلدون في كتاب المقدمة إن العصبية والملكية والملك أساس الحضارة")
+    expected = [(etype, x.span()) for etype, ps in pats.items() for p in ps
+                for x in re.finditer(canonicalize(p), text)]
+    assert [(etype, (s, e)) for etype, s, e in EntityMatcher(pats).finditer(text)] == expected
+
+def test_agt02_matcher_compiled_once():
+    pats = {"concept": CONCEPT_PATTERNS}
+    assert get_matcher(pats) is get_matcher(dict(pats))
+
+def test_agt02_matcher_canonicalizes_patterns():
+    m = EntityMatcher({"person": [r"(?:الإمام)\s+\w+"]})
+    text = "قال الامام مالك"
+    assert [text[s:e] for _, s, e in m.finditer(text)] == ["الامام مالك"]
+
+def test_agt02_matcher_large_literal_set():
+    words = [f"كلمة{i}" for i in range(3000)]
+    m = EntityMatcher({"term": ["(?:" + "|".join(words) + r")\b"]})
+    text = "كلمة12 و كلمة2999 و كلمة"
+    hits = [text[s:e] for _, s, e in m.finditer(text)]
+    assert hits == ["كلمة12", "كلمة2999"]
+
+def test_agt02_matcher_many_literal_patterns_one_automaton():
+    import random, re
+    from core.canonical_policy import canonicalize
+    rnd = random.Random(7)
+    roots = ["ابن", "ابن خلدون", "خلدون", "الملك", "الملكية", "ملك", "كتاب", "كتابه", "العصبية"]
+    pats = {"person": PERSON_PATTERNS, "book": BOOK_PATTERNS, "concept": CONCEPT_PATTERNS,
+            "term": [f"(?:{'|'.join(rnd.sample(roots, 3))}){rnd.choice(['', chr(92) + 'b'])}" for _ in range(500)]
+            + [f"(?:كلمة{i}|اسم{i})\\b" for i in range(2000)]}
+    m = EntityMatcher(pats)
+    assert [etype for etype, regex, _ in m.scans if regex is not None] == ["person", "person"]
+    text = " ".join(rnd.choice(roots + ["و", "قال", "كلمة7", "اسم1999", "لابن"]) for _ in range(400))
+    expected = [(etype, x.span()) for etype, ps in pats.items() for p in ps
+                for x in re.finditer(canonicalize(p), text)]
+    assert [(etype, (s, e)) for etype, s, e in m.finditer(text)] == expected
+
 # AGT-03 tests
 def test_agt03_card():
     a = CrossReferenceAgent()
@@ -71,3 +124,62 @@ def test_agt03_audit():
     asyncio.get_event_loop().run_until_complete(
         a.run(ctx, {"claims_a": [{"text": "نص"}], "claims_b": [{"text": "نص"}]}))
     assert len(ctx.audit_events) >= 1
+
+def test_agt03_inverted_index_matches_all_pairs():
+    claims_a = [{"text": "العمران البشري ضروري للاجتماع"}, {"text": "الملك غاية العصبية"}, {"text": "نص اخر تماما"}]
+    claims_b = [{"text": "العصبية غايتها الملك"}, {"text": "الاجتماع الانساني ضروري"}, {"text": "العمران البشري ضروري"}]
+    outs = {}
+    for method in ("inverted_index", "term_overlap"):
+        r = asyncio.get_event_loop().run_until_complete(
+            CrossReferenceAgent().run(UnifiedRunContext(), {"claims_a": claims_a, "claims_b": claims_b, "method": method}))
+        assert r.success
+        outs[method] = [(x["claim_a"], x["claim_b"], x["overlap_score"], sorted(x["shared_terms"])) for x in r.output["cross_refs"]]
+    assert outs["inverted_index"] == outs["term_overlap"]
+    assert outs["inverted_index"]
+
+def test_agt03_unknown_method_fails():
+    r = asyncio.get_event_loop().run_until_complete(
+        CrossReferenceAgent().run(UnifiedRunContext(), {"claims_a": [{"text": "نص"}], "claims_b": [{"text": "نص"}], "method": "magic"}))
+    assert not r.success
+
+def test_agt03_minhash_lsh_finds_near_duplicates():
+    claims_a = [{"text": "العمران البشري ضروري للاجتماع الانساني والتعاون"}, {"text": "نص اخر تماما"}]
+    claims_b = [{"text": "كلام لا علاقة له"}, {"text": "العمران البشري ضروري للاجتماع الانساني"}]
+    r = asyncio.get_event_loop().run_until_complete(
+        CrossReferenceAgent().run(UnifiedRunContext(), {"claims_a": claims_a, "claims_b": claims_b, "method": "minhash_lsh"}))
+    assert [(x["claim_a"], x["claim_b"]) for x in r.output["cross_refs"]] == [(0, 1)]
+
+
+def test_agt03_parallel_inverted_index_matches_sequential():
+    from crossref.parallel import parallel_overlap_pairs
+    from crossref.inverted_index import TermIndex, overlap_pairs
+    words = ["عصبية", "ملك", "دولة", "غزالي", "فلاسفة", "تهافت", "حديث", "سند", "رواية", "بداوة"]
+    terms_a = [frozenset(words[k % 10] for k in range(i, i + 3 + i % 4)) for i in range(60)]
+    terms_b = [frozenset(words[k % 10] for k in range(j * 3, j * 3 + 2 + j % 3)) for j in range(40)] + [frozenset()]
+    index_b = TermIndex()
+    index_b.extend(terms_b)
+    expected = list(overlap_pairs(terms_a, index_b, 0.3))
+    assert list(parallel_overlap_pairs(terms_a, terms_b, 0.3, workers=2, shard_size=7)) == expected
+    ctx = UnifiedRunContext()
+    claims_a = [{"text": " ".join(sorted(t))} for t in terms_a]
+    claims_b = [{"text": " ".join(sorted(t))} for t in terms_b]
+    seq = asyncio.get_event_loop().run_until_complete(
+        CrossReferenceAgent().run(ctx, {"claims_a": claims_a, "claims_b": claims_b}))
+    par = asyncio.get_event_loop().run_until_complete(
+        CrossReferenceAgent().run(ctx, {"claims_a": claims_a, "claims_b": claims_b, "workers": 2}))
+    assert par.output == seq.output
+    assert ctx.audit_events[-1]["pairs_checked"] == ctx.audit_events[-2]["pairs_checked"]
+
+
+def test_agt03_pairs_checked_counts_scored_candidates():
+    claims_a = [{"text": "العمران البشري ضروري للاجتماع"}, {"text": "الملك غاية العصبية"}, {"text": "نص اخر تماما"}]
+    claims_b = [{"text": "العصبية غايتها الملك"}, {"text": "الاجتماع الانساني ضروري"}, {"text": "كلام لا علاقة له"}]
+    checked = {}
+    for method in ("inverted_index", "minhash_lsh", "tfidf", "embedding", "term_overlap"):
+        ctx = UnifiedRunContext()
+        asyncio.get_event_loop().run_until_complete(CrossReferenceAgent().run(
+            ctx, {"claims_a": claims_a, "claims_b": claims_b, "method": method, "threshold": 0.1}))
+        checked[method] = ctx.audit_events[-1]["pairs_checked"]
+    assert checked["term_overlap"] == 9
+    assert 0 < checked["inverted_index"] < 9 and checked["tfidf"] == checked["inverted_index"]
+    assert checked["minhash_lsh"] <= 9 and 0 < checked["embedding"] <= 9
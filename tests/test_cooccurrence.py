@@ -0,0 +1,83 @@
+"""IQRAA V2 — Cross-document co-occurrence index tests"""
+import asyncio
+from agents.agt02_entity_linking import EntityLinkingAgent
+from core.canonical_policy import canonicalize
+from core.run_context import UnifiedRunContext
+from entities.cooccurrence import CooccurrenceIndex
+
+
+def _e(eid, etype, start, end, text=""):
+    return {"suggested_id": eid, "entity_type": etype, "canonical_start": start, "canonical_end": end, "text": text or eid}
+
+
+def _index() -> CooccurrenceIndex:
+    idx = CooccurrenceIndex(window_chars=100)
+    idx.add_document("book1", [_e("C_asabiya", "concept", 5, 12), _e("P_khaldun", "person", 20, 29),
+                               _e("P_ghazali", "person", 150, 160)])
+    idx.add_document("book2", [_e("P_khaldun", "person", 0, 9), _e("C_asabiya", "concept", 30, 37),
+                               _e("C_mulk", "concept", 40, 45)])
+    return idx
+
+
+def test_top_k_counts_across_documents():
+    idx = _index()
+    assert idx.top_k("C_asabiya") == [("P_khaldun", 2), ("C_mulk", 1)]
+    assert idx.top_k("C_asabiya", entity_type="person") == [("P_khaldun", 2)]
+    assert idx.count("P_khaldun", "P_ghazali") == 0
+
+
+def test_postings_keep_source_and_offsets():
+    idx = _index()
+    assert idx.postings("P_khaldun") == [("book1", 20, 29), ("book2", 0, 9)]
+    assert idx.document_frequency("C_asabiya") == 2
+
+
+def test_source_indexed_once():
+    idx = _index()
+    assert idx.add_document("book1", [_e("C_asabiya", "concept", 0, 5), _e("P_khaldun", "person", 6, 9)]) is False
+    assert idx.count("C_asabiya", "P_khaldun") == 2
+
+
+def test_sentence_units_when_text_given():
+    text = "العصبية اساس. ابن خلدون قال."
+    idx = CooccurrenceIndex()
+    idx.add_document("s", [_e("C", "concept", 0, 7), _e("P", "person", 14, 23)], canonical_text=text)
+    assert idx.count("C", "P") == 0
+
+
+def test_incremental_persistence(tmp_path):
+    path = tmp_path / "cooc.sqlite"
+    idx = _index()
+    idx.save(path)
+    loaded = CooccurrenceIndex.load(path)
+    loaded.add_document("book3", [_e("C_asabiya", "concept", 0, 7), _e("P_ghazali", "person", 10, 19)])
+    loaded.save(path)
+    again = CooccurrenceIndex.load(path)
+    assert again.top_k("C_asabiya", entity_type="person") == [("P_khaldun", 2), ("P_ghazali", 1)]
+    assert again.sources == ["book1", "book2", "book3"]
+
+
+def test_save_to_another_path_writes_everything(tmp_path):
+    idx = _index()
+    idx.save(tmp_path / "a.sqlite")
+    idx.save(tmp_path / "b.sqlite")
+    loaded = CooccurrenceIndex.load(tmp_path / "a.sqlite")
+    loaded.add_document("book3", [_e("C_asabiya", "concept", 0, 7), _e("P_ghazali", "person", 10, 19)])
+    loaded.save(tmp_path / "c.sqlite")
+    for name, source in (("b", idx), ("c", loaded)):
+        copy = CooccurrenceIndex.load(tmp_path / f"{name}.sqlite")
+        assert copy.sources == source.sources
+        assert copy.top_k("C_asabiya") == source.top_k("C_asabiya")
+        assert copy.postings("P_khaldun") == [("book1", 20, 29), ("book2", 0, 9)]
+
+
+def test_built_from_agt02_output():
+    text = canonicalize("قال ابن خلدون ان العصبية اساس الملك")
+    ctx = UnifiedRunContext()
+    r = asyncio.get_event_loop().run_until_complete(
+        EntityLinkingAgent().run(ctx, {"text": text, "source_id": "muqaddima"}))
+    idx = CooccurrenceIndex()
+    assert idx.add_result(r.output, "muqaddima", canonical_text=text)
+    person = next(e["suggested_id"] for e in r.output["entities"] if e["entity_type"] == "person")
+    concept = next(e["suggested_id"] for e in r.output["entities"] if e["text"] == "العصبية")
+    assert idx.top_k(concept, entity_type="person") == [(person, 1)]
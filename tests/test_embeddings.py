@@ -0,0 +1,103 @@
+"""IQRAA V2 — Embedding backend + IVF ANN index tests"""
+import asyncio
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agents.agt03_cross_reference import CrossReferenceAgent
+from core.canonical_policy import canonicalize
+from core.run_context import UnifiedRunContext
+from crossref.ann import IVFIndex
+from crossref.embeddings import HashedNgramEmbedder
+
+
+def _clustered(n: int, dim: int = 64, centers: int = 40, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    c = rng.standard_normal((centers, dim))
+    x = c[rng.integers(0, centers, n)] + 0.3 * rng.standard_normal((n, dim))
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x.astype(np.float32)
+
+
+def test_hashed_ngram_embedder_deterministic_and_normalized():
+    e = HashedNgramEmbedder(dim=256)
+    texts = [canonicalize("قال ابن خلدون ان العصبية اساس الملك"),
+             canonicalize("العصبية عند ابن خلدون هي اساس الملك والدولة"),
+             canonicalize("الغزالي ينقد الفلاسفة في تهافت الفلاسفة"), ""]
+    v = e.embed(texts)
+    assert v.shape == (4, 256) and v.dtype == np.float32
+    assert np.allclose(np.linalg.norm(v[:3], axis=1), 1.0, atol=1e-5)
+    assert not v[3].any()
+    assert np.array_equal(v, HashedNgramEmbedder(dim=256).embed(texts))
+    assert v[0] @ v[1] > 0.6 > v[0] @ v[2]
+
+
+def test_ivf_recall_against_exact_search():
+    x = _clustered(3000)
+    idx = IVFIndex(64, n_probe=8)
+    idx.add("s", [str(i) for i in range(len(x))], x)
+    queries = x[:50]
+    hits = idx.search(queries, k=5)
+    exact = np.argsort(-(queries @ x.T), axis=1)[:, :5]
+    recall = np.mean([len({int(k) for k, _ in h} & set(e.tolist())) / 5 for h, e in zip(hits, exact)])
+    assert recall >= 0.9
+    assert all(h[0][0] == str(i) for i, h in enumerate(hits))
+
+
+def test_ivf_exact_when_probing_every_list():
+    x = _clustered(500, seed=1)
+    idx = IVFIndex(64, n_lists=10)
+    idx.add("s", [str(i) for i in range(len(x))], x)
+    hits = idx.search(x[:5], k=3, n_probe=10)
+    exact = np.argsort(-(x[:5] @ x.T), axis=1)[:, :3]
+    assert [[int(k) for k, _ in h] for h in hits] == exact.tolist()
+
+
+def test_ivf_exclude_source_and_min_score():
+    x = _clustered(400, seed=2)
+    idx = IVFIndex(64, n_lists=4, n_probe=4)
+    idx.add("a", [f"a#{i}" for i in range(200)], x[:200])
+    idx.add("b", [f"b#{i}" for i in range(200)], x[200:])
+    hits = idx.search(x[:1], k=10, exclude_source="a", min_score=0.5)[0]
+    assert hits and all(k.startswith("b#") and s >= 0.5 for k, s in hits)
+
+
+def test_ivf_incremental_persistence(tmp_path):
+    path = tmp_path / "ivf.sqlite"
+    x = _clustered(600, seed=3)
+    idx = IVFIndex(64, n_lists=8, fingerprint="test:64")
+    idx.add("a", [f"a#{i}" for i in range(400)], x[:400])
+    idx.train()
+    idx.save(path)
+    loaded = IVFIndex.load(path)
+    assert loaded.add("a", ["a#0"], x[:1]) == 0
+    loaded.add("b", [f"b#{i}" for i in range(200)], x[400:])
+    loaded.save(path)
+    again = IVFIndex.load(path)
+    assert len(again) == 600 and again.fingerprint == "test:64"
+    assert again.search(x[400:403], k=3) == loaded.search(x[400:403], k=3)
+
+
+
+def test_ivf_save_to_another_path_writes_everything(tmp_path):
+    x = _clustered(300, seed=4)
+    idx = IVFIndex(64, n_lists=4)
+    idx.add("a", [f"a#{i}" for i in range(300)], x)
+    idx.train()
+    idx.save(tmp_path / "a.sqlite")
+    idx.save(tmp_path / "b.sqlite")
+    IVFIndex.load(tmp_path / "a.sqlite").save(tmp_path / "c.sqlite")
+    for name in "bc":
+        copy = IVFIndex.load(tmp_path / f"{name}.sqlite")
+        assert len(copy) == 300 and copy.trained
+        assert copy.search(x[:3], k=3) == idx.search(x[:3], k=3)
+
+def test_agt03_embedding_method_finds_paraphrase():
+    claims_a = [{"text": "قال ابن خلدون ان العصبية اساس الملك"}, {"text": "الغزالي ينقد الفلاسفة"}]
+    claims_b = [{"text": "العصبية عند ابن خلدون هي اساس الملك والدولة"}, {"text": "ابن رشد يرد على تهافت الفلاسفة"}]
+    ctx = UnifiedRunContext()
+    r = asyncio.get_event_loop().run_until_complete(
+        CrossReferenceAgent().run(ctx, {"claims_a": claims_a, "claims_b": claims_b, "method": "embedding"}))
+    assert r.success
+    pairs = {(x["claim_a"], x["claim_b"]) for x in r.output["cross_refs"]}
+    assert (0, 0) in pairs and (1, 0) not in pairs
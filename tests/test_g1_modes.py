@@ -0,0 +1,104 @@
+"""IQRAA V2 — G1 gate modes and config tests"""
+import asyncio
+from pathlib import Path
+import pytest
+
+from core.models import Evidence, TextSpan
+from governance.g1_quality_gate import run_g1_gate, load_g1_config, g1_profile, wilson_lower_bound
+
+CONFIGS = Path(__file__).resolve().parents[1] / "configs"
+
+
+def _corpus(n: int, bad_every: int = 0):
+    evidences, claims = [], []
+    for k in range(n):
+        start = -1 if bad_every and k % bad_every == 0 else 0
+        ev = Evidence(evidence_id=f"e{k}", spans=[TextSpan(doc_id="d", char_start=start, char_end=4, text="نص")],
+                      confidence=0.8, source_ref="d")
+        evidences.append(ev)
+        claims.append({"text": f"ادعاء {k}", "evidence_ids": [ev.evidence_id]})
+    return claims, evidences
+
+
+def test_full_mode_caps_issues_but_counts_all():
+    claims, evidences = _corpus(500, bad_every=2)
+    r = run_g1_gate(claims, evidences, max_issues=10)
+    assert not r.passed and r.issue_count == 250 and len(r.issues) == 10 and r.truncated
+    uncapped = run_g1_gate(claims, evidences, max_issues=None)
+    assert uncapped.issues[:10] == r.issues and uncapped.score == r.score and not uncapped.truncated
+
+
+def test_fail_fast_stops_at_first_violation():
+    claims, evidences = _corpus(500, bad_every=100)
+    r = run_g1_gate(claims, evidences, mode="fail_fast")
+    assert not r.passed and r.issues == ["evidence_0_span_0: invalid offsets (-1,4)"]
+    assert r.checked == 501
+    clean = run_g1_gate(*_corpus(50), mode="fail_fast")
+    assert clean.passed and clean.checked is None
+
+
+def test_sampled_mode_bounds_pass_rate():
+    claims, evidences = _corpus(5000)
+    r = run_g1_gate(claims, evidences, mode="sampled", sample_size=300, seed=1)
+    assert r.passed and r.checked == 300 and r.score == 1.0
+    assert 0.98 < r.score_bound < 1.0
+    bad = run_g1_gate(*_corpus(5000, bad_every=10), mode="sampled", sample_size=300, seed=1)
+    assert not bad.passed and bad.issue_count > 0
+    assert all(i.startswith("evidence_") and int(i.split("_")[1]) % 10 == 0 for i in bad.issues)
+    small = run_g1_gate(*_corpus(10), mode="sampled", sample_size=300)
+    assert small.passed and small.checked is None and small.score_bound is None
+
+
+def test_sampled_bound_counts_items_not_checks():
+    claims, evidences = _corpus(5000)
+    wide = [ev.model_copy(update={"spans": ev.spans * 50}) for ev in evidences]
+    narrow = run_g1_gate(claims, evidences, mode="sampled", sample_size=300, seed=1)
+    assert run_g1_gate(claims, wide, mode="sampled", sample_size=300, seed=1).score_bound == narrow.score_bound
+    assert narrow.score_bound == wilson_lower_bound(300, 300)
+
+
+def test_wilson_lower_bound():
+    assert wilson_lower_bound(0, 0) == 0.0
+    assert wilson_lower_bound(95, 100) < 0.95 < wilson_lower_bound(950, 1000) + 0.02
+    assert wilson_lower_bound(100, 100, confidence=0.99) < wilson_lower_bound(100, 100, confidence=0.9)
+
+
+def test_configs_choose_mode():
+    pytest.importorskip("yaml")
+    assert load_g1_config(CONFIGS / "background-incubation.yaml")["mode"] == "sampled"
+    assert load_g1_config(CONFIGS / "creative-lite.yaml")["mode"] == "fail_fast"
+    settings = load_g1_config(CONFIGS / "background-incubation.yaml")
+    r = run_g1_gate(*_corpus(3000), **settings)
+    assert r.mode == "sampled" and r.checked == settings["sample_size"]
+
+
+def test_pipelines_apply_profile():
+    pytest.importorskip("yaml")
+    from pipelines.runner import compiled_pipeline
+    from pipelines.thin_slice import make_node_g1_gate, run_thin_slice
+    claims, evidences = _corpus(40, bad_every=2)
+    state = {"claims": claims, "evidences": [e.model_dump() for e in evidences], "canonical_text": "نص"}
+    capped = asyncio.get_event_loop().run_until_complete(make_node_g1_gate(g1_profile("creative-lite"))(state))
+    assert capped["g1_issues"] == ["evidence_0_span_0: invalid offsets (-1,4)"] and capped["verification_results"] is None
+    full = asyncio.get_event_loop().run_until_complete(make_node_g1_gate()(state))
+    assert len(full["g1_issues"]) == 20 and len(full["verification_results"]) == 40
+    assert compiled_pipeline("thin_slice", g1_profile("creative-lite")) is compiled_pipeline("thin_slice", g1_profile("creative-lite"))
+    r = asyncio.get_event_loop().run_until_complete(run_thin_slice("قال ابن خلدون. وقال العلماء.", "t", profile="creative-lite"))
+    assert r["g1_passed"] and r["pipeline_success"]
+
+
+def test_profile_is_read_only():
+    pytest.importorskip("yaml")
+    profile = g1_profile("creative-lite")
+    with pytest.raises(TypeError):
+        profile["mode"] = "full"
+    assert g1_profile("creative-lite") is profile
+
+def test_config_rejects_unknown_mode(tmp_path):
+    pytest.importorskip("yaml")
+    path = tmp_path / "bad.yaml"
+    path.write_text("name: bad\ng1:\n  mode: lenient\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_g1_config(path)
+    with pytest.raises(ValueError):
+        run_g1_gate([], [], mode="lenient")
@@ -0,0 +1,100 @@
+"""IQRAA V2 — Gazetteer (Aho-Corasick) tests"""
+import asyncio
+from agents.agt02_entity_linking import EntityLinkingAgent
+from core.run_context import UnifiedRunContext
+from entities.gazetteer import Gazetteer
+
+ENTRIES = [
+    ("ابن خلدون", "person", "P001"),
+    ("خلدون", "person", None),
+    ("القاهرة", "place", "L001"),
+    ("مقدمة ابن خلدون", "book", "B001"),
+    ("الإمام مالك", "person", "P002"),
+]
+
+
+def _hits(gz, text, **kw):
+    return [(h.name, h.start, h.end) for h in gz.finditer(text, **kw)]
+
+
+def test_gazetteer_finds_overlapping_names():
+    gz = Gazetteer.build(ENTRIES)
+    text = "قرأت مقدمة ابن خلدون في القاهرة"
+    hits = _hits(gz, text)
+    assert ("مقدمة ابن خلدون", 5, 20) in hits
+    assert ("ابن خلدون", 11, 20) in hits
+    assert ("خلدون", 15, 20) in hits
+    assert ("القاهرة", 24, 31) in hits
+    for name, s, e in hits:
+        assert text[s:e] == name
+
+
+def test_gazetteer_names_are_canonicalized():
+    gz = Gazetteer.build(ENTRIES)
+    hit = next(gz.finditer("قال الامام مالك"))
+    assert hit.name == "الامام مالك"
+    assert hit.entries == (("person", "P002"),)
+
+
+def test_gazetteer_whole_words_and_proclitics():
+    gz = Gazetteer.build(ENTRIES)
+    assert _hits(gz, "القاهرةالكبرى") == []
+    assert _hits(gz, "القاهرةالكبرى", whole_words=False) == [("القاهرة", 0, 7)]
+    assert [h[0] for h in _hits(gz, "وابن خلدون")] == ["ابن خلدون", "خلدون"]
+
+
+def test_gazetteer_save_load_roundtrip(tmp_path):
+    gz = Gazetteer.build(ENTRIES)
+    path = tmp_path / "gz.bin"
+    gz.save(path)
+    loaded = Gazetteer.load(path)
+    text = "مقدمة ابن خلدون في القاهرة"
+    assert list(loaded.finditer(text)) == list(gz.finditer(text))
+    assert loaded.state_count == gz.state_count
+
+
+def test_gazetteer_load_or_build_uses_prebuilt(tmp_path):
+    persons = tmp_path / "persons.txt"
+    persons.write_text("# authority list\nابن خلدون\tP001\nابن تيمية\tP003\n", encoding="utf-8")
+    cache = tmp_path / "gz.bin"
+    first = Gazetteer.load_or_build({"person": persons}, cache)
+    mtime = cache.stat().st_mtime_ns
+    second = Gazetteer.load_or_build({"person": persons}, cache)
+    assert cache.stat().st_mtime_ns == mtime
+    assert second.fingerprint == first.fingerprint and len(second) == 2
+    persons.write_text("ابن خلدون\tP001\n", encoding="utf-8")
+    assert len(Gazetteer.load_or_build({"person": persons}, cache)) == 1
+
+
+def test_gazetteer_load_or_build_rebuilds_stale_or_damaged_file(tmp_path, monkeypatch):
+    import entities.gazetteer as gazetteer
+    persons = tmp_path / "persons.txt"
+    persons.write_text("ابن خلدون\tP001\nابن تيمية\tP003\n", encoding="utf-8")
+    cache = tmp_path / "gz.bin"
+    Gazetteer.load_or_build({"person": persons}, cache)
+    data = cache.read_bytes()
+    for damaged in (data[:len(data) // 2], data[:10], b"junk"):
+        cache.write_bytes(damaged)
+        assert len(Gazetteer.load_or_build({"person": persons}, cache)) == 2
+    monkeypatch.setattr(gazetteer, "POLICY_VERSION", "9.9.9")
+    assert len(Gazetteer.load_or_build({"person": persons}, cache)) == 2
+    assert Gazetteer.load(cache).fingerprint
+
+
+def test_gazetteer_load_or_build_rebuilds_for_another_policy(tmp_path):
+    from core.canonical_policy import CanonicalPolicy
+    persons = tmp_path / "persons.txt"
+    persons.write_text("الإمام مالك\tP002\n", encoding="utf-8")
+    cache = tmp_path / "gz.bin"
+    assert Gazetteer.load_or_build({"person": persons}, cache).names == ["الامام مالك"]
+    keep_hamza = CanonicalPolicy(normalize_hamza=False)
+    assert Gazetteer.load_or_build({"person": persons}, cache, keep_hamza).names == ["الإمام مالك"]
+
+
+def test_agt02_uses_gazetteer():
+    agent = EntityLinkingAgent(gazetteer=Gazetteer.build(ENTRIES))
+    ctx = UnifiedRunContext()
+    r = asyncio.get_event_loop().run_until_complete(
+        agent.run(ctx, {"text": "زار ابن خلدون القاهرة", "source_id": "s1"}))
+    ids = {e["suggested_id"] for e in r.output["entities"]}
+    assert {"P001", "L001"} <= ids
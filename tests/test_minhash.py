@@ -0,0 +1,58 @@
+"""IQRAA V2 — MinHash / LSH index tests"""
+from crossref import minhash
+from crossref.minhash import MinHasher, LSHIndex, estimate_jaccard
+
+A = ["العمران", "البشري", "ضروري", "للاجتماع", "الانساني", "والتعاون"]
+B = ["العمران", "البشري", "ضروري", "للاجتماع", "الانساني"]
+C = ["الملك", "غاية", "العصبية"]
+
+
+def test_signature_deterministic_and_estimates_jaccard():
+    h = MinHasher(num_perm=256)
+    sa, sb, sc = h.signature(A), h.signature(B), h.signature(C)
+    assert sa == MinHasher(num_perm=256).signature(list(reversed(A)))
+    assert abs(estimate_jaccard(sa, sb) - 5 / 6) < 0.15
+    assert estimate_jaccard(sa, sc) < 0.2
+
+
+def test_batch_matches_single_and_pure_python(monkeypatch):
+    h = MinHasher()
+    batch = h.signatures([A, [], C])
+    assert batch[0] == h.signature(A) and batch[2] == h.signature(C)
+    monkeypatch.setattr(minhash, "np", None)
+    assert MinHasher().signatures([A, [], C]) == batch
+
+
+def test_lsh_candidates_and_exclusion():
+    idx = LSHIndex()
+    idx.add_many("book1", [("book1#0", B), ("book1#1", C)])
+    idx.add_many("book2", [("book2#0", A)])
+    keys = [k for k, _ in idx.query(A)]
+    assert keys[0] == "book2#0" and "book1#0" in keys and "book1#1" not in keys
+    assert [k for k, _ in idx.query(A, exclude_source="book2")] == ["book1#0"]
+    assert idx.query([]) == []
+
+
+def test_lsh_incremental_persistence(tmp_path):
+    path = tmp_path / "lsh.sqlite"
+    idx = LSHIndex()
+    idx.add_many("book1", [("book1#0", B)])
+    idx.save(path)
+    loaded = LSHIndex.load(path)
+    assert loaded.add_many("book1", [("book1#0", B)]) == 0
+    loaded.add_many("book2", [("book2#0", C)])
+    loaded.save(path)
+    again = LSHIndex.load(path)
+    assert len(again) == 2
+    assert again.query(A)[0][0] == "book1#0"
+
+
+def test_lsh_save_to_another_path_writes_everything(tmp_path):
+    idx = LSHIndex()
+    idx.add_many("book1", [("book1#0", B), ("book1#1", C)])
+    idx.save(tmp_path / "a.sqlite")
+    idx.save(tmp_path / "b.sqlite")
+    LSHIndex.load(tmp_path / "a.sqlite").save(tmp_path / "c.sqlite")
+    for name in "bc":
+        copy = LSHIndex.load(tmp_path / f"{name}.sqlite")
+        assert copy.keys == ["book1#0", "book1#1"] and copy.query(A)[0][0] == "book1#0"
@@ -0,0 +1,93 @@
+"""IQRAA V2 — Model cascade tests (AGT-01 LLM path)"""
+import asyncio
+import json
+from core.llm_client import LLMResponse
+from core.run_context import UnifiedRunContext, BudgetEnvelope
+from execution.model_router import ModelCascade, ModelRouter
+from agents.agt01_smart import SmartTextAnalysisAgent
+
+TEXT = "قال ابن خلدون ان العمران البشري ضروري."
+
+
+class FakeLLM:
+    """Returns a canned response per model and records the call order"""
+
+    def __init__(self, replies: dict):
+        self.replies = replies
+        self.calls = []
+
+    async def complete(self, prompt, system="", model="", budget=None, max_tokens=2000, temperature=0.2):
+        self.calls.append(model)
+        cost = 0.001 if "flash" in model else 0.01
+        if budget:
+            budget.record_cost(usd=cost, tokens=100, tool_calls=1)
+        return LLMResponse(text=self.replies[model], model=model, input_tokens=50, output_tokens=50,
+                           cost_usd=cost, latency_ms=1, success=True)
+
+
+def _reply(conf: float, n: int = 1) -> str:
+    return json.dumps({"claims": [{"text": "العمران البشري ضروري", "start": 0, "end": 10, "confidence": conf}] * n})
+
+
+def _run(agent, ctx):
+    return asyncio.get_event_loop().run_until_complete(agent.run(ctx, {"text": TEXT, "source_id": "s1"}))
+
+
+def test_cascade_escalation_reasons():
+    c = ModelCascade()
+    assert c.escalation_reason(None) == "malformed_json"
+    assert c.escalation_reason([]) == "too_few_claims"
+    assert c.escalation_reason([{"confidence": 0.2}]) == "low_confidence"
+    assert c.escalation_reason([{"confidence": 0.9}]) is None
+
+
+def test_missing_confidence_uses_agent_default():
+    c = ModelCascade()
+    assert c.escalation_reason([{"text": "x"}]) is None  # 0.7, as AGT-01 builds the claim
+    assert ModelCascade(min_confidence=0.8).escalation_reason([{"text": "x"}]) == "low_confidence"
+
+
+def test_unparseable_confidence_counts_as_low():
+    c = ModelCascade()
+    assert c.escalation_reason([{"confidence": "high"}]) == "low_confidence"
+    assert c.escalation_reason([{"confidence": None}, {"confidence": 0.9}]) == "low_confidence"
+    assert c.escalation_reason([{"confidence": "0.9"}]) is None
+
+
+def test_cascade_starting_at_only_escalates_upwards():
+    assert ModelCascade.starting_at("gemini-2.0-flash").tiers == ("gemini-2.0-flash", "gemini-2.5-pro")
+    assert ModelCascade.starting_at("gemini-2.5-pro").tiers == ("gemini-2.5-pro",)
+
+
+def test_router_exposes_cascade():
+    assert ModelRouter().route({"mode": "lean"})["cascade"] == ["gemini-2.0-flash"]
+
+
+def test_confident_cheap_answer_not_escalated():
+    agent = SmartTextAnalysisAgent()
+    agent.llm = FakeLLM({"gemini-2.0-flash": _reply(0.9), "gemini-2.5-pro": _reply(0.9)})
+    r = _run(agent, UnifiedRunContext())
+    assert r.success
+    assert agent.llm.calls == ["gemini-2.0-flash"]
+    assert r.output["model"] == "gemini-2.0-flash"
+    assert r.output["escalated"] is False
+
+
+def test_malformed_json_escalates():
+    agent = SmartTextAnalysisAgent()
+    agent.llm = FakeLLM({"gemini-2.0-flash": "not json", "gemini-2.5-pro": _reply(0.9, 2)})
+    ctx = UnifiedRunContext()
+    r = _run(agent, ctx)
+    assert agent.llm.calls == ["gemini-2.0-flash", "gemini-2.5-pro"]
+    assert r.output["model"] == "gemini-2.5-pro"
+    assert r.output["claims_count"] == 2
+    assert any(e["event"] == "model_cascade" and e["escalated"] for e in ctx.audit_events)
+
+
+def test_escalation_respects_budget():
+    agent = SmartTextAnalysisAgent()
+    agent.llm = FakeLLM({"gemini-2.0-flash": _reply(0.2), "gemini-2.5-pro": _reply(0.9)})
+    ctx = UnifiedRunContext(budget=BudgetEnvelope(max_usd=0.005))
+    r = _run(agent, ctx)
+    assert agent.llm.calls == ["gemini-2.0-flash"]
+    assert r.output["model"] == "gemini-2.0-flash"
@@ -0,0 +1,75 @@
+"""IQRAA V2 — Mention overlap resolution tests"""
+import asyncio
+import pytest
+from agents.agt02_entity_linking import EntityLinkingAgent, EntityMention
+from core.run_context import UnifiedRunContext
+from entities.gazetteer import Gazetteer
+from entities.overlap import IntervalIndex, resolve_overlaps, PREFER_CONFIDENCE
+
+
+def _m(s, e, conf=0.6, etype="person"):
+    return EntityMention(text="x" * (e - s), entity_type=etype, confidence=conf,
+                         canonical_start=s, canonical_end=e, source_id="s1")
+
+
+def _spans(ms):
+    return [(m.canonical_start, m.canonical_end) for m in ms]
+
+
+def test_interval_index_overlap():
+    idx = IntervalIndex([0, 5, 10, 15, 20])
+    idx.insert(5, 10)
+    assert idx.overlaps(0, 10)
+    assert idx.overlaps(5, 15)
+    assert not idx.overlaps(0, 5)
+    assert not idx.overlaps(10, 20)
+
+
+def test_longest_mention_wins():
+    kept = resolve_overlaps([_m(4, 13), _m(0, 13), _m(8, 13), _m(20, 25)])
+    assert _spans(kept) == [(0, 13), (20, 25)]
+
+
+def test_duplicates_collapse_to_highest_confidence():
+    kept = resolve_overlaps([_m(0, 9, 0.6), _m(0, 9, 0.85), _m(0, 9, 0.6)])
+    assert len(kept) == 1 and kept[0].confidence == 0.85
+
+
+def test_prefer_confidence_and_per_type():
+    ms = [_m(0, 13, 0.5), _m(4, 9, 0.9), _m(4, 9, 0.7, etype="book")]
+    assert _spans(resolve_overlaps(ms, prefer=PREFER_CONFIDENCE)) == [(4, 9)]
+    assert len(resolve_overlaps(ms, per_type=True)) == 2
+
+
+def test_entity_mention_has_no_dict():
+    m = _m(0, 3)
+    assert not hasattr(m, "__dict__")
+    with pytest.raises(AttributeError):
+        m.extra = 1
+
+
+def test_agt02_drops_overlapping_mentions():
+    gz = Gazetteer.build([("ابن خلدون", "person", "P001"), ("خلدون", "person", None)])
+    ctx = UnifiedRunContext()
+    r = asyncio.get_event_loop().run_until_complete(
+        EntityLinkingAgent(gazetteer=gz).run(ctx, {"text": "قال ابن خلدون", "source_id": "s1"}))
+    assert r.output["entity_count"] == 1
+    assert r.output["entities"][0]["suggested_id"] == "P001"
+    assert ctx.audit_events[-1]["overlaps_dropped"] == 2
+
+
+def test_agt02_keeps_cross_type_overlaps_by_default():
+    gz = Gazetteer.build([("ابن خلدون", "person", "P001"), ("ابن خلدون", "book", "B001")])
+    text = "قال الشيخ العصبية و ابن خلدون"
+    r = asyncio.get_event_loop().run_until_complete(
+        EntityLinkingAgent(gazetteer=gz).run(UnifiedRunContext(), {"text": text, "source_id": "s1"}))
+    found = {(e["entity_type"], e["text"]) for e in r.output["entities"]}
+    assert {("person", "الشيخ العصبية"), ("concept", "العصبية"),
+            ("person", "ابن خلدون"), ("book", "ابن خلدون")} <= found
+
+
+def test_agt02_cross_type_suppression_is_opt_in():
+    agent = EntityLinkingAgent(overlap_per_type=False)
+    r = asyncio.get_event_loop().run_until_complete(
+        agent.run(UnifiedRunContext(), {"text": "قال الشيخ العصبية", "source_id": "s1"}))
+    assert [(e["entity_type"], e["text"]) for e in r.output["entities"]] == [("person", "الشيخ العصبية")]
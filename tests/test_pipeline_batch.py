@@ -0,0 +1,83 @@
+"""IQRAA V2 — Corpus batch runner tests"""
+import asyncio
+import pytest
+
+from pipelines.batch import CorpusSummary, run_many, stream_many
+from pipelines.runner import PipelineRunner
+
+TEXTS = [f"قال ابن خلدون إن العصبية أساس الملك {k}. وقال العلماء إن الدولة تمر بأطوار." for k in range(12)]
+
+
+class FlakyRunner(PipelineRunner):
+    async def run(self, text, source_id="source", run_ctx=None):
+        if source_id == "bad":
+            raise RuntimeError("boom")
+        return await super().run(text, source_id, run_ctx)
+
+
+def _loop():
+    return asyncio.get_event_loop()
+
+
+def test_run_many_keeps_input_order_and_summarizes():
+    docs = TEXTS[:5] + ["   ", ("bad", TEXTS[0])]
+    results, summary = _loop().run_until_complete(run_many(docs, concurrency=3, runner=FlakyRunner("thin_slice")))
+    assert [r.index for r in results] == list(range(7))
+    assert [r.source_id for r in results][-2:] == ["doc5", "bad"]
+    assert all(r.ok for r in results[:5]) and not results[5].ok and results[6].error == "RuntimeError: boom"
+    s = summary.as_dict()
+    assert (s["documents"], s["succeeded"], s["failed"], s["errors"]) == (7, 5, 1, {"RuntimeError": 1})
+    assert s["cost_usd"] == 0.0 and summary.docs_per_sec > 0
+
+
+def test_stream_applies_backpressure_to_async_input():
+    pulled = 0
+
+    async def source():
+        nonlocal pulled
+        for k, text in enumerate(TEXTS):
+            pulled += 1
+            yield (f"s{k}", text)
+
+    async def consume():
+        seen, summary = [], CorpusSummary()
+        async for r in stream_many(source(), concurrency=2, runner=PipelineRunner("thin_slice"), summary=summary):
+            assert pulled - len(seen) <= 2 + 1  # in flight + the one just yielded
+            seen.append(r.source_id)
+        return seen, summary
+
+    seen, summary = _loop().run_until_complete(consume())
+    assert sorted(seen) == sorted(f"s{k}" for k in range(12)) and summary.succeeded == 12
+
+
+def test_concurrency_must_be_positive():
+    async def consume():
+        return [r async for r in stream_many(TEXTS, concurrency=0)]
+    with pytest.raises(ValueError):
+        _loop().run_until_complete(consume())
+
+
+def test_early_stop_cancels_documents_in_flight():
+    started, finished, cancelled = [], [], []
+
+    class SlowRunner(PipelineRunner):
+        async def run(self, text, source_id="source", run_ctx=None):
+            started.append(source_id)
+            try:
+                await asyncio.sleep(0.05 if source_id == "doc0" else 10)
+            except asyncio.CancelledError:
+                cancelled.append(source_id)
+                raise
+            finished.append(source_id)
+            return {"pipeline_success": True}
+
+    async def consume():
+        stream = stream_many(TEXTS, concurrency=4, runner=SlowRunner("thin_slice"))
+        async for r in stream:
+            break
+        await stream.aclose()
+        return r, [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    first, leftover = _loop().run_until_complete(consume())
+    assert first.source_id == "doc0" and finished == ["doc0"]
+    assert sorted(cancelled) == sorted(started[1:]) and len(started) == 4 and not leftover
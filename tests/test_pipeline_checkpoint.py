@@ -0,0 +1,142 @@
+"""IQRAA V2 — Checkpointed corpus run tests"""
+import asyncio
+import pytest
+
+from core.canonical_policy import canonicalize, text_hash
+from pipelines.batch import run_many
+from pipelines.checkpoint import CheckpointedRunner, RunLedger
+from pipelines.runner import PipelineRunner
+
+TEXTS = [f"قال ابن خلدون إن العصبية أساس الملك {k}. وقال العلماء إن الدولة تمر بأطوار." for k in range(6)]
+
+
+class Crash(Exception):
+    pass
+
+
+class CrashingRunner(CheckpointedRunner):
+    """Dies right after checkpointing `after` for one document, as a killed process would mid-run."""
+
+    def __init__(self, ledger, victim, after, **kw):
+        super().__init__(ledger, "extended", **kw)
+        real = ledger.record_step
+
+        def record_step(key, step, updates, run_ctx):
+            real(key, step, updates, run_ctx)
+            if key == victim and [n for n, _ in updates] == [after]:
+                raise Crash()
+        ledger.record_step = record_step
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+def _key(runner, k):
+    return runner.run_key(text_hash(canonicalize(TEXTS[k])), f"doc{k}")
+
+
+def _essentials(result):
+    return (result["pipeline_success"], [c["text"] for c in result["claims"]], result["verified_count"],
+            result["synthesis"]["total_claims"], sorted(e["text"] for e in result["entities"]))
+
+
+def test_completed_documents_are_skipped(tmp_path):
+    path = tmp_path / "ledger.sqlite"
+    with RunLedger(path, flush_every=4) as ledger:
+        runner = CheckpointedRunner(ledger)
+        first, summary = _run(run_many(TEXTS, concurrency=2, runner=runner))
+        assert summary.succeeded == 6 and runner.skipped == 0
+    with RunLedger(path) as ledger:
+        assert len(ledger) == 6
+        runner = CheckpointedRunner(ledger)
+        again, _ = _run(run_many(TEXTS, runner=runner))
+        assert runner.skipped == 6
+        assert [_essentials(r.result) for r in again] == [_essentials(r.result) for r in first]
+        rerun = CheckpointedRunner(ledger, resume=False)
+        _run(run_many(TEXTS[:1], runner=rerun))
+        assert rerun.skipped == 0
+
+
+@pytest.mark.parametrize("after", ["agt01_analyze", "g1_quality"])
+def test_interrupted_document_resumes_from_last_step(tmp_path, after):
+    path = tmp_path / "ledger.sqlite"
+    with RunLedger(path) as ledger:
+        victim = _key(CheckpointedRunner(ledger), 2)
+        runner = CrashingRunner(ledger, victim, after)
+        results, summary = _run(run_many(TEXTS, runner=runner))
+        assert summary.errors == {"Crash": 1} and summary.succeeded == 5
+    with RunLedger(path) as ledger:
+        assert not ledger.is_done(victim) and [n for n, _ in ledger.steps(victim)[-1][0]] == [after]
+        runner = CheckpointedRunner(ledger)
+        resumed, summary = _run(run_many(TEXTS, runner=runner))
+        assert runner.skipped == 5 and runner.resumed == 1 and summary.succeeded == 6
+        expected = _run(PipelineRunner("extended").run(TEXTS[2], "doc2"))
+        assert _essentials(resumed[2].result) == _essentials(expected)
+        agents = {e["agent"] for e in resumed[2].result["run_ctx_dict"]["audit_events"]}
+        assert {"AGT-02", "AGT-05", "AGT-04"} <= agents
+        assert ledger.steps(victim) == [] and ledger.is_done(victim)
+
+
+def _events(result):
+    return [(e["event"], e["agent"]) for e in result["run_ctx_dict"]["audit_events"]]
+
+
+def test_resume_after_crash_in_last_node_replays_nothing_twice(tmp_path, monkeypatch):
+    from agents.agt04_synthesis import SynthesisAgent
+    real = SynthesisAgent.run
+
+    async def crash_once(self, run_ctx, params={}):
+        if params.get("source_id") == "doc2":
+            monkeypatch.setattr(SynthesisAgent, "run", real)
+            raise Crash()
+        return await real(self, run_ctx, params)
+
+    expected = _run(PipelineRunner("extended").run(TEXTS[2], "doc2"))
+    monkeypatch.setattr(SynthesisAgent, "run", crash_once)
+    with RunLedger(tmp_path / "ledger.sqlite") as ledger:
+        runner = CheckpointedRunner(ledger)
+        _, summary = _run(run_many([("doc2", TEXTS[2])], runner=runner))
+        assert summary.errors == {"Crash": 1}
+        steps = ledger.steps(_key(runner, 2))
+        assert [sorted(n for n, _ in updates) for updates, _ in steps] == [
+            ["agt01_analyze"], ["g1_quality"], ["agt02_entities", "agt03_crossref", "agt05_verify"]]
+        assert [e["agent"] for e in steps[-1][1]["audit_events"]] == ["AGT-02", "AGT-05"]
+        resumed = _run(runner.run(TEXTS[2], "doc2"))
+    assert runner.resumed == 1 and _essentials(resumed) == _essentials(expected)
+    assert _events(resumed) == _events(expected) == [
+        ("entities_extracted", "AGT-02"), ("verification_complete", "AGT-05"), ("synthesis_complete", "AGT-04")]
+    assert resumed["run_ctx_dict"]["budget"] == expected["run_ctx_dict"]["budget"]
+
+def test_writes_are_batched(tmp_path):
+    with RunLedger(tmp_path / "ledger.sqlite", flush_every=1000) as ledger:
+        _run(run_many(TEXTS, runner=CheckpointedRunner(ledger, fields=("pipeline_success",))))
+        runner = CheckpointedRunner(ledger, fields=("pipeline_success",))
+        _run(run_many(TEXTS, runner=runner))
+        assert runner.skipped == 6 and ledger.flushes == 0
+        assert ledger.result(_key(runner, 0)) == {"pipeline_success": True}
+        assert ledger.flush() == 6  # steps of documents finished in the same batch are dropped
+
+
+def test_duplicate_texts_keep_their_source_ids(tmp_path):
+    with RunLedger(tmp_path / "ledger.sqlite") as ledger:
+        runner = CheckpointedRunner(ledger, fields=("source_id", "pipeline_success"))
+        docs = [("A", TEXTS[0]), ("B", TEXTS[0]), ("A", TEXTS[0])]
+        results, summary = _run(run_many(docs, concurrency=3, runner=runner))
+        assert [r.result["source_id"] for r in results] == ["A", "B", "A"]
+        assert summary.succeeded == 3 and runner.skipped == 1 and len(ledger) == 2
+
+
+def test_ledger_is_per_variant_and_config(tmp_path):
+    with RunLedger(tmp_path / "ledger.sqlite") as ledger:
+        extended = CheckpointedRunner(ledger, "extended")
+        _run(run_many(TEXTS[:1], runner=extended))
+        thin = CheckpointedRunner(ledger, "thin_slice")
+        results, _ = _run(run_many(TEXTS[:1], runner=thin))
+        assert thin.skipped == 0 and "synthesis" not in results[0].result
+        narrow = CheckpointedRunner(ledger, "extended", fields=("pipeline_success",))
+        _run(run_many(TEXTS[:1], runner=narrow))
+        assert narrow.skipped == 0 and len(ledger) == 3
+        again = CheckpointedRunner(ledger, "extended")
+        _run(run_many(TEXTS[:1], runner=again))
+        assert again.skipped == 1
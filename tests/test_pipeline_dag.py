@@ -0,0 +1,111 @@
+"""IQRAA V2 — Declarative pipeline DAG tests"""
+import asyncio
+import time
+from typing import Annotated, TypedDict
+import pytest
+from langchain_core.runnables import RunnableConfig
+
+from core.run_context import UnifiedRunContext
+from pipelines.context import ctx_update, merge_run_ctx, node_context
+from pipelines.dag import Stage, build_dag, stage_levels
+from pipelines.extended_pipeline import extended_stages, run_extended
+
+
+class S(TypedDict, total=False):
+    ok: bool
+    a: int
+    b: int
+    c: int
+    d: int
+    failed: bool
+
+
+def _sleeper(key: str, delay: float = 0.1):
+    async def node(state: S) -> dict:
+        await asyncio.sleep(delay)
+        return {key: 1}
+    return node
+
+
+async def _start(state: S) -> dict:
+    return {"a": 1}
+
+
+async def _join(state: S) -> dict:
+    return {"d": state["b"] + state["c"]}
+
+
+async def _fail(state: S) -> dict:
+    return {"failed": True}
+
+
+STAGES = [
+    Stage("a", _start, gate=lambda s: s.get("ok", False)),
+    Stage("b", _sleeper("b"), after=("a",)),
+    Stage("c", _sleeper("c"), after=("a",)),
+    Stage("d", _join, after=("b", "c")),
+]
+
+
+def test_extended_stages_fan_out_after_g1():
+    assert stage_levels(extended_stages()) == [
+        ["agt01_analyze"], ["g1_quality"], ["agt02_entities", "agt05_verify", "agt03_crossref"], ["agt04_synthesize"]]
+
+
+def test_independent_stages_run_concurrently():
+    app = build_dag(S, STAGES, fail=("fail", _fail)).compile()
+    t = time.perf_counter()
+    out = asyncio.get_event_loop().run_until_complete(app.ainvoke({"ok": True}))
+    assert out["d"] == 2 and not out.get("failed")
+    assert time.perf_counter() - t < 0.18  # b and c sleep 0.1s each
+
+
+def test_gate_routes_to_fail_stage():
+    app = build_dag(S, STAGES, fail=("fail", _fail)).compile()
+    out = asyncio.get_event_loop().run_until_complete(app.ainvoke({"ok": False}))
+    assert out["failed"] and "b" not in out and "d" not in out
+
+
+def test_invalid_declarations():
+    with pytest.raises(ValueError):
+        stage_levels([Stage("x", _start, after=("missing",))])
+    with pytest.raises(ValueError):
+        stage_levels([Stage("x", _start, after=("y",)), Stage("y", _start, after=("x",))])
+    with pytest.raises(ValueError):
+        build_dag(S, STAGES)  # gate without a fail stage
+    with pytest.raises(ValueError):
+        build_dag(S, [*STAGES, Stage("e", _join, after=("a", "b"))], fail=("fail", _fail))
+
+
+def test_extended_pipeline_joins_branches():
+    r = asyncio.get_event_loop().run_until_complete(
+        run_extended("قال ابن خلدون إن العصبية أساس الملك. وقال العلماء إن الدولة تمر بأطوار.", "s"))
+    assert r["pipeline_success"] and r["verification_passed"] and r["synthesis"]["total_claims"] == len(r["claims"])
+    failed = asyncio.get_event_loop().run_until_complete(run_extended("   ", "empty"))
+    assert failed["pipeline_success"] is False and "synthesis" not in failed
+
+
+class C(TypedDict, total=False):
+    run_ctx_dict: Annotated[dict, merge_run_ctx]
+
+
+def _spender(usd: float, tokens: int, stop: bool = False):
+    async def node(state: C, config: RunnableConfig) -> dict:
+        ctx, live = node_context(state, config)
+        ctx.budget.record_cost(tokens=tokens, usd=usd)
+        ctx.record_audit("spent", f"spender_{tokens}")
+        if stop:
+            ctx.request_stop("budget")
+        return ctx_update(ctx, live, state)
+    return node
+
+
+def test_parallel_branches_merge_spending_and_stops():
+    stages = [Stage("a", _spender(0.1, 10)), Stage("b", _spender(0.3, 30), after=("a",)),
+              Stage("c", _spender(0.2, 20, stop=True), after=("a",)), Stage("d", _spender(0.0, 0), after=("a",))]
+    out = asyncio.get_event_loop().run_until_complete(build_dag(C, stages).compile().ainvoke({}))
+    ctx = UnifiedRunContext(**out["run_ctx_dict"])
+    assert ctx.budget.used_usd == pytest.approx(0.6) and ctx.budget.used_tokens == 60
+    assert ctx.stop_now and ctx.stop_reason == "budget"
+    assert sorted(e["agent"] for e in ctx.audit_events) == ["spender_0", "spender_10", "spender_20", "spender_30"]
+    assert "_base_budget" not in out["run_ctx_dict"]
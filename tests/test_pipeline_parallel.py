@@ -0,0 +1,60 @@
+"""IQRAA V2 — Process-pool corpus executor tests"""
+from pipelines.parallel import balanced_chunks, run_corpus_processes
+
+TEXTS = [f"قال ابن خلدون إن العصبية أساس الملك {k}. " * (1 + k % 4) + "وقال العلماء إن الدولة تمر بأطوار."
+         for k in range(16)]
+
+
+def _view(doc):
+    return doc.ok, doc.result.get("verified_count"), [c["text"] for c in doc.result.get("claims", [])]
+
+
+def test_balanced_chunks_cover_all_and_even_out_size():
+    sizes = [100, 1, 1, 1, 50, 50, 30, 20, 10, 5]
+    chunks = balanced_chunks(sizes, 3)
+    assert sorted(i for c in chunks for i in c) == list(range(len(sizes)))
+    totals = sorted(sum(sizes[i] for i in c) for c in chunks)
+    assert totals[-1] == 100 and totals[0] >= 60
+    assert balanced_chunks([5, 5], 8) == [[0], [1]] and balanced_chunks([], 4) == []
+
+
+def test_process_pool_matches_in_process():
+    fields = ("pipeline_success", "verified_count", "claims")
+    docs = TEXTS + ["   "]
+    pooled, summary = run_corpus_processes(docs, workers=2, variant="thin_slice", fields=fields)
+    local, _ = run_corpus_processes(docs, workers=1, variant="thin_slice", fields=fields)
+    assert [d.index for d in pooled] == list(range(17))
+    assert set(pooled[0].result) == set(fields)
+    assert [_view(d) for d in pooled] == [_view(d) for d in local]
+    assert summary.documents == 17 and summary.succeeded == 16 and summary.failed == 1
+
+
+def test_summary_reads_success_and_cost_before_projecting(monkeypatch):
+    from pipelines import parallel
+    from pipelines.batch import DocResult
+    full = {"pipeline_success": True, "synthesis": "s", "run_ctx_dict": {"budget": {"used_usd": 0.25}}}
+    monkeypatch.setattr(parallel, "_fields", ("synthesis",))
+    doc, cost = parallel._project(DocResult(0, "s", full, None, 0.0))
+    assert doc.result == {"pipeline_success": True, "synthesis": "s"} and doc.ok and cost == 0.25
+    docs = TEXTS[:4] + ["   "]
+    for workers in (1, 2):
+        _, summary = run_corpus_processes(docs, workers=workers, variant="thin_slice", fields=("synthesis",))
+        assert (summary.succeeded, summary.failed) == (4, 1)
+
+
+def test_unpicklable_result_is_reported_not_awaited_forever(monkeypatch):
+    from pipelines import parallel
+    project = parallel._project
+
+    def unpicklable(doc):
+        doc, cost = project(doc)
+        if doc.index == 2:
+            doc = doc._replace(result={**doc.result, "bad": lambda: None})
+        return doc, cost
+
+    monkeypatch.setattr(parallel, "_project", unpicklable)  # inherited by the forked workers
+    pooled, summary = run_corpus_processes(TEXTS[:5], workers=2, variant="thin_slice",
+                                           fields=("verified_count",), poll_sec=0.1)
+    assert [d.index for d in pooled] == list(range(5))
+    assert pooled[2].error.startswith("ResultLost") and all(d.ok for i, d in enumerate(pooled) if i != 2)
+    assert summary.errors == {"ResultLost": 1} and summary.succeeded == 4
@@ -0,0 +1,75 @@
+"""IQRAA V2 — Compiled pipeline cache & runner tests"""
+import asyncio
+import pytest
+
+from crossref.registry import CrossRefRegistry
+from pipelines import runner
+from pipelines.runner import PipelineRunner, compiled_pipeline, invalidate
+from pipelines.thin_slice import run_thin_slice
+
+TEXT = "قال ابن خلدون إن العصبية أساس الملك. وقال العلماء إن الدولة تمر بأطوار."
+
+
+def test_compiled_once_per_variant_and_config():
+    invalidate()
+    thin = compiled_pipeline("thin_slice")
+    assert compiled_pipeline("thin_slice") is thin
+    reg_a, reg_b = CrossRefRegistry(), CrossRefRegistry()
+    ext_a = compiled_pipeline("extended", reg_a)
+    assert compiled_pipeline("extended", reg_a) is ext_a
+    assert compiled_pipeline("extended", reg_b) is not ext_a
+    assert compiled_pipeline("extended", None) is not ext_a
+    with pytest.raises(ValueError):
+        compiled_pipeline("nope")
+
+
+def test_invalidate_rebuilds():
+    invalidate()
+    thin = compiled_pipeline("thin_slice")
+    compiled_pipeline("extended")
+    assert invalidate("thin_slice") == 1
+    assert compiled_pipeline("thin_slice") is not thin
+    assert invalidate() == 2 and not runner._COMPILED
+
+
+def test_cache_is_bounded_and_releases_configs():
+    import gc, weakref
+    invalidate()
+    thin = compiled_pipeline("thin_slice")
+    refs = []
+    for _ in range(20):
+        reg = CrossRefRegistry()
+        refs.append(weakref.ref(reg))
+        compiled_pipeline("extended", reg)
+        assert compiled_pipeline("thin_slice") is thin  # recently used, so never evicted
+    del reg
+    gc.collect()
+    assert len(runner._COMPILED) == runner.MAX_COMPILED
+    assert sum(r() is not None for r in refs) == runner.MAX_COMPILED - 1
+
+def test_runner_matches_run_thin_slice():
+    r = PipelineRunner("thin_slice")
+    loop = asyncio.get_event_loop()
+    first, second = (loop.run_until_complete(r.run(TEXT, "s")) for _ in range(2))
+    direct = loop.run_until_complete(run_thin_slice(TEXT, "s"))
+    assert r.runs == 2 and first["verified_count"] == second["verified_count"] == direct["verified_count"]
+    assert first["pipeline_success"] and [c["text"] for c in first["claims"]] == [c["text"] for c in direct["claims"]]
+    invalidate()
+    r.reload()
+    assert r.app is compiled_pipeline("thin_slice")
+
+
+def test_live_context_collects_every_node_event():
+    from core.run_context import UnifiedRunContext
+    from pipelines.runner import initial_state
+    ctx = UnifiedRunContext()
+    loop = asyncio.get_event_loop()
+    live = loop.run_until_complete(PipelineRunner("extended").run(TEXT, "s", run_ctx=ctx))
+    assert live["run_ctx_dict"] == ctx.model_dump(mode="json")
+    agents = [e["agent"] for e in ctx.audit_events]
+    # without a live context the nodes fall back to round-tripping run_ctx_dict through the state
+    copied = loop.run_until_complete(compiled_pipeline("extended").ainvoke(initial_state(TEXT, "s")))
+    assert [e["agent"] for e in copied["run_ctx_dict"]["audit_events"]] == agents
+    assert {"AGT-02", "AGT-05", "AGT-04"} <= set(agents) and "s" in ctx.source_hashes
+    loop.run_until_complete(run_thin_slice(TEXT, "t", run_ctx=ctx))
+    assert set(ctx.source_hashes) == {"s", "t"}
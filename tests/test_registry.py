@@ -0,0 +1,90 @@
+"""IQRAA V2 — Incremental cross-reference registry tests"""
+import asyncio
+from agents.agt03_cross_reference import CrossReferenceAgent
+from core.run_context import UnifiedRunContext
+from crossref.inverted_index import TermIndex, overlap_pairs
+from crossref.registry import CrossRefRegistry
+from pipelines.extended_pipeline import run_extended
+
+BOOK1 = [["عصبية", "ملك", "دولة"], ["غزالي", "فلاسفة", "تهافت"]]
+BOOK2 = [["ملك", "دولة", "عصبية", "بداوة"], ["حديث", "سند"]]
+BOOK3 = [["غزالي", "تهافت", "فلاسفة"], ["سند", "حديث", "رواية"]]
+
+
+def _registry() -> CrossRefRegistry:
+    reg = CrossRefRegistry(threshold=0.5)
+    for sid, claims in (("b1", BOOK1), ("b2", BOOK2), ("b3", BOOK3)):
+        reg.add_source(sid, claims)
+    return reg
+
+
+def test_pairs_match_two_source_comparison():
+    reg = _registry()
+    for a, b, ca, cb in (("b2", "b1", BOOK2, BOOK1), ("b3", "b1", BOOK3, BOOK1), ("b3", "b2", BOOK3, BOOK2)):
+        index = TermIndex()
+        index.extend(cb)
+        expected = [(i, j, s) for i, j, s, _ in overlap_pairs([frozenset(t) for t in ca], index, 0.5)]
+        assert [(m.claim_a, m.claim_b, m.score) for m in reg.pair(a, b)] == expected
+
+
+def test_pair_orientation_and_partners():
+    reg = _registry()
+    assert [(m.claim_a, m.claim_b) for m in reg.pair("b1", "b3")] == [(1, 0)]
+    assert reg.partners("b1") == ["b2", "b3"]
+    assert [(other, m.claim_a) for other, m in reg.refs_for("b2")] == [("b1", 0), ("b3", 1)]
+
+
+def test_new_source_only_compared_once():
+    reg = _registry()
+    assert reg.add_source("b1", BOOK1) is None
+    new = reg.add_source("b4", [["عصبية", "ملك", "دولة"]])
+    assert sorted(new) == ["b1", "b2"]
+
+
+def test_incremental_persistence(tmp_path):
+    path = tmp_path / "xref.sqlite"
+    reg = CrossRefRegistry(threshold=0.5)
+    reg.add_source("b1", BOOK1)
+    reg.add_source("b2", BOOK2)
+    reg.save(path)
+    loaded = CrossRefRegistry.load(path)
+    loaded.add_source("b3", BOOK3)
+    loaded.save(path)
+    again = CrossRefRegistry.load(path)
+    ref = _registry()
+    assert again.sources == ref.sources
+    for a, b in (("b2", "b1"), ("b3", "b1"), ("b3", "b2")):
+        assert again.pair(a, b) == ref.pair(a, b)
+
+
+
+def test_save_to_another_path_writes_everything(tmp_path):
+    reg = _registry()
+    reg.save(tmp_path / "a.sqlite")
+    reg.save(tmp_path / "b.sqlite")
+    loaded = CrossRefRegistry.load(tmp_path / "a.sqlite")
+    loaded.save(tmp_path / "c.sqlite")
+    loaded.save(tmp_path / "b.sqlite")  # an existing file is rewritten, not appended to
+    for name in "bc":
+        copy = CrossRefRegistry.load(tmp_path / f"{name}.sqlite")
+        assert copy.sources == reg.sources and len(copy.index) == len(reg.index)
+        for a, b in (("b2", "b1"), ("b3", "b1"), ("b3", "b2")):
+            assert copy.pair(a, b) == reg.pair(a, b)
+
+def test_agt03_registry_mode():
+    reg = CrossRefRegistry()
+    agent = CrossReferenceAgent()
+    run = lambda sid, texts: asyncio.get_event_loop().run_until_complete(
+        agent.run(UnifiedRunContext(), {"registry": reg, "source_id": sid, "claims": [{"text": t} for t in texts]}))
+    assert run("b1", ["العصبية اساس الملك والدولة"]).output["cross_ref_count"] == 0
+    r = run("b2", ["الملك والدولة تقوم على العصبية"])
+    assert r.success and r.output["cross_refs"][0]["source_b"] == "b1"
+
+
+def test_extended_pipeline_feeds_cross_refs_to_synthesis():
+    text = "قال ابن خلدون إن العصبية أساس الملك والدولة في كتاب المقدمة"
+    reg = CrossRefRegistry()
+    first = asyncio.get_event_loop().run_until_complete(run_extended(text, "muqaddima", registry=reg))
+    second = asyncio.get_event_loop().run_until_complete(run_extended(text, "copy", registry=reg))
+    assert first["claims"] and first["cross_refs"] == []
+    assert second["cross_refs"] and second["synthesis"]["cross_ref_count"] == len(second["cross_refs"])
@@ -0,0 +1,74 @@
+"""IQRAA V2 — Entity resolution index tests"""
+import asyncio
+from agents.agt02_entity_linking import EntityLinkingAgent
+from core.run_context import UnifiedRunContext
+from entities.resolution import ResolutionIndex, parse_name, name_variants, stable_entity_id
+
+
+def _index() -> ResolutionIndex:
+    idx = ResolutionIndex()
+    idx.add("P001", "person", ["عبد الرحمن بن محمد بن خلدون", "ولي الدين ابن خلدون"], label="ابن خلدون")
+    idx.add("P002", "person", ["أبو حامد محمد الغزالي"], label="الغزالي")
+    idx.add("P003", "person", ["تقي الدين أحمد بن تيمية"], label="ابن تيمية")
+    return idx
+
+
+def test_parse_name_parts():
+    p = parse_name("الإمام أبو حامد محمد بن محمد الغزالي")
+    assert p.primary == "ابو حامد محمد بن محمد الغزالي"
+    assert p.kunya == "ابو حامد"
+    assert p.nasab == ["محمد"]
+    assert p.nisba == "الغزالي"
+
+
+def test_name_variants_include_nasab_and_laqab():
+    forms = name_variants("تقي الدين أحمد بن تيمية")
+    assert forms[0] == "تقي الدين احمد بن تيمية"
+    assert "ابن تيمية" in forms and "تقي الدين" in forms
+
+
+def test_stable_id_no_prefix_collision():
+    a = stable_entity_id("person", "عبد الرحمن بن خلدون")
+    b = stable_entity_id("person", "عبد الرحمن بن عوف")
+    assert a != b
+    assert stable_entity_id("person", "الشيخ ابن تيمية") == stable_entity_id("person", "ابن تيمية")
+
+
+def test_variants_resolve_to_same_entity():
+    idx = _index()
+    assert idx.suggest("ابن خلدون", "person")[0] == "P001"
+    assert idx.suggest("العلامة ولي الدين ابن خلدون", "person")[0] == "P001"
+    assert idx.suggest("أبو حامد", "person")[0] == "P002"
+    assert idx.suggest("الغزالي", "person")[0] == "P002"
+
+
+def test_fuzzy_candidates_ranked_but_not_accepted():
+    idx = _index()
+    sid, cands = idx.suggest("ابن خلدوون", "person")
+    assert cands and cands[0].entity_id == "P001"
+    assert cands[0].score < 0.9
+    assert sid.startswith("ent_person_")
+
+
+def test_type_filter():
+    assert _index().candidates("ابن خلدون", entity_type="place") == []
+
+
+def test_resolution_persistence(tmp_path):
+    idx = _index()
+    path = tmp_path / "resolution.sqlite"
+    idx.save(path)
+    loaded = ResolutionIndex.load(path)
+    assert len(loaded) == 3
+    assert loaded.suggest("ابن تيمية", "person")[0] == "P003"
+
+
+def test_agt02_suggests_resolved_ids():
+    agent = EntityLinkingAgent(resolver=_index())
+    ctx = UnifiedRunContext()
+    r = asyncio.get_event_loop().run_until_complete(
+        agent.run(ctx, {"text": "قال ابن خلدون", "source_id": "s1"}))
+    ent = r.output["entities"][0]
+    assert ent["suggested_id"] == "P001"
+    assert ent["candidates"][0]["entity_id"] == "P001"
+    assert ent["approved"] is False
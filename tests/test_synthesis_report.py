@@ -0,0 +1,62 @@
+"""IQRAA V2 — Mergeable synthesis report tests"""
+import asyncio
+from functools import reduce
+from agents.agt04_synthesis import SynthesisAgent
+from core.run_context import UnifiedRunContext
+from synthesis.report import SynthesisReport, merge, reduce_reports
+from synthesis.streaming import StreamingSynthesizer
+
+
+def _claims(n: int, offset: int = 0):
+    return [{"text": f"ادعاء {offset + i}", "confidence": ((offset + i) * 37 % 100) / 100, "evidence_ids": ["ev"]}
+            for i in range(n)]
+
+
+def _report(k: int, n: int = 40, top_k: int = 5) -> SynthesisReport:
+    synth = StreamingSynthesizer(f"src{k:02d}", top_k=top_k).add_claims(_claims(n, offset=k * 7))
+    synth.add_entities([{"text": "ابن خلدون", "entity_type": "person"}, {"text": f"كتاب {k % 3}", "entity_type": "book"}])
+    synth.add_cross_refs(k)
+    return synth.to_report()
+
+
+def test_merge_is_associative():
+    a, b, c = _report(1), _report(2), _report(3)
+    assert merge(merge(a, b), c) == merge(a, merge(b, c))
+
+
+def test_merged_top_k_equals_global_top_k():
+    reports = [_report(k) for k in range(6)]
+    merged = reduce(merge, reports).to_output()
+    assert merged["total_claims"] == 240 and merged["cross_ref_count"] == 15
+    assert merged["entity_summary"][0] == {"text": "ابن خلدون", "type": "person", "count": 6}
+    everything = [(c, k) for k in range(6) for c in _claims(40, offset=k * 7)]
+    core = sorted((-c["confidence"], f"src{k:02d}") for c, k in everything if c["confidence"] >= 0.7)[:5]
+    got = [i["confidence"] for i in merged["sections"][0]["items"]]
+    assert got == [-conf for conf, _ in core]
+    assert merged["sections"][0]["count"] == sum(1 for c, _ in everything if c["confidence"] >= 0.7)
+
+
+def test_parallel_tree_reduce_matches_sequential():
+    reports = [_report(k) for k in range(20)]
+    expected = reduce(merge, reports)
+    assert reduce_reports(reports, workers=2, fan_in=3) == expected
+    assert reduce_reports(reports, workers=1) == expected
+
+
+def test_from_agt04_batch_output():
+    out = asyncio.get_event_loop().run_until_complete(
+        SynthesisAgent().run(UnifiedRunContext(), {"claims": _claims(10), "source_id": "b1",
+                                                   "entities": [{"text": "العصبية", "entity_type": "concept"}]})).output
+    report = SynthesisReport.from_output(out, top_k=3)
+    merged = merge(report, SynthesisReport.from_output(dict(out, source_id="b2"), top_k=3)).to_output()
+    assert merged["source_ids"] == ["b1", "b2"] and merged["total_claims"] == 20
+    assert merged["entity_summary"] == [{"text": "العصبية", "type": "concept", "count": 2}]
+    assert all(len(s["items"]) <= 3 for s in merged["sections"])
+
+
+def test_agt04_merge_mode():
+    outputs = [_report(k).to_output(f"src{k:02d}") for k in range(4)]
+    r = asyncio.get_event_loop().run_until_complete(
+        SynthesisAgent().run(UnifiedRunContext(), {"mode": "merge", "reports": outputs, "top_k": 5}))
+    assert r.success and r.output["total_claims"] == 160 and r.output["source_id"] == "corpus"
+    assert r.output["sections"] == reduce(merge, [_report(k) for k in range(4)]).to_output()["sections"]
@@ -0,0 +1,61 @@
+"""IQRAA V2 — Streaming AGT-04 synthesis tests"""
+import asyncio
+import json
+import tracemalloc
+from agents.agt04_synthesis import SynthesisAgent
+from core.run_context import UnifiedRunContext
+from synthesis.streaming import StreamingSynthesizer
+
+
+def _claims(n: int):
+    for i in range(n):
+        yield {"text": f"ادعاء {i}", "confidence": (i * 37 % 100) / 100, "evidence_ids": [f"ev{i}"]}
+
+
+def _run(agent, params):
+    return asyncio.get_event_loop().run_until_complete(agent.run(UnifiedRunContext(), params))
+
+
+def test_top_k_per_section_and_full_counts():
+    synth = StreamingSynthesizer(top_k=3).add_claims(_claims(200))
+    sections = {s["section"]: s for s in synth.sections()}
+    assert sum(s["count"] for s in sections.values()) == synth.total_claims == 200
+    core = sections["core_findings"]
+    assert core["count"] == 60 and [i["confidence"] for i in core["items"]] == [0.99, 0.99, 0.98]
+    assert core["items"][0]["claim_text"] == "ادعاء 27"  # earlier claim wins a tie (27 vs 127)
+
+
+def test_streaming_matches_batch_when_nothing_truncated():
+    claims = list(_claims(30))
+    batch = _run(SynthesisAgent(), {"claims": claims, "source_id": "s"}).output
+    stream = _run(SynthesisAgent(), {"claims": iter(claims), "source_id": "s", "mode": "streaming", "top_k": 100}).output
+    assert [(s["section"], s["count"]) for s in stream["sections"]] == [(s["section"], s["count"]) for s in batch["sections"]]
+    for b, s in zip(batch["sections"], stream["sections"]):
+        key = lambda i: (-i["confidence"], i["claim_text"])
+        assert sorted(b["items"], key=key) == sorted(s["items"], key=key)
+
+
+def test_memory_flat_in_corpus_size():
+    def peak(n):
+        tracemalloc.start()
+        StreamingSynthesizer(top_k=20).add_claims(_claims(n))
+        _, p = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return p
+    assert peak(50_000) < 1.5 * peak(5_000)
+
+
+def test_agent_streaming_writes_jsonl(tmp_path):
+    path = tmp_path / "report.jsonl"
+    r = _run(SynthesisAgent(), {"claims": _claims(100), "mode": "streaming", "top_k": 5, "jsonl_path": str(path),
+                                "entities": [{"text": "ابن خلدون", "entity_type": "person"}] * 3,
+                                "cross_refs": [{}, {}]})
+    assert r.success and r.output["total_claims"] == 100
+    lines = [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines()]
+    assert [l["type"] for l in lines] == ["header", "section", "section", "section", "entities", "footer"]
+    assert lines[4]["entity_summary"] == [{"text": "ابن خلدون", "type": "person", "count": 3}]
+    assert lines[-1] == {"type": "footer", "total_claims": 100, "cross_ref_count": 2}
+
+
+def test_agent_streaming_empty_iterator_fails():
+    assert not _run(SynthesisAgent(), {"claims": iter(()), "mode": "streaming"}).success
@@ -0,0 +1,47 @@
+"""IQRAA V2 — Term extraction + light stemmer tests"""
+import asyncio
+from agents.agt03_cross_reference import CrossReferenceAgent
+from core.models import Claim
+from core.run_context import UnifiedRunContext
+from core.terms import STOP_WORDS, TermExtractor, default_extractor, light_stem
+
+
+def test_light_stem_strips_article_and_clitics():
+    assert light_stem("الحضارة") == light_stem("حضارة") == "حضار"
+    assert light_stem("والدولة") == light_stem("دولة")
+    assert light_stem("بالعلم") == light_stem("العلم") == "علم"
+    assert light_stem("كتابها") == "كتاب"
+    assert light_stem("قال") == "قال"
+    assert light_stem("وفي") == "وفي"
+
+
+def test_terms_drop_stopwords_and_short_words():
+    ex = TermExtractor()
+    assert ex.terms("قال ابن خلدون في المقدمة إن العصبية أساس الملك") == (
+        "قال", "ابن", "خلد", "مقدم", "عصب", "اساس", "ملك")
+    assert isinstance(STOP_WORDS, frozenset)
+    assert TermExtractor(stem=False).terms("العصبية في المقدمة") == ("العصبية", "المقدمة")
+
+
+def test_memo_and_claim_cache():
+    ex = TermExtractor()
+    ex.terms("العصبية اساس الملك")
+    ex.terms("العصبية اساس الملك")
+    assert ex.cache_info()["text_hits"] == 1
+    claim = Claim(text="العصبية اساس الملك", evidence_ids=["ev1"], confidence=0.8)
+    first = ex.claim_terms(claim)
+    assert ex.claim_terms(claim.model_dump()) is first
+    assert ex.claim_terms({"claim_id": claim.claim_id, "text": "الحضارة"}) == ("حضار",)
+    assert ex.cache_info()["claims_cached"] == 1
+
+
+def test_default_extractor_shared_by_agt03():
+    assert CrossReferenceAgent().extractor is default_extractor() is CrossReferenceAgent().extractor
+
+
+def test_agt03_matches_across_article_forms():
+    claims_a = [{"text": "الحضارة تقوم على العصبية والملك"}]
+    claims_b = [{"text": "حضارة تقوم على عصبية وملك"}]
+    r = asyncio.get_event_loop().run_until_complete(
+        CrossReferenceAgent().run(UnifiedRunContext(), {"claims_a": claims_a, "claims_b": claims_b}))
+    assert r.output["cross_refs"][0]["overlap_score"] == 1.0
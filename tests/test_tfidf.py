@@ -0,0 +1,60 @@
+"""IQRAA V2 — Sparse TF-IDF similarity engine tests"""
+import asyncio
+import math
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from agents.agt03_cross_reference import CrossReferenceAgent
+from core.run_context import UnifiedRunContext
+from core.terms import light_stem
+from crossref import tfidf
+from crossref.tfidf import TfidfSimilarityEngine
+
+DOCS_A = [["العمران", "البشري", "ضروري"], ["الملك", "غاية", "العصبية"], ["كلام", "اخر"]]
+DOCS_B = [["العصبية", "غايتها", "الملك"], ["العمران", "البشري", "ضروري", "للاجتماع"], []]
+
+
+def _dense_cosine(engine, a, b):
+    engine.fit(a, b)
+    out = []
+    for i, da in enumerate(a):
+        for j, db in enumerate(b):
+            va, vb = {}, {}
+            for terms, v in ((da, va), (db, vb)):
+                for t in set(terms):
+                    v[t] = (1 + math.log(terms.count(t))) * engine.idf[engine.vocab[t]]
+            na = math.sqrt(sum(x * x for x in va.values()))
+            nb = math.sqrt(sum(x * x for x in vb.values()))
+            if na and nb:
+                cos = sum(va[t] * vb.get(t, 0) for t in va) / (na * nb)
+                if cos >= engine.threshold - 1e-9:
+                    out.append((i, j, round(cos, 6)))
+    return out
+
+
+@pytest.mark.parametrize("backend", ["numpy", "scipy"])
+def test_engine_matches_dense_reference(backend):
+    if backend == "scipy" and tfidf.sp is None:
+        pytest.skip("scipy not installed")
+    engine = TfidfSimilarityEngine(threshold=0.2, backend=backend, block_rows=1)
+    got = [(i, j, round(v, 6)) for i, j, v in engine.pairs(DOCS_A, DOCS_B)]
+    assert got == _dense_cosine(TfidfSimilarityEngine(threshold=0.2), DOCS_A, DOCS_B)
+    assert (1, 0) in [(i, j) for i, j, _ in got]
+
+
+def test_numpy_block_splitting_is_lossless():
+    small = TfidfSimilarityEngine(threshold=0.1, backend="numpy", max_products=1)
+    big = TfidfSimilarityEngine(threshold=0.1, backend="numpy")
+    assert list(small.pairs(DOCS_A, DOCS_B)) == list(big.pairs(DOCS_A, DOCS_B))
+
+
+def test_agt03_tfidf_method_returns_crossrefs():
+    claims_a = [{"text": " ".join(d)} for d in DOCS_A]
+    claims_b = [{"text": " ".join(d) or "و"} for d in DOCS_B]
+    r = asyncio.get_event_loop().run_until_complete(
+        CrossReferenceAgent().run(UnifiedRunContext(), {"claims_a": claims_a, "claims_b": claims_b, "method": "tfidf"}))
+    assert r.success
+    refs = {(x["claim_a"], x["claim_b"]): x for x in r.output["cross_refs"]}
+    assert refs[(0, 1)]["relation"] == "corroboration"
+    assert set(refs[(0, 1)]["shared_terms"]) == {light_stem(w) for w in ("العمران", "البشري", "ضروري")}
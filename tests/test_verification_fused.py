@@ -0,0 +1,99 @@
+"""IQRAA V2 — Fused G1 + AGT-05 validation tests"""
+import asyncio
+import random
+import pytest
+
+from agents.agt05_verification import VerificationAgent
+from core.models import Evidence, TextSpan
+from core.run_context import UnifiedRunContext
+from governance.g1_quality_gate import run_g1_gate
+from verification.fused import validate_fused
+
+TEXT = "قال ابن خلدون ان العصبية اساس الملك والدولة في كتاب المقدمة"
+
+
+def _random_case(seed: int):
+    rnd = random.Random(seed)
+    evidences = []
+    for k in range(25):
+        spans = []
+        for _ in range(rnd.randint(0, 3)):
+            cs = rnd.randint(-2, len(TEXT))
+            ce = cs + rnd.randint(-1, 10)
+            roll = rnd.random()
+            txt = TEXT[max(cs, 0):max(ce, 0)] if roll < 0.7 else (" " if roll < 0.8 else "خطا")
+            spans.append(TextSpan(doc_id="d", char_start=cs, char_end=ce, text=txt))
+        evidences.append(Evidence(evidence_id=f"ev{k % 23}", spans=spans,
+                                  confidence=0.0 if rnd.random() < 0.1 else 0.8, source_ref="d"))
+    ids = [f"ev{k}" for k in range(25)]
+    claims = [{"text": rnd.choice(["ادعاء", " ", "قال ابن خلدون"]), "evidence_ids": rnd.sample(ids, rnd.randint(0, 3))}
+              for _ in range(30)]
+    return claims, evidences
+
+
+def _agt05(claims, evidences, text):
+    r = asyncio.get_event_loop().run_until_complete(VerificationAgent().run(
+        UnifiedRunContext(), {"claims": claims, "evidences": evidences, "canonical_text": text}))
+    return r.output["results"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fused_matches_separate_passes(seed):
+    claims, evidences = _random_case(seed)
+    for text in (TEXT, ""):
+        fused = validate_fused(claims, evidences, text, threshold=0.5)
+        g1 = run_g1_gate(claims, evidences, threshold=0.5)
+        assert (fused.g1.passed, fused.g1.score, fused.g1.issues) == (g1.passed, g1.score, g1.issues)
+        assert fused.results == _agt05(claims, evidences, text) and not fused.early_exit
+
+
+@pytest.mark.parametrize("settings", [{"max_issues": 3}, {"mode": "sampled", "sample_size": 20, "seed": 4},
+                                      {"mode": "fail_fast"}])
+def test_fused_modes_match_gate(settings):
+    claims, evidences = _random_case(1)
+    fused = validate_fused(claims, evidences, TEXT, **settings)
+    g1 = run_g1_gate(claims, evidences, **settings)
+    assert vars(fused.g1) == vars(g1)
+    if settings.get("mode") == "fail_fast":
+        assert fused.early_exit and fused.results is None
+    else:  # verification always covers every claim, whatever the gate sampled
+        assert fused.results == _agt05(claims, evidences, TEXT)
+
+
+def test_fail_fast_stops_at_first_issue():
+    ok = Evidence(evidence_id="a", spans=[TextSpan(doc_id="d", char_start=0, char_end=3, text="قال")],
+                  confidence=0.8, source_ref="d")
+    bad = Evidence(evidence_id="b", spans=[TextSpan(doc_id="d", char_start=5, char_end=2, text="x")],
+                   confidence=0.8, source_ref="d")
+    claims = [{"text": "ادعاء", "evidence_ids": ["a", "b"]}]
+    fused = validate_fused(claims, [ok, bad, ok], TEXT, mode="fail_fast")
+    assert fused.early_exit and fused.results is None and not fused.g1.passed
+    assert fused.g1.issues == ["evidence_1_span_0: invalid offsets (5,2)"] and fused.g1.checked == 3
+    clean = validate_fused(claims, [ok], TEXT, mode="fail_fast")
+    assert clean.g1.passed and not clean.early_exit and clean.results[0]["issues"] == ["evidence b not found"]
+
+
+def test_agent_ignores_caller_supplied_results():
+    claims, evidences = _random_case(0)
+    forged = [{"claim_index": i, "claim_text": "", "issues": [], "passed": True} for i in range(len(claims))]
+    ctx = UnifiedRunContext()
+    r = asyncio.get_event_loop().run_until_complete(VerificationAgent().run(
+        ctx, {"claims": claims, "evidences": evidences, "canonical_text": TEXT, "results": forged}))
+    assert r.output["results"] == validate_fused(claims, evidences, TEXT).results != forged
+    assert ctx.audit_events[-1]["fused"] is False
+
+
+def test_record_fused_goes_through_the_standard_result_path():
+    claims, evidences = _random_case(1)
+    fused = validate_fused(claims, evidences, TEXT).results
+    ctx = UnifiedRunContext()
+    r = asyncio.get_event_loop().run_until_complete(VerificationAgent().record_fused(ctx, fused))
+    assert r.success and r.agent_id == "AGT-05" and r.run_id == ctx.run_id
+    assert r.output["results"] == fused and ctx.audit_events[-1]["fused"] is True
+
+def test_thin_slice_verifies_through_fused_pass():
+    from pipelines.thin_slice import run_thin_slice
+    r = asyncio.get_event_loop().run_until_complete(run_thin_slice("قال ابن خلدون. وقال العلماء.", "test"))
+    assert r["verification_results"] and r["verified_count"] == len(r["claims"])
+    audit = [e for e in r["run_ctx_dict"]["audit_events"] if e["event"] == "verification_complete"][-1]
+    assert audit["fused"] is True
@@ -0,0 +1,2 @@
+"""IQRAA V2 Verification Package — مسارات تحقق AGT-05 عالية الإنتاجية"""
+from .fused import FusedValidation, validate_fused
@@ -0,0 +1,44 @@
+"""
+IQRAA V2 — Fused G1 + AGT-05 Validation
+=========================================
+تمريرة واحدة على الأدلة تُنتج نتيجة بوابة G1 ونتائج تحقق AGT-05 معاً:
+فحوص G1 (وجود spans، صحة offsets، نص غير فارغ، الثقة) وفحوص AGT-05 (الربط، offsets،
+تطابق النص مع المصدر) تتشارك نفس القراءة لكل span.
+
+- النتيجتان مطابقتان لـ run_g1_gate (بنفس mode والإعدادات) و VerificationAgent كلٌّ على حدة
+- الفحوص نفسها من governance.g1_quality_gate (scan_g1)، فلا نسخة ثانية من قواعد G1
+- mode="fail_fast": التوقف عند أول مشكلة G1، لأن البوابة لا تنجح مع أي مشكلة —
+  عندها لا تُبنى نتائج التحقق (المسار ينتهي عند البوابة)
+- mode="sampled": البوابة على العينة، والتحقق على كل الأدلة
+"""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Sequence
+
+from core.models import Evidence
+from governance.g1_quality_gate import MAX_ISSUES, G1QualityResult, scan_g1
+
+
+class FusedValidation(NamedTuple):
+    g1: G1QualityResult
+    results: Optional[list[dict]]  # AGT-05 per-claim results; None after a fail_fast stop
+    early_exit: bool
+
+
+def validate_fused(claims_data: Sequence[dict], evidences: Sequence[Evidence], canonical_text: str = "",
+                   threshold: float = 0.5, mode: str = "full", max_issues: Optional[int] = MAX_ISSUES,
+                   sample_size: int = 1000, confidence: float = 0.95, seed: int = 0) -> FusedValidation:
+    """run_g1_gate(...) with the same settings and AGT-05 verification in one pass over the evidence."""
+    g1, ev_issues = scan_g1(claims_data, evidences, threshold, mode, max_issues, sample_size, confidence, seed,
+                            canonical_text=canonical_text)
+    if ev_issues is None:
+        return FusedValidation(g1, None, True)
+
+    results = []
+    for i, c in enumerate(claims_data):
+        ev_ids = c.get("evidence_ids", [])
+        check = [f"evidence {eid} not found" for eid in ev_ids if eid not in ev_issues]
+        for eid in ev_ids:
+            check.extend(ev_issues.get(eid, ()))
+        results.append({"claim_index": i, "claim_text": c.get("text", "")[:50], "issues": check, "passed": not check})
+    return FusedValidation(g1, results, False)